@@ -0,0 +1,62 @@
+"""
+Книга лотів аукціону на N активних лотах: найдешевший лот, сторінка,
+купівля (зняття з книги) та масова евікція за строком.
+python -m benchmarks.bench_auction [лотів] [предметів] [операцій]
+"""
+import random
+import sys
+import time
+
+from bot.services.auction_service import CURRENCY_GOLD, AuctionHouse, Listing
+
+
+def timed(label: str, count: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed / count * 1e6:.2f} мкс/оп ({count:,} оп)")
+
+
+def main():
+    listings = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    operations = int(sys.argv[3]) if len(sys.argv) > 3 else 100_000
+    rng = random.Random(1)
+    now = 1_000_000.0
+
+    house = AuctionHouse()
+    start = time.perf_counter()
+    for listing_id in range(1, listings + 1):
+        house.add(Listing(listing_id, listing_id, listing_id, rng.randrange(items), CURRENCY_GOLD,
+                          rng.randint(1, 10_000), now + rng.uniform(0, 86_400)))
+    print(f"{listings:,} лотів на {items:,} предметів: {time.perf_counter() - start:.2f} с")
+
+    lookups = [rng.randrange(items) for _ in range(operations)]
+
+    def best():
+        for item_id in lookups:
+            house.best(item_id)
+
+    def pages():
+        for item_id in lookups:
+            house.page(item_id, limit=10)
+
+    def buys():
+        for item_id in lookups:
+            listing = house.best(item_id)
+            if listing is not None:
+                house.remove(listing.id)
+
+    timed("найдешевший лот", operations, best)
+    timed("сторінка з 10 лотів", operations, pages)
+    timed("купівля найдешевшого", operations, buys)
+
+    # Евікція години лотів (з лінивим пропуском куплених)
+    start = time.perf_counter()
+    expired = house.pop_expired(now + 3_600)
+    elapsed = time.perf_counter() - start
+    print(f"евікція: {len(expired):,} лотів за {elapsed * 1e3:.1f} мс, залишилось {len(house):,}")
+
+
+if __name__ == "__main__":
+    main()
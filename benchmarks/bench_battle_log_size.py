@@ -0,0 +1,44 @@
+"""
+Розмір запису бою: компактний стан BattleSession проти покрокового JSON.
+python -m benchmarks.bench_battle_log_size [кількість боїв]
+"""
+import json
+import random
+import sys
+import time
+
+from bot.services.battle_recorder import session_state
+from bot.services.battle_service import ENEMIES, OUTCOME_WON, BattleState, play_round
+from bot.services.character_service import DEFAULT_STATS
+
+
+def naive_log(rounds: list) -> str:
+    """Покроковий JSON-журнал, який довелося б зберігати без replay"""
+    return json.dumps(rounds, ensure_ascii=False)
+
+
+def main(n: int = 2_000):
+    rng = random.Random(1)
+    compact_total = naive_total = rounds_total = 0
+    for _ in range(n):
+        enemy_id = rng.choice(list(ENEMIES))
+        battle = BattleState(enemy_id, DEFAULT_STATS["hp"], ENEMIES[enemy_id]["hp"] * 5, time.time() + 300)
+        rounds = []
+        while battle.player_hp > 0 and battle.enemy_hp > 0 and battle.round < 200:
+            action = rng.choice(["attack", "attack", "attack", "defend"])
+            for actor, kind, target, value, crit in play_round(battle, action):
+                rounds.append({
+                    "round": battle.round, "actor": actor, "action": kind, "target": target,
+                    "damage": value, "crit": crit, "player_hp": battle.player_hp, "enemy_hp": battle.enemy_hp,
+                })
+        rounds_total += battle.round
+        naive_total += len(naive_log(rounds).encode())
+        compact_total += len(json.dumps(session_state(battle, OUTCOME_WON), ensure_ascii=False).encode())
+
+    print(f"{n} боїв, у середньому {rounds_total / n:.1f} раундів")
+    print(f"покроковий JSON:  {naive_total / n:9.1f} байт/бій")
+    print(f"seed + varint:    {compact_total / n:9.1f} байт/бій ({naive_total / compact_total:.1f}x менше)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,61 @@
+"""
+Пам'ять на один активний бій: старий dict-формат проти BattleState.
+python -m benchmarks.bench_battle_memory [кількість боїв]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from bot.services.battle_service import BATTLE_DURATION, ENEMIES, BattleState
+
+
+def legacy_battle(enemy: dict) -> dict:
+    """Стан бою у форматі до BattleState (dict + власна клавіатура)"""
+    buttons = [
+        [
+            InlineKeyboardButton(text="⚔️ Атакувати", callback_data="hunt:attack"),
+            InlineKeyboardButton(text="🛡 Захищатися", callback_data="hunt:defend")
+        ],
+        [
+            InlineKeyboardButton(text="🏃 Втекти", callback_data="hunt:flee"),
+            InlineKeyboardButton(text="🔙 Назад", callback_data="menu:main")
+        ]
+    ]
+    return {
+        "enemy": enemy,
+        "player_hp": 100,
+        "enemy_hp": enemy["hp"],
+        "end_time": datetime.now() + timedelta(minutes=5),
+        "keyboard": InlineKeyboardMarkup(inline_keyboard=buttons),
+    }
+
+
+def compact_battle(enemy_id: str) -> BattleState:
+    return BattleState(enemy_id, 100, ENEMIES[enemy_id]["hp"], time.time() + BATTLE_DURATION)
+
+
+def measure(factory, n: int) -> float:
+    enemy_ids = list(ENEMIES)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    battles = {user_id: factory(enemy_ids[user_id % len(enemy_ids)]) for user_id in range(n)}
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del battles
+    return total / n
+
+
+def main(n: int = 50_000):
+    legacy = measure(lambda enemy_id: legacy_battle(ENEMIES[enemy_id]), n)
+    compact = measure(compact_battle, n)
+    print(f"{n} активних боїв")
+    print(f"dict + клавіатура: {legacy:8.1f} байт/бій")
+    print(f"BattleState:       {compact:8.1f} байт/бій ({legacy / compact:.1f}x менше)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,28 @@
+"""
+Балансовий прогін: усі класи проти всіх ворогів.
+python -m benchmarks.bench_battle_sim [кількість боїв на пару]
+"""
+import sys
+import time
+
+from bot.services.battle_sim import balance_sweep
+
+
+def main(n: int = 1_000_000):
+    start = time.perf_counter()
+    sweep = balance_sweep(n, seed=42)
+    elapsed = time.perf_counter() - start
+    pairs = len(sweep["classes"]) * len(sweep["enemies"])
+
+    print(f"{pairs} пар x {n} боїв: {elapsed:.2f} s ({pairs * n / elapsed:,.0f} боїв/с)")
+    print(f"{'':12}" + "".join(f"{e:>24}" for e in sweep["enemies"]))
+    for i, class_id in enumerate(sweep["classes"]):
+        cells = (
+            f"{sweep['win_rate'][i, j]:6.1%} {sweep['mean_turns'][i, j]:5.1f}t {sweep['mean_hp_left'][i, j]:7.1f}hp"
+            for j in range(len(sweep["enemies"]))
+        )
+        print(f"{class_id:12}" + "".join(f"{c:>24}" for c in cells))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,107 @@
+"""
+Маршрутизація callback-запитів у міру зростання кількості дій: ланцюжок
+фільтрів aiogram (F.data == ... і F.data.startswith(...), як було в
+хендлерах) проти CallbackRouter (один фільтр, розбір за словником).
+Половина дій - точні, половина - з аргументом ("actionN:42"); натискання
+рівномірно розподілені між діями. Час - через dp.feed_update() без
+middleware, а також чистий resolve().
+python -m benchmarks.bench_callback_router [натискань]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Update
+
+from bot.utils.callback_router import CallbackRouter
+
+ACTIONS = (10, 50, 100, 300, 1000)
+
+
+def callback_data(actions: int, rng: random.Random, count: int):
+    data = []
+    for _ in range(count):
+        index = rng.randrange(actions)
+        data.append(f"exact{index}" if index % 2 == 0 else f"prefix{index}:{rng.randrange(100)}")
+    return data
+
+
+def chain_dispatcher(actions: int) -> Dispatcher:
+    router = Router()
+
+    async def handler(callback: CallbackQuery):
+        return None
+
+    for index in range(actions):
+        if index % 2 == 0:
+            router.callback_query.register(handler, F.data == f"exact{index}")
+        else:
+            router.callback_query.register(handler, F.data.startswith(f"prefix{index}:"))
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp
+
+
+def compiled_router(actions: int) -> CallbackRouter:
+    callbacks = CallbackRouter()
+
+    async def handler(callback: CallbackQuery, *args):
+        return None
+
+    for index in range(actions):
+        if index % 2 == 0:
+            callbacks.exact(f"exact{index}")(handler)
+        else:
+            callbacks.prefix(f"prefix{index}", int)(handler)
+    return callbacks
+
+
+def compiled_dispatcher(callbacks: CallbackRouter) -> Dispatcher:
+    router = Router()
+
+    @router.callback_query(callbacks.match)
+    async def dispatch_callback(callback: CallbackQuery, action):
+        await action.handler(callback, *action.args)
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp
+
+
+def make_updates(bot: Bot, data):
+    return [Update.model_validate({"update_id": i, "callback_query": {
+        "id": str(i), "chat_instance": "1", "data": value,
+        "from": {"id": 1, "is_bot": False, "first_name": "Герой"},
+    }}, context={"bot": bot}) for i, value in enumerate(data)]
+
+
+async def feed(dp: Dispatcher, bot: Bot, updates) -> float:
+    start = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    bot = Bot("42:TEST")
+    print(f"{count:,} натискань, мкс на оновлення")
+    print(f"{'дій':>6}{'ланцюжок':>12}{'словник':>12}{'resolve':>12}")
+    for actions in ACTIONS:
+        data = callback_data(actions, random.Random(actions), count)
+        updates = make_updates(bot, data)
+        chain = asyncio.run(feed(chain_dispatcher(actions), bot, updates))
+        callbacks = compiled_router(actions)
+        compiled = asyncio.run(feed(compiled_dispatcher(callbacks), bot, updates))
+        start = time.perf_counter()
+        for value in data:
+            callbacks.resolve(value)
+        resolve = time.perf_counter() - start
+        print(f"{actions:>6}{chain / count * 1e6:>12.1f}{compiled / count * 1e6:>12.1f}"
+              f"{resolve / count * 1e6:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Запис луту в inventory: рядків/с залежно від розміру пакета upsert
+проти SELECT + INSERT/UPDATE на кожен предмет.
+python -m benchmarks.bench_inventory [URL БД] [рядків]
+(за замовчуванням - тимчасова SQLite через aiosqlite)
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import select
+
+from bot import database
+from bot.services.inventory_service import write_stacks
+from models.base import Character, Inventory, Item, User
+
+CHARACTERS = 200
+ITEMS = 50
+BATCH_SIZES = (1, 10, 100, 1_000)
+
+
+async def seed() -> None:
+    async with database.session() as session:
+        async with session.begin():
+            session.add_all(Item(id=i, name=f"ресурс {i}", type="resource", rarity="common")
+                            for i in range(1, ITEMS + 1))
+            for telegram_id in range(1, CHARACTERS + 1):
+                user = User(id=telegram_id, telegram_id=telegram_id)
+                session.add(user)
+                session.add(Character(id=telegram_id, user_id=telegram_id, class_name="маг", stats={}))
+
+
+def random_rows(rng: random.Random, count: int) -> list:
+    """Рядки без дублікатів ключа всередині пакета (як після stack_drops)"""
+    keys = rng.sample(range(CHARACTERS * ITEMS), count)
+    return [{"character_id": key // ITEMS + 1, "item_id": key % ITEMS + 1, "quantity": rng.randint(1, 5)}
+            for key in keys]
+
+
+async def naive_write(rows: list) -> None:
+    """SELECT, потім INSERT або UPDATE на кожен предмет"""
+    async with database.session() as session:
+        async with session.begin():
+            for row in rows:
+                entry = await session.scalar(select(Inventory).where(
+                    Inventory.character_id == row["character_id"], Inventory.item_id == row["item_id"]))
+                if entry is None:
+                    session.add(Inventory(**row))
+                else:
+                    entry.quantity += row["quantity"]
+                await session.flush()
+
+
+async def measure(label: str, write, batch: int, total: int, rng: random.Random) -> None:
+    batches = [random_rows(rng, batch) for _ in range(max(total // batch, 1))]
+    start = time.perf_counter()
+    for rows in batches:
+        await write(rows)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} пакет {batch:>5}: {len(batches) * batch / elapsed:>10,.0f} рядків/с")
+
+
+async def run(url: str, total: int) -> None:
+    database.init_db(url, pool_size=2, max_overflow=0)
+    await database.create_tables()
+    await seed()
+    rng = random.Random(1)
+    for batch in BATCH_SIZES:
+        await measure("SELECT + INSERT/UPDATE", naive_write, batch, min(total, 2_000), rng)
+        await measure("INSERT ... ON CONFLICT", write_stacks, batch, total, rng)
+    await database.close_db()
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else None
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    if url:
+        asyncio.run(run(url, total))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", total))
+
+
+if __name__ == "__main__":
+    main()
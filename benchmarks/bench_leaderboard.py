@@ -0,0 +1,66 @@
+"""
+Рейтинги на N гравцях: перебудова, оновлення після бою, місце гравця і
+сторінка топу. Для порівняння - повне сортування (аналог ORDER BY).
+python -m benchmarks.bench_leaderboard [гравців] [операцій]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from bot.services import leaderboard
+from bot.services.leaderboard import METRIC_GOLD, METRIC_XP
+
+
+def timed(label: str, count: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed / count * 1e6:.2f} мкс/оп ({count:,} оп)")
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    rng = random.Random(1)
+    rows = [
+        (telegram_id, rng.randint(1, 60), rng.randrange(500_000), rng.randrange(100_000))
+        for telegram_id in range(1, players + 1)
+    ]
+
+    start = time.perf_counter()
+    leaderboard.load_rows(rows)
+    print(f"перебудова {players:,} гравців: {time.perf_counter() - start:.2f} с")
+    # Пам'ять - окремим прогоном, tracemalloc сповільнює перебудову
+    tracemalloc.start()
+    leaderboard.load_rows(rows)
+    print(f"пам'ять 3 рейтингів: {tracemalloc.get_traced_memory()[0] / 2 ** 20:.0f} МБ")
+    tracemalloc.stop()
+
+    ids = [rng.randint(1, players) for _ in range(operations)]
+    board = leaderboard.LEADERBOARDS[METRIC_XP]
+
+    def updates():
+        for telegram_id in ids:
+            board.update(telegram_id, board.score(telegram_id) + 37)
+
+    def ranks():
+        for telegram_id in ids:
+            board.rank(telegram_id)
+
+    def pages():
+        for i in range(operations // 10):
+            leaderboard.get_top(METRIC_GOLD, 10, offset=(i % 100) * 10)
+
+    timed("оновлення досвіду", operations, updates)
+    timed("місце гравця", operations, ranks)
+    timed("сторінка топ-10", operations // 10, pages)
+
+    scores = [(row[3], row[0]) for row in rows]
+    start = time.perf_counter()
+    sorted(scores, reverse=True)[:10]
+    print(f"повне сортування на запит (ORDER BY): {(time.perf_counter() - start) * 1e3:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
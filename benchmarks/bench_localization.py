@@ -0,0 +1,56 @@
+"""
+Вартість рендеру тексту: каталог у пам'яті проти f-рядка в коді та
+запиту до таблиці localization на кожен рядок (SQLite в пам'яті).
+python -m benchmarks.bench_localization [повторів]
+"""
+import sqlite3
+import sys
+import time
+
+from bot.services.localization import DEFAULT_LOCALE, DEFAULT_TEXTS, t
+
+
+def timed(label: str, count: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / count * 1e6:8.3f} мкс/повідомлення")
+
+
+def battle_round_catalog() -> str:
+    lines = [t("battle.player_hit", "uk", damage=12), t("battle.enemy_crit", "uk", damage=7)]
+    return "\n".join(lines) + "\n\n" + t("battle.status", "uk", player_hp=81, enemy_hp=38)
+
+
+def battle_round_inline() -> str:
+    lines = ["⚔️ Ви завдали 12 шкоди!", f"{'💥 Критичний удар! '}Ворог завдав {7} шкоди!"]
+    return "\n".join(lines) + "\n\n" + f"❤️ Ваше здоров'я: {81}\n❤️ Здоров'я ворога: {38}"
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE localization (key TEXT, locale TEXT, text TEXT, PRIMARY KEY (key, locale))")
+    db.executemany("INSERT INTO localization VALUES (?, ?, ?)",
+                   [(key, DEFAULT_LOCALE, text) for key, text in DEFAULT_TEXTS.items()])
+
+    def from_db(key: str, **values) -> str:
+        row = db.execute("SELECT text FROM localization WHERE key = ? AND locale = ?", (key, DEFAULT_LOCALE)).fetchone()
+        return row[0].format(**values)
+
+    def battle_round_db() -> str:
+        lines = [from_db("battle.player_hit", damage=12), from_db("battle.enemy_crit", damage=7)]
+        return "\n".join(lines) + "\n\n" + from_db("battle.status", player_hp=81, enemy_hp=38)
+
+    def loop(fn):
+        return lambda: [fn() for _ in range(repeat)]
+
+    timed("статичний текст (каталог)", repeat, loop(lambda: t("battle.timeout", "uk")))
+    timed("шаблон з підстановкою (каталог)", repeat, loop(lambda: t("battle.player_hit", "uk", damage=12)))
+    timed("раунд бою: f-рядки в коді", repeat, loop(battle_round_inline))
+    timed("раунд бою: каталог", repeat, loop(battle_round_catalog))
+    timed("раунд бою: запит до БД на рядок", repeat // 10, lambda: [battle_round_db() for _ in range(repeat // 10)])
+
+
+if __name__ == "__main__":
+    main()
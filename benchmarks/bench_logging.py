@@ -0,0 +1,87 @@
+"""
+Затримка хендлера з логуванням: без логу, синхронний FileHandler з
+f-рядком у хендлері (як було), черга + потік запису з відкладеним
+форматуванням, і те саме з проріджуванням частих подій до 10%.
+python -m benchmarks.bench_logging [оновлень]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from aiogram.types import CallbackQuery, User
+
+from bot.middlewares.access_log import AccessLogMiddleware
+from bot.utils.structured_log import setup_logging
+
+handler_logger = logging.getLogger("bench.handler")
+
+
+async def process_hunt_action(event, data):
+    await asyncio.sleep(0)
+
+
+async def process_hunt_action_fstring(event, data):
+    handler_logger.info(f"User {event.from_user.id} performed action: {event.data.split(':')[1]}")
+    await asyncio.sleep(0)
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    return root
+
+
+async def measure(count: int, handler, middleware) -> list:
+    user = User(id=1, is_bot=False, first_name="Герой")
+    event = CallbackQuery(id="1", from_user=user, chat_instance="1", data="hunt:attack")
+    data = {"event_from_user": user, "handler": SimpleNamespace(callback=process_hunt_action)}
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        if middleware is None:
+            await handler(event, data)
+        else:
+            await middleware(handler, event, data)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: list) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99)]
+    print(f"{label:<34} p50 {statistics.median(ordered) * 1e6:7.2f} мкс, p99 {p99 * 1e6:7.2f} мкс")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    path = os.path.join(tempfile.mkdtemp(), "bot.log")
+
+    root = reset_root()
+    root.setLevel(logging.WARNING)
+    report("лог вимкнено", asyncio.run(measure(count, process_hunt_action, None)))
+
+    root = reset_root()
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root.addHandler(file_handler)
+    root.setLevel(logging.INFO)
+    report("f-рядок + FileHandler (було)", asyncio.run(measure(count, process_hunt_action_fstring, None)))
+
+    for label, rates in (("черга + JSON, кожна подія", {}), ("черга + JSON, 10% дій у бою", {"process_hunt_action": 0.1})):
+        reset_root()
+        with open(path, "a") as stream:
+            listener = setup_logging("INFO", sample_rates=rates, stream=stream)
+            report(label, asyncio.run(measure(count, process_hunt_action, AccessLogMiddleware())))
+            listener.stop()
+    reset_root()
+
+
+if __name__ == "__main__":
+    main()
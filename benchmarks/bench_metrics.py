@@ -0,0 +1,48 @@
+"""
+Вартість метрик на гарячому шляху: observe гістограми, inc лічильника,
+декоратор timed навколо async-функції та render() для Prometheus.
+python -m benchmarks.bench_metrics [операцій]
+"""
+import asyncio
+import sys
+import time
+
+from bot.services import metrics
+
+
+def timed(label: str, count: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / count * 1e6:8.3f} мкс/оп")
+
+
+async def work():
+    return None
+
+
+@metrics.timed("bench")
+async def work_timed():
+    return None
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    histogram = metrics.histogram("bench_seconds", "Benchmark", ("handler",))
+    counter = metrics.counter("bench_events", "Benchmark", ("handler",))
+    handlers = [f"handler_{i}" for i in range(20)]
+
+    timed("histogram.observe", count, lambda: [histogram.observe(i * 1e-6, handlers[i % 20]) for i in range(count)])
+    timed("counter.inc", count, lambda: [counter.inc(handlers[i % 20]) for i in range(count)])
+
+    async def loop(fn):
+        for _ in range(count):
+            await fn()
+    timed("async-виклик без метрик", count, lambda: asyncio.run(loop(work)))
+    timed("async-виклик з @timed", count, lambda: asyncio.run(loop(work_timed)))
+    renders = 1_000
+    timed(f"render(), метрик: {len(metrics.REGISTRY)}", renders, lambda: [metrics.render() for _ in range(renders)])
+
+
+if __name__ == "__main__":
+    main()
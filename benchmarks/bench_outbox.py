@@ -0,0 +1,113 @@
+"""
+Сплеск повідомлень (гравці спамлять hunt:attack): пряма відправка з
+хендлерів проти черги з лімітами. Фейковий Telegram відповідає 429 при
+перевищенні ~1 повідомлення/с у чат або ~30/с загалом; час прискорено
+в SPEEDUP разів.
+python -m benchmarks.bench_outbox [гравців] [натискань на гравця]
+"""
+import asyncio
+import sys
+import time
+from collections import deque
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from bot.services.outbox import Outbox
+
+SPEEDUP = 20
+CHAT_INTERVAL = 1.0 / SPEEDUP
+GLOBAL_RATE = 30 * SPEEDUP
+LATENCY = 0.05 / SPEEDUP
+
+
+class FloodBot:
+    def __init__(self):
+        self.delivered = 0
+        self.rejected = 0
+        self._last = {}
+        self._window = deque()
+        self.shown = {}
+
+    async def _deliver(self, chat_id: int, text: str):
+        await asyncio.sleep(LATENCY)
+        now = time.monotonic()
+        while self._window and now - self._window[0] > 1.0:
+            self._window.popleft()
+        if now - self._last.get(chat_id, -1e9) < CHAT_INTERVAL or len(self._window) >= GLOBAL_RATE:
+            self.rejected += 1
+            raise TelegramRetryAfter(SendMessage(chat_id=chat_id, text=text), "Too Many Requests", CHAT_INTERVAL)
+        self._last[chat_id] = now
+        self._window.append(now)
+        self.shown[chat_id] = text
+        self.delivered += 1
+        return True
+
+    async def send_message(self, chat_id, text, **kwargs):
+        return await self._deliver(chat_id, text)
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        return await self._deliver(chat_id, text)
+
+
+async def spam(players: int, clicks: int, edit):
+    """Кожен гравець натискає кнопку clicks разів з інтервалом ~кадру"""
+    async def player(chat_id: int):
+        for click in range(clicks):
+            await edit(chat_id, f"раунд {click}")
+            await asyncio.sleep(CHAT_INTERVAL / 4)
+    await asyncio.gather(*(player(chat_id) for chat_id in range(players)))
+
+
+async def direct(players: int, clicks: int):
+    bot = FloodBot()
+
+    async def edit(chat_id, text):
+        try:
+            await bot.edit_message_text(text, chat_id=chat_id, message_id=1)
+        except TelegramRetryAfter:
+            pass
+
+    start = time.perf_counter()
+    await spam(players, clicks, edit)
+    return bot, None, time.perf_counter() - start
+
+
+async def queued(players: int, clicks: int):
+    bot = FloodBot()
+    outbox = Outbox(bot, global_rate=GLOBAL_RATE * 0.9, chat_rate=1 / CHAT_INTERVAL, chat_burst=1)
+    worker = asyncio.create_task(outbox.run())
+
+    async def edit(chat_id, text):
+        outbox.edit_text(chat_id, 1, text)
+
+    start = time.perf_counter()
+    await spam(players, clicks, edit)
+    await outbox.drain(timeout=60)
+    elapsed = time.perf_counter() - start
+    worker.cancel()
+    return bot, outbox, elapsed
+
+
+def report(label: str, bot: FloodBot, outbox, elapsed: float, total: int, final: str) -> None:
+    line = f"{label:<16} доставлено {bot.delivered:6,} ({bot.delivered / elapsed:7,.0f}/с), 429: {bot.rejected:6,}"
+    if outbox is not None:
+        line += f", злито редагувань: {outbox.dropped_edits:,}, втрачено: {total - bot.delivered - outbox.dropped_edits:,}"
+    else:
+        line += f", втрачено: {total - bot.delivered:,}"
+    current = sum(text == final for text in bot.shown.values())
+    print(line + f", актуальний текст у {current}/{len(bot.shown)} чатах")
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    clicks = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    total = players * clicks
+    print(f"{players} гравців x {clicks} натискань = {total:,} редагувань (час x{SPEEDUP})")
+    final = f"раунд {clicks - 1}"
+    report("напряму", *asyncio.run(direct(players, clicks)), total, final)
+    report("через чергу", *asyncio.run(queued(players, clicks)), total, final)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Меню квестів на N квестах: старий список (перебір і конкатенація всіх
+квестів на кожен виклик) проти готового тексту з каталогу.
+python -m benchmarks.bench_quest_catalog [квестів] [викликів]
+"""
+import random
+import sys
+import time
+
+from bot.services.localization import t
+from bot.services.quest_catalog import QuestCatalog
+
+
+def timed(label: str, count: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed / count * 1e6:10.2f} мкс/виклик")
+
+
+def main():
+    quest_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    rng = random.Random(1)
+    quests = [
+        {"id": quest_id, "title": f"Квест {quest_id}", "description": "Перемогти ворогів", "type": "combat",
+         "reward": {"gold": 100, "exp": 50}, "requirements": {"level": rng.randint(1, 60)}}
+        for quest_id in range(1, quest_count + 1)
+    ]
+    levels = [rng.randint(1, 60) for _ in range(calls)]
+
+    def old_listing(level: int) -> str:
+        text = t("quests.header")
+        for quest in quests:
+            text += t("quests.item", title=quest["title"], description=quest["description"],
+                      gold=quest["reward"]["gold"], exp=quest["reward"]["exp"], level=quest["requirements"]["level"])
+        return text + t("quests.footer")
+
+    start = time.perf_counter()
+    catalog = QuestCatalog(quests)
+    print(f"каталог з {quest_count:,} квестів: {(time.perf_counter() - start) * 1e3:.1f} мс")
+    old_calls = max(calls // 100, 1)
+    timed("перебір і конкатенація", old_calls, lambda: [old_listing(level) for level in levels[:old_calls]])
+    timed("каталог (готовий текст)", calls, lambda: [catalog.listing("uk", level) for level in levels])
+    accept_ids = [rng.randint(1, quest_count) for _ in range(calls)]
+    timed("пошук квесту: перебір списку", old_calls,
+          lambda: [next(q for q in quests if q["id"] == quest_id) for quest_id in accept_ids[:old_calls]])
+    timed("пошук квесту: індекс за ID", calls, lambda: [catalog.get(quest_id) for quest_id in accept_ids])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Пропускна здатність подій квестів: 50 активних квестів на гравця,
+індекс за ключем події проти перебору всіх квестів гравця на кожну подію.
+python -m benchmarks.bench_quest_progress [гравців] [подій] [квестів на гравця]
+"""
+import random
+import sys
+import time
+
+from bot.services.quest_progress import ActiveQuest, PlayerQuests, QuestTracker
+
+ENEMIES = [f"kill:ворог{i}" for i in range(60)]
+RESOURCES = [f"gather:ресурс{i}" for i in range(140)]
+EVENT_KEYS = ENEMIES + RESOURCES
+
+
+def make_quests(rng: random.Random, count: int):
+    return {
+        quest_id: {"id": quest_id, "requirements": {"objectives": {
+            key: rng.randint(5, 60) for key in rng.sample(EVENT_KEYS, rng.randint(1, 3))
+        }}}
+        for quest_id in range(1, count + 1)
+    }
+
+
+def scan(players, events) -> int:
+    """Старий підхід: кожна подія перебирає всі квести гравця"""
+    completed = 0
+    for telegram_id, key, amount in events:
+        for active in players[telegram_id]:
+            target = active.targets.get(key)
+            if target is None or active.counts[key] >= target:
+                continue
+            active.counts[key] = min(active.counts[key] + amount, target)
+            if active.counts[key] >= target:
+                active.remaining -= 1
+                completed += active.remaining == 0
+    return completed
+
+
+def main():
+    player_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    event_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    per_player = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    rng = random.Random(1)
+    quests = make_quests(rng, 500)
+    quest_ids = list(quests)
+    accepted = {telegram_id: rng.sample(quest_ids, per_player) for telegram_id in range(player_count)}
+    events = [(rng.randrange(player_count), rng.choice(EVENT_KEYS), rng.randint(1, 5)) for _ in range(event_count)]
+
+    def fresh(quest_id):
+        return ActiveQuest(quest_id, None, quests[quest_id]["requirements"]["objectives"])
+
+    scan_players = {telegram_id: [fresh(q) for q in ids] for telegram_id, ids in accepted.items()}
+    start = time.perf_counter()
+    scan_completed = scan(scan_players, events)
+    scan_elapsed = time.perf_counter() - start
+
+    tracker = QuestTracker(quests.get)
+    players = {}
+    for telegram_id, ids in accepted.items():
+        player = players[telegram_id] = PlayerQuests()
+        for quest_id in ids:
+            player.add(fresh(quest_id))
+    start = time.perf_counter()
+    indexed_completed = sum(len(tracker.record(players[telegram_id], ((key, amount),)))
+                            for telegram_id, key, amount in events)
+    indexed_elapsed = time.perf_counter() - start
+
+    assert scan_completed == indexed_completed
+    print(f"{player_count:,} гравців x {per_player} квестів, {event_count:,} подій, виконано {indexed_completed:,} квестів")
+    print(f"перебір квестів:  {event_count / scan_elapsed:12,.0f} подій/с")
+    print(f"індекс за подією: {event_count / indexed_elapsed:12,.0f} подій/с ({scan_elapsed / indexed_elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Натискання "Профіль": рендер тексту на кожне натискання (як було) проти
+кешу за версією персонажа. Кожне N-те натискання персонаж змінюється
+(нагорода), тож кеш промахується; решта - повторні натискання.
+python -m benchmarks.bench_render_cache [натискань] [гравців] [зміна кожні N]
+"""
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+from bot.services import character_service
+from bot.services.character_service import award, get_character, xp_required
+from bot.services.leaderboard import METRIC_LEVEL, get_rank
+from bot.services.localization import t
+from bot.services.profile_service import profile_screen
+from bot.services.render_cache import RENDERS
+
+
+# Повідомлення гравців, у яких показано профіль (для кешу)
+MESSAGES: Dict[int, SimpleNamespace] = {}
+
+
+async def render_every_time(user_id: int, shown: str) -> Optional[str]:
+    """Текст для редагування або None, якщо повідомлення вже його показує"""
+    character = await get_character(user_id)
+    stats = character.stats
+    text = t("profile.text", character.locale, level=character.level, hp=stats["hp"], max_hp=stats["max_hp"],
+             attack=stats["attack"], defense=stats["defense"], gold=stats["gold"], xp=character.xp,
+             xp_next=xp_required(character.level), rank=get_rank(METRIC_LEVEL, user_id) or "—")
+    return text if text != shown else None
+
+
+async def cached(user_id: int, shown: str) -> Optional[str]:
+    screen = await profile_screen(user_id)
+    message = MESSAGES.get(user_id)
+    if message is None:
+        message = MESSAGES[user_id] = SimpleNamespace(chat=SimpleNamespace(id=user_id), message_id=1, text=shown)
+    if RENDERS.shown(screen, message):
+        return None
+    message.text = screen.plain
+    RENDERS.mark_shown(screen, message)
+    return screen.plain
+
+
+async def run(taps: int, players: int, mutate_every: int, tap) -> tuple:
+    character_service.CACHE.clear()
+    characters = [await get_character(user_id) for user_id in range(players)]
+    shown = {user_id: "" for user_id in range(players)}
+    edits = 0
+    start = time.perf_counter()
+    for i in range(taps):
+        user_id = i % players
+        if mutate_every and i % mutate_every == 0:
+            award(characters[user_id], gold=1)
+        text = await tap(user_id, shown[user_id])
+        if text is not None:
+            edits += 1
+            shown[user_id] = text
+    return time.perf_counter() - start, edits
+
+
+def main():
+    taps = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    mutate_every = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    print(f"{taps:,} натискань, {players:,} гравців, зміна персонажа кожні {mutate_every} натискань")
+    elapsed, edits = asyncio.run(run(taps, players, mutate_every, render_every_time))
+    print(f"рендер щоразу:   {elapsed / taps * 1e6:6.2f} мкс/натискання")
+    RENDERS.clear()
+    elapsed, edits = asyncio.run(run(taps, players, mutate_every, cached))
+    print(f"кеш за версією:  {elapsed / taps * 1e6:6.2f} мкс/натискання, влучань {RENDERS.hit_rate:.0%}, "
+          f"редагувань {edits:,}, пропущено {RENDERS.skipped_edits:,}")
+
+
+if __name__ == "__main__":
+    main()
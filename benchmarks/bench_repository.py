@@ -0,0 +1,72 @@
+"""
+Навантаження на шар даних: читання персонажа з інвентарем + запис
+результату для кожного "апдейту" при конкурентних користувачах.
+Запити рахуються разом з пакетним скиданням write-behind кешу.
+python -m benchmarks.bench_repository [URL БД] [апдейтів] [конкурентність]
+(за замовчуванням - тимчасова SQLite через aiosqlite)
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from bot import database
+from bot.services.character_service import CACHE, award, get_character, save_character
+
+USERS = 500
+
+
+async def one_update(telegram_id: int, latencies: list) -> None:
+    start = time.perf_counter()
+    character = await get_character(telegram_id)
+    award(character, gold=5, xp=3)
+    await save_character(character)
+    latencies.append(time.perf_counter() - start)
+
+
+async def run(url: str, updates: int, concurrency: int) -> None:
+    engine = database.init_db(url, pool_size=10, max_overflow=0)
+    await database.create_tables()
+    queries = [0]
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: queries.__setitem__(0, queries[0] + 1))
+
+    # Прогрів: створення персонажів
+    for telegram_id in range(USERS):
+        await get_character(telegram_id)
+
+    queries[0] = 0
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(i: int):
+        async with semaphore:
+            await one_update(i % USERS, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(updates)))
+    await CACHE.flush()
+    elapsed = time.perf_counter() - start
+    await database.close_db()
+
+    latencies.sort()
+    print(f"{updates} апдейтів, конкурентність {concurrency}: {updates / elapsed:,.0f} апдейтів/с")
+    print(f"запитів на апдейт: {queries[0] / updates:.3f} (кеш: {CACHE.hits} влучань, {CACHE.misses} промахів)")
+    print(f"p50 {latencies[len(latencies) // 2] * 1e3:.3f} мс, p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.3f} мс")
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else None
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    if url:
+        asyncio.run(run(url, updates, concurrency))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", updates, concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Пропускна здатність при послідовній обробці: без замків, замок на гравця
+(USER_LOCKS) і один глобальний замок. Хендлер імітує запит до БД/Telegram.
+python -m benchmarks.bench_serialization [гравців] [оновлень на гравця] [мс на оновлення]
+"""
+import asyncio
+import sys
+import time
+from contextlib import nullcontext
+
+from bot.services.user_locks import UserLocks
+
+
+async def run(users: int, per_user: int, work: float, guard) -> float:
+    async def update(user_id: int):
+        async with guard(user_id):
+            await asyncio.sleep(work)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(update(user_id) for _ in range(per_user) for user_id in range(users)))
+    return time.perf_counter() - start
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    work = (float(sys.argv[3]) if len(sys.argv) > 3 else 2.0) / 1000
+    total = users * per_user
+    print(f"{users:,} гравців x {per_user} оновлень, {work * 1000:.0f} мс на оновлення")
+
+    elapsed = asyncio.run(run(users, per_user, work, lambda user_id: nullcontext()))
+    print(f"без замків (з гонками):  {total / elapsed:10,.0f} оновлень/с")
+    locks = UserLocks()
+    elapsed = asyncio.run(run(users, per_user, work, locks.hold))
+    print(f"замок на гравця:         {total / elapsed:10,.0f} оновлень/с (записів після: {len(locks)})")
+    global_lock = []
+
+    def hold_global(user_id):
+        if not global_lock:
+            global_lock.append(asyncio.Lock())
+        return global_lock[0]
+    global_total = min(total, 1_000)
+    elapsed = asyncio.run(run(global_total // per_user, per_user, work, hold_global))
+    print(f"один глобальний замок:   {global_total / elapsed:10,.0f} оновлень/с ({global_total:,} оновлень)")
+
+
+if __name__ == "__main__":
+    main()
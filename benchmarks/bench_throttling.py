@@ -0,0 +1,70 @@
+"""
+Накладні витрати middleware обмеження частоти на оновлення: виклик
+хендлера напряму проти виклику через ThrottlingMiddleware, для кількох
+активних гравців і для мільйона різних (LRU обмеженого розміру).
+python -m benchmarks.bench_throttling [оновлень]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from aiogram.types import Chat, Message, User
+
+from bot.middlewares.throttling import MAX_KEYS, ThrottlingMiddleware
+
+
+async def handler(event, data):
+    return None
+
+
+def make_events(users: int, count: int):
+    cached = {}
+    events = []
+    for i in range(count):
+        user_id = i % users
+        if user_id not in cached:
+            user = User(id=user_id, is_bot=False, first_name="Герой")
+            message = Message(message_id=1, date=0, chat=Chat(id=user_id, type="private"), text="/profile")
+            cached[user_id] = (message, {"event_from_user": user})
+        events.append(cached[user_id])
+    return events
+
+
+async def run(events, middleware) -> float:
+    start = time.perf_counter()
+    if middleware is None:
+        for event, data in events:
+            await handler(event, data)
+    else:
+        for event, data in events:
+            await middleware(handler, event, data)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    few = make_events(1_000, count)
+    base = asyncio.run(run(few, None))
+    print(f"хендлер напряму:                   {base / count * 1e6:6.3f} мкс/оновлення")
+
+    middleware = ThrottlingMiddleware()
+    elapsed = asyncio.run(run(few, middleware))
+    print(f"з middleware, 1 000 гравців:       {elapsed / count * 1e6:6.3f} мкс/оновлення "
+          f"(+{(elapsed - base) / count * 1e6:.3f}), відкинуто {middleware.throttled:,}")
+
+    many = make_events(count, count)
+    elapsed = asyncio.run(run(many, ThrottlingMiddleware()))
+    print(f"з middleware, усі гравці різні:    {elapsed / count * 1e6:6.3f} мкс/оновлення")
+    # Пам'ять окремим проходом: tracemalloc сповільнює виконання
+    middleware = ThrottlingMiddleware()
+    tracemalloc.start()
+    asyncio.run(run(many, middleware))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{count:,} різних гравців: записів {len(middleware.local.buckets):,} (межа {MAX_KEYS:,}), "
+          f"пік пам'яті {peak / 2 ** 20:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
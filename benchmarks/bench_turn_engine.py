@@ -0,0 +1,50 @@
+"""
+Час розіграшу одного раунду рейду 20 на 1 (боса).
+python -m benchmarks.bench_turn_engine [кількість раундів]
+"""
+import random
+import sys
+import time
+
+from bot.services.battle_service import CLASSES
+from bot.services.turn_engine import ACTION_SKILL, Skill, TurnEngine
+
+FIREBALL = Skill("Вогняна куля", mult=1.8, cost=20, cooldown=3, magic=True)
+POISON = Skill("Отрута", mult=0.8, cost=10, cooldown=2, effect=("hp", -5, 3))
+
+
+def build_raid() -> TurnEngine:
+    engine = TurnEngine()
+    classes = list(CLASSES.values())
+    for i in range(20):
+        stats = classes[i % len(classes)]
+        engine.add(f"{stats['name']} {i}", 0, stats["hp"], stats["attack"], stats["defense"], stats["speed"],
+                   magic=stats["magic"], mp=stats["mp"], crit=stats["crit"], skills=[FIREBALL, POISON])
+    # Бос із дуже великим HP, щоб раунди не закінчувались
+    engine.add("Бос", 1, 10**9, 200, 80, 35)
+    return engine
+
+
+def main(rounds: int = 10_000):
+    rng = random.Random(1)
+    engine = build_raid()
+    boss = 20
+    actions = {i: (ACTION_SKILL, boss, i % 2) for i in range(20)}
+    timings = []
+    for _ in range(rounds):
+        # Відновлюємо HP героїв, щоб усі 21 учасник діяли кожен раунд
+        for i in range(20):
+            engine.hp[i] = engine.max_hp[i]
+            engine.mp[i] = 200
+        start = time.perf_counter()
+        engine.resolve_round(actions, rng)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    mean = sum(timings) / rounds
+    print(f"Рейд 20 на 1, {rounds} раундів")
+    print(f"середнє {mean * 1e6:.1f} мкс, p50 {timings[rounds // 2] * 1e6:.1f} мкс, "
+          f"p99 {timings[int(rounds * 0.99)] * 1e6:.1f} мкс")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
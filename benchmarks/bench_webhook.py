@@ -0,0 +1,125 @@
+"""
+Локальний навантажувальний тест: синтетичні оновлення через вебхук
+(aiohttp-сервер, N паралельних відправників як у Telegram) проти long
+polling (фейкова сесія віддає getUpdates пакетами по 100 із затримкою
+мережі). Обробник імітує роботу затримкою.
+python -m benchmarks.bench_webhook [оновлень] [мс на оновлення] [rtt мс] [відправників]
+"""
+import asyncio
+import sys
+import time
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetMe, GetUpdates
+from aiogram.types import Message, Update, User
+from aiohttp import ClientSession, TCPConnector, web
+
+from bot.webhook import WebhookServer
+
+MAX_IN_FLIGHT = 100
+
+
+def make_update(update_id: int) -> dict:
+    return {"update_id": update_id, "message": {
+        "message_id": update_id, "date": 0, "chat": {"id": update_id % 1000, "type": "private"},
+        "from": {"id": update_id % 1000, "is_bot": False, "first_name": "Герой"}, "text": "/start",
+    }}
+
+
+class PollingSession(BaseSession):
+    """Сесія без мережі: getUpdates віддає чергу пакетами з затримкою rtt"""
+
+    def __init__(self, updates, rtt: float):
+        super().__init__()
+        self.updates = updates
+        self.rtt = rtt
+
+    async def make_request(self, bot, method, timeout=None):
+        if isinstance(method, GetMe):
+            return User(id=42, is_bot=True, first_name="Eldoria")
+        if isinstance(method, GetUpdates):
+            await asyncio.sleep(self.rtt)
+            offset = method.offset or 0
+            return self.updates[offset:offset + (method.limit or 100)]
+        return True
+
+    async def close(self):
+        pass
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+
+def make_dispatcher(work: float, done: asyncio.Event, total: int) -> Dispatcher:
+    router = Router()
+    handled = [0]
+
+    @router.message()
+    async def handler(message: Message):
+        await asyncio.sleep(work)
+        handled[0] += 1
+        if handled[0] == total:
+            done.set()
+
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    return dispatcher
+
+
+async def run_polling(total: int, work: float, rtt: float) -> float:
+    done = asyncio.Event()
+    dispatcher = make_dispatcher(work, done, total)
+    # update_id з 0, тож offset у getUpdates збігається з індексом у списку
+    bot = Bot("42:TEST", session=PollingSession([], rtt))
+    bot.session.updates = [Update.model_validate(make_update(i), context={"bot": bot}) for i in range(total)]
+    start = time.perf_counter()
+    polling = asyncio.create_task(dispatcher.start_polling(
+        bot, handle_signals=False, close_bot_session=False, tasks_concurrency_limit=MAX_IN_FLIGHT))
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    await dispatcher.stop_polling()
+    await polling
+    return elapsed
+
+
+async def run_webhook(total: int, work: float, senders: int) -> float:
+    done = asyncio.Event()
+    server = WebhookServer(make_dispatcher(work, done, total), Bot("42:TEST"), max_in_flight=MAX_IN_FLIGHT)
+    runner = web.AppRunner(server.app("/webhook"), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    queue = iter(range(total))
+
+    async def sender(http: ClientSession):
+        for update_id in queue:
+            async with http.post(f"http://127.0.0.1:{port}/webhook", json=make_update(update_id)) as response:
+                assert response.status == 200
+
+    async with ClientSession(connector=TCPConnector(limit=senders)) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(sender(http) for _ in range(senders)))
+        await done.wait()
+        elapsed = time.perf_counter() - start
+    await server.drain()
+    await runner.cleanup()
+    await server.bot.session.close()
+    return elapsed
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    work = (float(sys.argv[2]) if len(sys.argv) > 2 else 5.0) / 1000
+    rtt = (float(sys.argv[3]) if len(sys.argv) > 3 else 50.0) / 1000
+    senders = int(sys.argv[4]) if len(sys.argv) > 4 else 40
+    print(f"{total:,} оновлень, обробка {work * 1000:.0f} мс, до {MAX_IN_FLIGHT} в обробці одночасно")
+    elapsed = asyncio.run(run_polling(total, work, rtt))
+    print(f"long polling (rtt {rtt * 1000:.0f} мс):   {total / elapsed:10,.0f} оновлень/с")
+    elapsed = asyncio.run(run_webhook(total, work, senders))
+    print(f"вебхук ({senders} відправників):    {total / elapsed:10,.0f} оновлень/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Синтетичне навантаження на справжній Dispatcher бота без Telegram.
+
+Кожен віртуальний гравець проходить сценарій /start -> hunt -> hunt:attack
+xN -> rest: оновлення Message/CallbackQuery будуються як від Telegram і
+подаються в dp.feed_update() з усіма middleware та хендлерами. Bot
+працює через сесію-заглушку, яка записує вихідні виклики і пам'ятає
+останній текст у кожному чаті (його бачить наступний callback). Черга
+outbox не запускається - відправки йдуть напряму в заглушку.
+Звіт: оновлень/с, p50/p99 на маршрут, пікова пам'ять процесу.
+python -m benchmarks.loadtest [гравців] [атак] [--concurrency N] [--db URL] [--throttle]
+"""
+import argparse
+import asyncio
+import resource
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import EditMessageText, GetMe, SendMessage
+from aiogram.types import Chat, Message, Update, User
+
+from bot import database
+from bot.main import build_dispatcher
+from bot.services import character_service, quest_service
+
+BOT_ID = 42
+FIRST_USER_ID = 1_000_000
+
+
+class RecordingSession(BaseSession):
+    """Сесія без мережі: рахує виклики API і пам'ятає останній текст чату"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: Counter = Counter()
+        self.last_text: Dict[int, str] = {}
+        self._message_id = 0
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls[type(method).__name__] += 1
+        if isinstance(method, GetMe):
+            return User(id=BOT_ID, is_bot=True, first_name="Eldoria")
+        if isinstance(method, SendMessage):
+            self._message_id += 1
+            self.last_text[method.chat_id] = method.text
+            return Message(message_id=self._message_id, date=datetime.now(), text=method.text,
+                           chat=Chat(id=method.chat_id, type="private"))
+        if isinstance(method, EditMessageText):
+            self.last_text[method.chat_id] = method.text
+        return True
+
+    async def close(self):
+        pass
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+
+def scenario(attacks: int) -> List[str]:
+    """Маршрути одного гравця по черзі (команда або callback data)"""
+    return ["/start", "hunt"] + ["hunt:attack"] * attacks + ["rest"]
+
+
+class VirtualUsers:
+    """Будує оновлення гравців і міряє час їх обробки диспетчером"""
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.session: RecordingSession = bot.session
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors = 0
+        self._update_id = 0
+
+    def _update(self, user_id: int, route: str) -> Update:
+        self._update_id += 1
+        user = {"id": user_id, "is_bot": False, "first_name": "Герой", "language_code": "uk"}
+        chat = {"id": user_id, "type": "private"}
+        if route.startswith("/"):
+            payload = {"message": {"message_id": self._update_id, "date": int(time.time()), "chat": chat,
+                                   "from": user, "text": route}}
+        else:
+            shown = {"message_id": user_id, "date": int(time.time()), "chat": chat,
+                     "from": {"id": BOT_ID, "is_bot": True, "first_name": "Eldoria"},
+                     "text": self.session.last_text.get(user_id, "")}
+            payload = {"callback_query": {"id": str(self._update_id), "from": user, "chat_instance": str(user_id),
+                                          "message": shown, "data": route}}
+        return Update.model_validate({"update_id": self._update_id, **payload}, context={"bot": self.bot})
+
+    async def play(self, user_id: int, routes: List[str], slots: asyncio.Semaphore) -> None:
+        for route in routes:
+            update = self._update(user_id, route)
+            async with slots:
+                start = time.perf_counter()
+                try:
+                    await self.dispatcher.feed_update(self.bot, update)
+                except Exception:
+                    self.errors += 1
+                self.latencies[route].append(time.perf_counter() - start)
+
+    @property
+    def total(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+
+async def run(users: int, attacks: int, concurrency: int = 100, db_url: Optional[str] = None,
+              throttle: bool = False, dispatcher: Optional[Dispatcher] = None) -> Dict:
+    """Проганяє сценарій для users гравців; повертає звіт"""
+    if db_url:
+        database.init_db(db_url)
+        await database.create_tables()
+    bot = Bot(f"{BOT_ID}:TEST", session=RecordingSession())
+    load = VirtualUsers(dispatcher or build_dispatcher(throttle=throttle), bot)
+    slots = asyncio.Semaphore(concurrency)
+    routes = scenario(attacks)
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(load.play(FIRST_USER_ID + i, routes, slots) for i in range(users)))
+        elapsed = time.perf_counter() - start
+    finally:
+        if db_url:
+            await quest_service.TRACKER.flush()
+            await character_service.CACHE.flush()
+            await database.close_db()
+    return {
+        "updates": load.total,
+        "errors": load.errors,
+        "seconds": elapsed,
+        "routes": {route: (np.percentile(values, 50), np.percentile(values, 99), len(values))
+                   for route, values in load.latencies.items()},
+        "calls": dict(load.session.calls),
+        # ru_maxrss у Linux - кілобайти
+        "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Навантажувальний тест диспетчера")
+    parser.add_argument("users", type=int, nargs="?", default=2000)
+    parser.add_argument("attacks", type=int, nargs="?", default=5)
+    parser.add_argument("--concurrency", type=int, default=100, help="оновлень в обробці одночасно")
+    parser.add_argument("--db", help="URL бази, напр. sqlite:///loadtest.db (без нього - без збереження)")
+    parser.add_argument("--throttle", action="store_true", help="з обмеженням частоти дій")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.users, args.attacks, args.concurrency, args.db, args.throttle))
+    print(f"{args.users:,} гравців, {report['updates']:,} оновлень за {report['seconds']:.2f} с: "
+          f"{report['updates'] / report['seconds']:,.0f} оновлень/с, помилок {report['errors']}")
+    print(f"{'маршрут':<14}{'оновлень':>10}{'p50 мс':>10}{'p99 мс':>10}")
+    for route, (p50, p99, count) in report["routes"].items():
+        print(f"{route:<14}{count:>10,}{p50 * 1000:>10.2f}{p99 * 1000:>10.2f}")
+    print("виклики API:", ", ".join(f"{name} {count:,}" for name, count in sorted(report["calls"].items())))
+    print(f"пікова пам'ять процесу: {report['peak_mb']:.0f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,4 +6,26 @@ load_dotenv()
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 REDIS_HOST = os.getenv('REDIS_HOST', 'redis')
 REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
-DATABASE_URL = os.getenv('DATABASE_URL') 
\ No newline at end of file
+DATABASE_URL = os.getenv('DATABASE_URL') 
+# Пул з'єднань з БД
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 5))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+# Redis для FSM та стану боїв/відпочинку (зберігається між перезапусками; воркер - один)
+USE_REDIS = os.getenv('USE_REDIS', 'false').lower() in ('1', 'true', 'yes')
+# Режим вебхука замість long polling (один процес: блокування гравців - у пам'яті)
+USE_WEBHOOK = os.getenv('USE_WEBHOOK', 'false').lower() in ('1', 'true', 'yes')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8080))
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+# Оновлень в обробці одночасно (і для вебхука, і для polling)
+MAX_IN_FLIGHT_UPDATES = int(os.getenv('MAX_IN_FLIGHT_UPDATES', 100))
+# Лог: рівень, JSON, частка записів для частих хендлерів ("хендлер=частка,...")
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_JSON = os.getenv('LOG_JSON', 'true').lower() in ('1', 'true', 'yes')
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', 'process_hunt_action=0.1')
+# Локальний ендпоінт /metrics для Prometheus (0 - вимкнено)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9100))
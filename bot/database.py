@@ -0,0 +1,103 @@
+"""
+Асинхронний рушій SQLAlchemy з обмеженим пулом з'єднань.
+
+Якщо DATABASE_URL не задано, БД вимкнена і сервіси працюють зі
+значеннями за замовчуванням.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from bot.config import DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_SIZE, DB_POOL_TIMEOUT
+from bot.services import metrics
+from models.base import Base
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+# Синхронні драйвери з DATABASE_URL замінюються на асинхронні
+_ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+
+# INSERT з підтримкою ON CONFLICT для діалектів, що їх використовує бот
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+DB_SECONDS = metrics.histogram("db_query_seconds", "Database statement latency", ("statement",))
+
+
+def _query_started(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    DB_SECONDS.observe(time.perf_counter() - started, statement.split(None, 1)[0].upper())
+
+
+def async_url(url: str) -> str:
+    for prefix, replacement in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return replacement + url[len(prefix):]
+    return url
+
+
+def init_db(url: Optional[str] = DATABASE_URL, pool_size: int = DB_POOL_SIZE,
+            max_overflow: int = DB_MAX_OVERFLOW, pool_timeout: float = DB_POOL_TIMEOUT) -> Optional[AsyncEngine]:
+    """Створює рушій і фабрику сесій (повторний виклик замінює їх)"""
+    global _engine, _sessionmaker
+    if not url:
+        _engine = _sessionmaker = None
+        return None
+    _engine = create_async_engine(
+        async_url(url),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=True,
+    )
+    # Час кожного запиту - у гістограму метрик
+    event.listen(_engine.sync_engine, "before_cursor_execute", _query_started)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _query_finished)
+    _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+def get_engine() -> Optional[AsyncEngine]:
+    return _engine
+
+
+def get_sessionmaker() -> Optional[async_sessionmaker]:
+    return _sessionmaker
+
+
+def session() -> AsyncSession:
+    """Нова сесія з пулу (використовувати як async with)"""
+    if _sessionmaker is None:
+        raise RuntimeError("Database is not configured")
+    return _sessionmaker()
+
+
+def insert(session: AsyncSession, model):
+    """INSERT діалекту сесії (з on_conflict_do_update)"""
+    return _INSERTS[session.bind.dialect.name](model)
+
+
+async def create_tables() -> None:
+    """Створює таблиці (для тестів і локального запуску без міграцій)"""
+    async with _engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def close_db() -> None:
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = _sessionmaker = None
@@ -0,0 +1,16 @@
+from aiogram import Router
+from aiogram.types import CallbackQuery
+from ..utils.callback_router import CallbackAction, CallbackRouter
+
+# Маршрути callback-кнопок; модулі хендлерів реєструються через
+# @CALLBACKS.exact(...) / @CALLBACKS.prefix(...)
+CALLBACKS = CallbackRouter()
+
+router = Router()
+
+def register_handlers(dp):
+    dp.include_router(router)
+
+@router.callback_query(CALLBACKS.match)
+async def dispatch_callback(callback: CallbackQuery, action: CallbackAction):
+    await action.handler(callback, *action.args)
@@ -2,6 +2,7 @@ from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import Command
 from ..services.battle_service import quick_hunt
+from ..services import outbox
 
 router = Router()
 
@@ -11,4 +12,4 @@ def register_handlers(dp):
 @router.message(Command("hunt", "explore"))
 async def cmd_hunt(message: Message):
     text, kb = await quick_hunt(message.from_user.id)
-    await message.answer(text, reply_markup=kb) 
\ No newline at end of file
+    await outbox.answer(message, text, reply_markup=kb) 
\ No newline at end of file
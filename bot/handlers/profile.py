@@ -1,7 +1,10 @@
 from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import Command
-from ..services.profile_service import get_profile_text, get_profile_keyboard
+from ..keyboards.main_keyboard import PROFILE_KEYBOARD
+from ..services.profile_service import get_profile_text
+from ..services.character_service import user_locale
+from ..services import outbox
 
 router = Router()
 
@@ -11,5 +14,4 @@ def register_handlers(dp):
 @router.message(Command("profile", "stats"))
 async def cmd_profile(message: Message):
     text = await get_profile_text(message.from_user.id)
-    kb = get_profile_keyboard()
-    await message.answer(text, reply_markup=kb) 
\ No newline at end of file
+    await outbox.answer(message, text, reply_markup=PROFILE_KEYBOARD.get(await user_locale(message.from_user.id))) 
\ No newline at end of file
@@ -1,15 +1,33 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import CallbackQuery
-from ..services.profile_service import list_quests, accept_quest
+from ..keyboards.main_keyboard import MAIN_MENU
+from ..services.quest_service import list_quests, accept_quest
+from ..services.character_service import user_locale
+from ..services.localization import t
+from ..services import outbox
+from .callbacks import CALLBACKS
 
 router = Router()
 
 def register_handlers(dp):
     dp.include_router(router)
 
-@router.callback_query(F.data.startswith("quest:"))
-async def process_quest(call: CallbackQuery):
-    action, quest_id = call.data.split(':')
-    if action == 'quest_accept':
-        response = await accept_quest(call.from_user.id, int(quest_id))
-        await call.message.answer(response) 
\ No newline at end of file
+# Список квестів
+@CALLBACKS.exact("quests")
+async def process_quests_callback(callback: CallbackQuery):
+    locale = await user_locale(callback.from_user.id)
+    text = await list_quests(callback.from_user.id)
+    if text != callback.message.text:
+        await outbox.edit_text(callback.message, text, reply_markup=MAIN_MENU.get(locale))
+    else:
+        await callback.answer(t("quests.already_open", locale))
+
+# Прийняття квесту: "quest:<id>"
+@CALLBACKS.prefix("quest", int)
+async def process_quest_action(callback: CallbackQuery, quest_id: int):
+    locale = await user_locale(callback.from_user.id)
+    response = await accept_quest(callback.from_user.id, quest_id)
+    if response != callback.message.text:
+        await outbox.edit_text(callback.message, response, reply_markup=MAIN_MENU.get(locale))
+    else:
+        await callback.answer(t("quest.already_accepted", locale))
@@ -2,6 +2,7 @@ from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import Command
 from ..services.rest_service import rest
+from ..services import outbox
 
 router = Router()
 
@@ -13,4 +14,4 @@ async def cmd_rest(message: Message):
     # Очікуємо формат "/rest 1h30m" або "/rest"
     args = message.text.split(maxsplit=1)[1] if len(message.text.split()) > 1 else ""
     response = await rest(message.from_user.id, args)
-    await message.answer(response) 
\ No newline at end of file
+    await outbox.answer(message, response) 
\ No newline at end of file
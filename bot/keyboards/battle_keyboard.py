@@ -0,0 +1,13 @@
+from bot.keyboards.frozen import LocalizedKeyboard
+
+# Клавіатури незмінні (FrozenKeyboard: присвоєння полів кидає помилку),
+# тому один екземпляр на фазу бою і локаль спільний для всіх гравців.
+
+BATTLE_KEYBOARD = LocalizedKeyboard([
+    [("button.attack", "hunt:attack"), ("button.defend", "hunt:defend")],
+    [("button.flee", "hunt:flee"), ("button.back", "menu:main")],
+])
+
+EXPLORE_KEYBOARD = LocalizedKeyboard([
+    [("button.back", "menu:main")],
+])
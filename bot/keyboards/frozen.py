@@ -0,0 +1,54 @@
+"""
+Незмінні inline-клавіатури.
+
+Статичні клавіатури будуються один раз і спільні для всіх гравців;
+присвоєння полів кидає помилку, тож спільний екземпляр ніхто випадково
+не змінить. Підписи кнопок беруться з каталогу текстів: клавіатура
+будується один раз на локаль і перебудовується після перезавантаження
+каталогу.
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from pydantic import ConfigDict
+
+from bot.services import localization
+from bot.services.localization import DEFAULT_LOCALE
+
+
+class FrozenButton(InlineKeyboardButton):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenKeyboard(InlineKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+def frozen_keyboard(rows: Sequence[Sequence[Tuple[str, str]]]) -> FrozenKeyboard:
+    """Клавіатура з рядів кнопок (текст, callback_data)"""
+    return FrozenKeyboard(inline_keyboard=[
+        [FrozenButton(text=text, callback_data=data) for text, data in row] for row in rows
+    ])
+
+
+class LocalizedKeyboard:
+    """Заморожені клавіатури з рядів (ключ тексту, callback_data), по одній на локаль"""
+    __slots__ = ("rows", "_catalog", "_keyboards")
+
+    def __init__(self, rows: Sequence[Sequence[Tuple[str, str]]]):
+        self.rows = rows
+        self._catalog: Optional[localization.Catalog] = None
+        self._keyboards: Dict[str, FrozenKeyboard] = {}
+
+    def get(self, locale: str = DEFAULT_LOCALE) -> FrozenKeyboard:
+        catalog = localization.CATALOG
+        # Новий каталог (перезавантаження) - старі підписи більше не дійсні
+        if catalog is not self._catalog:
+            self._catalog = catalog
+            self._keyboards = {}
+        keyboard = self._keyboards.get(locale)
+        if keyboard is None:
+            keyboard = self._keyboards[locale] = frozen_keyboard([
+                [(catalog.render(key, locale), data) for key, data in row] for row in self.rows
+            ])
+        return keyboard
@@ -1,15 +1,12 @@
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from bot.keyboards.frozen import LocalizedKeyboard
 
-def main_menu() -> InlineKeyboardMarkup:
-    """Create main menu keyboard"""
-    buttons = [
-        [
-            InlineKeyboardButton(text="👤 Профіль", callback_data="profile"),
-            InlineKeyboardButton(text="🏕 Відпочинок", callback_data="rest")
-        ],
-        [
-            InlineKeyboardButton(text="🗡 Полювання", callback_data="hunt"),
-            InlineKeyboardButton(text="📜 Квести", callback_data="quests")
-        ]
-    ]
-    return InlineKeyboardMarkup(inline_keyboard=buttons) 
\ No newline at end of file
+# Головне меню: один екземпляр на локаль для всіх повідомлень
+MAIN_MENU = LocalizedKeyboard([
+    [("button.profile", "profile"), ("button.rest", "rest")],
+    [("button.hunt", "hunt"), ("button.quests", "quests")],
+])
+
+PROFILE_KEYBOARD = LocalizedKeyboard([
+    [("button.stats", "profile:stats"), ("button.inventory", "profile:inventory")],
+    [("button.back", "menu:main")],
+])
@@ -1,25 +1,49 @@
 import asyncio
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.client.default import DefaultBotProperties
-from bot.config import BOT_TOKEN
+from redis.asyncio import Redis
+from bot.config import (
+    BOT_TOKEN, LOG_JSON, LOG_LEVEL, LOG_SAMPLE_RATES, MAX_IN_FLIGHT_UPDATES, METRICS_HOST, METRICS_PORT,
+    REDIS_HOST, REDIS_PORT, USE_REDIS, USE_WEBHOOK, WEBHOOK_HOST, WEBHOOK_PATH, WEBHOOK_PORT, WEBHOOK_SECRET,
+    WEBHOOK_URL,
+)
+from bot.database import close_db, init_db
+from bot.webhook import run_webhook
+from bot.utils.structured_log import parse_sample_rates, setup_logging
+from bot.middlewares.access_log import setup_access_log
+from bot.middlewares.metrics import setup_metrics
+from bot.middlewares.serialization import setup_serialization
+from bot.middlewares.throttling import setup_throttling
+from bot.services.expiry_service import run_expiry_loop
+from bot.services.battle_recorder import flush_finished_battles, run_recorder_loop
+from bot.services.character_service import CACHE as CHARACTER_CACHE
+from bot.services.game_store import use_redis
+from bot.services import battle_service, leaderboard, ledger_service, localization, metrics, outbox, rest_service
+from bot.services.auction_service import load_listings, run_auction_loop
+from bot.services import quest_catalog, quest_service
 
 # Реєстрація хендлерів
+from bot.handlers.callbacks import register_handlers as register_callbacks
 from bot.handlers.start import register_handlers as register_start
 from bot.handlers.profile import register_handlers as register_profile
 from bot.handlers.rest import register_handlers as register_rest
 from bot.handlers.hunt import register_handlers as register_hunt
 from bot.handlers.quests import register_handlers as register_quests
 
-async def main():
-    # Use memory storage instead of Redis
-    storage = MemoryStorage()
-    
-    dp = Dispatcher(storage=storage)
-    bot = Bot(
-        token=BOT_TOKEN,
-        default=DefaultBotProperties(parse_mode="HTML")
-    )
+def build_dispatcher(storage=None, redis=None, throttle: bool = True) -> Dispatcher:
+    """Dispatcher з middleware і хендлерами бота (також для навантажувального тесту)"""
+    dp = Dispatcher(storage=storage or MemoryStorage())
+    # Обмеження частоти дій гравця (у Redis - спільне для воркерів)
+    if throttle:
+        setup_throttling(dp, redis)
+    # Оновлення одного гравця - по черзі, різних гравців - паралельно
+    setup_serialization(dp)
+    # Запис на кожне оброблене оновлення: user_id, хендлер, час обробки
+    setup_access_log(dp)
+    # Час і помилки хендлерів для /metrics
+    setup_metrics(dp)
 
     # Підключення хендлерів
     register_start(dp)
@@ -27,9 +51,85 @@ async def main():
     register_rest(dp)
     register_hunt(dp)
     register_quests(dp)
+    # Усі callback-кнопки - один хендлер з розбором data за словником
+    register_callbacks(dp)
+    return dp
+
+
+async def main():
+    # Лог через чергу: запис і форматування - в окремому потоці
+    log_listener = setup_logging(LOG_LEVEL, LOG_JSON, parse_sample_rates(LOG_SAMPLE_RATES))
+    # Пул з'єднань з БД (без DATABASE_URL бот працює без збереження)
+    init_db()
+    # Рейтинги з БД (потоковий запит)
+    await leaderboard.rebuild()
+    await load_listings()
+    # Каталог квестів (вбудовані квести додаються в таблицю)
+    await quest_catalog.load_catalog()
+    # Тексти інтерфейсу з таблиці localization
+    await localization.load_catalog()
+
+    # FSM та стан боїв/відпочинку - в Redis, якщо він увімкнений
+    redis = None
+    if USE_REDIS:
+        redis = Redis(host=REDIS_HOST, port=REDIS_PORT)
+        storage = RedisStorage(redis)
+        use_redis(redis)
+        # Таймери живуть у процесі - відновлюємо їх для боїв і відпочинку з Redis
+        await battle_service.rearm_timers()
+        await rest_service.rearm_timers()
+    else:
+        storage = MemoryStorage()
+    
+    dp = build_dispatcher(storage, redis)
+    bot = Bot(
+        token=BOT_TOKEN,
+        default=DefaultBotProperties(parse_mode="HTML")
+    )
+
+    # Вихідні повідомлення - через чергу з лімітами Telegram
+    outbox.start(bot)
+    # Евікція прострочених боїв/відпочинку та сповіщення гравців
+    expiry_task = asyncio.create_task(run_expiry_loop(bot))
+    recorder_task = asyncio.create_task(run_recorder_loop())
+    # Пакетний запис змін персонажів
+    cache_task = asyncio.create_task(CHARACTER_CACHE.run_flush_loop())
+    auction_task = asyncio.create_task(run_auction_loop())
+    ledger_task = asyncio.create_task(ledger_service.run_ledger_loop())
+    localization_task = asyncio.create_task(localization.run_reload_loop())
+    # Пакетний запис прогресу квестів
+    quest_task = asyncio.create_task(quest_service.TRACKER.run_flush_loop())
+
+    metrics_runner = await metrics.start_server(METRICS_HOST, METRICS_PORT) if METRICS_PORT else None
 
     print("Bot is starting...")
-    await dp.start_polling(bot)
+    try:
+        if USE_WEBHOOK:
+            await run_webhook(dp, bot, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_HOST, WEBHOOK_PORT,
+                              secret=WEBHOOK_SECRET, max_in_flight=MAX_IN_FLIGHT_UPDATES)
+        else:
+            # tasks_concurrency_limit з aiogram 3.20 (мінімальна версія в requirements.txt)
+            await dp.start_polling(bot, tasks_concurrency_limit=MAX_IN_FLIGHT_UPDATES, close_bot_session=False)
+    finally:
+        expiry_task.cancel()
+        recorder_task.cancel()
+        cache_task.cancel()
+        auction_task.cancel()
+        ledger_task.cancel()
+        localization_task.cancel()
+        quest_task.cancel()
+        await outbox.stop()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await bot.session.close()
+        await quest_service.TRACKER.flush()
+        await CHARACTER_CACHE.flush()
+        await ledger_service.roll_snapshots()
+        await flush_finished_battles()
+        await close_db()
+        if redis is not None:
+            await redis.aclose()
+        log_listener.stop()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Update middlewares (throttling, per-user serialization)
+"""
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+Журнал оброблених оновлень.
+
+Внутрішній middleware (успадковується всіма роутерами): після хендлера
+пише один структурований запис з user_id, ім'ям хендлера, даними
+callback/текстом і часом обробки. Форматування відкладене
+(structured_log), часті хендлери проріджуються через SAMPLE_RATES.
+"""
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+from bot.utils.callback_router import handler_name
+from bot.utils.structured_log import sampled
+
+logger = logging.getLogger("bot.access")
+
+
+class AccessLogMiddleware(BaseMiddleware):
+    """Час обробки і контекст кожного оновлення в лог"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            name = handler_name(data)
+            if logger.isEnabledFor(logging.INFO) and sampled(name):
+                latency_ms = round((time.perf_counter() - start) * 1000, 3)
+                user = data.get("event_from_user")
+                payload = event.data if isinstance(event, CallbackQuery) else getattr(event, "text", None)
+                logger.info("%s handled in %.3f ms", name, latency_ms, extra={
+                    "user_id": user.id if user else None,
+                    "handler": name,
+                    "latency_ms": latency_ms,
+                    "payload": payload,
+                })
+
+
+def setup_access_log(dp) -> AccessLogMiddleware:
+    middleware = AccessLogMiddleware()
+    dp.message.middleware(middleware)
+    dp.callback_query.middleware(middleware)
+    return middleware
@@ -0,0 +1,40 @@
+"""
+Метрики хендлерів: гістограма часу обробки і лічильник помилок за
+ім'ям хендлера (внутрішній middleware, успадковується всіма роутерами).
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.services import metrics
+from bot.utils.callback_router import handler_name
+
+HANDLER_SECONDS = metrics.histogram("handler_seconds", "Update handler latency", ("handler",))
+HANDLER_ERRORS = metrics.counter("handler_errors", "Update handlers that raised", ("handler",))
+
+
+class MetricsMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        name = handler_name(data)
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(name)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - start, name)
+
+
+def setup_metrics(dp) -> MetricsMiddleware:
+    middleware = MetricsMiddleware()
+    dp.message.middleware(middleware)
+    dp.callback_query.middleware(middleware)
+    return middleware
@@ -0,0 +1,43 @@
+"""
+Послідовна обробка оновлень одного гравця.
+
+aiogram обробляє оновлення паралельно, тож два швидкі натискання
+hunt:attack могли перемежовуватись у process_battle_action (прочитати
+стан бою до await і записати після) і губити зміну HP. Цей middleware
+виконує хендлери одного гравця по черзі через USER_LOCKS, а оновлення
+різних гравців - паралельно. Черга діє в межах одного процесу: бот
+запускається одним воркером (див. user_locks).
+"""
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.services.user_locks import USER_LOCKS, UserLocks
+
+
+class SerializeMiddleware(BaseMiddleware):
+    """Хендлери одного гравця виконуються по черзі"""
+
+    def __init__(self, locks: UserLocks = USER_LOCKS):
+        self.locks = locks
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+        async with self.locks.hold(user.id):
+            return await handler(event, data)
+
+
+def setup_serialization(dp, locks: UserLocks = USER_LOCKS) -> SerializeMiddleware:
+    """Підключає послідовну обробку (після обмеження частоти)"""
+    middleware = SerializeMiddleware(locks)
+    dp.message.outer_middleware(middleware)
+    dp.callback_query.outer_middleware(middleware)
+    return middleware
@@ -0,0 +1,142 @@
+"""
+Обмеження частоти дій гравця.
+
+Зовнішній middleware для повідомлень і callback-запитів: кожна дія
+належить до класу команд (бій, полювання, відпочинок, ...), і для пари
+(гравець, клас) діє token bucket з LIMITS. Стан зберігається в LRU
+обмеженого розміру (MAX_KEYS), тож пам'ять не росте з кількістю
+гравців: давно неактивний гравець просто отримує повний bucket. Якщо
+передано клієнт Redis, ліміт спільний для всіх воркерів: лічильник вікна
+`eldoria:throttle:<клас>:<user_id>:<вікно>` (INCR і EXPIRE одним
+pipeline) пропускає burst + rate * вікно дій за вікно.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from bot.services.character_service import cached_locale
+from bot.services.game_store import KEY_PREFIX
+from bot.services.localization import t
+
+DEFAULT_CLASS = "default"
+# Клас команд -> (дій за секунду, запас)
+LIMITS: Dict[str, Tuple[float, float]] = {
+    "battle": (2.0, 3),
+    "hunt": (0.5, 2),
+    "rest": (0.2, 2),
+    "quest": (1.0, 3),
+    DEFAULT_CLASS: (3.0, 5),
+}
+# Префікс callback-даних або команда -> клас ("hunt:" - дії в бою)
+COMMAND_CLASSES = {
+    "hunt": "hunt",
+    "hunt:": "battle",
+    "rest": "rest",
+    "quests": "quest",
+    "quest:": "quest",
+}
+MAX_KEYS = 100_000
+REDIS_WINDOW = 10
+
+
+def command_class(event: TelegramObject) -> str:
+    """Клас команди для callback-даних ("hunt:attack") або тексту ("/hunt")"""
+    if isinstance(event, CallbackQuery):
+        prefix, sep, _ = (event.data or "").partition(":")
+        return COMMAND_CLASSES.get(prefix + sep) or COMMAND_CLASSES.get(prefix, DEFAULT_CLASS)
+    text = getattr(event, "text", None)
+    if text and text.startswith("/"):
+        command = text[1:].split(maxsplit=1)[0].split("@", 1)[0] if len(text) > 1 else ""
+        return COMMAND_CLASSES.get(command, DEFAULT_CLASS)
+    return DEFAULT_CLASS
+
+
+class LocalLimiter:
+    """Token bucket на пару (гравець, клас) в LRU з не більше ніж max_keys записів"""
+
+    def __init__(self, max_keys: int = MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        # (user_id, клас) -> [токени, час оновлення]
+        self.buckets: "OrderedDict[Tuple[int, str], list]" = OrderedDict()
+
+    def allow(self, user_id: int, cls: str) -> bool:
+        rate, burst = LIMITS[cls]
+        now = self.clock()
+        key = (user_id, cls)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_keys:
+                self.buckets.popitem(last=False)
+            self.buckets[key] = [burst - 1, now]
+            return True
+        self.buckets.move_to_end(key)
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return True
+        bucket[0] = tokens
+        return False
+
+
+class RedisLimiter:
+    """Ліміт у Redis, спільний для воркерів: лічильник на вікно REDIS_WINDOW секунд"""
+
+    def __init__(self, redis, window: int = REDIS_WINDOW, clock: Callable[[], float] = time.time):
+        self.redis = redis
+        self.window = window
+        self.clock = clock
+
+    async def allow(self, user_id: int, cls: str) -> bool:
+        rate, burst = LIMITS[cls]
+        window = int(self.clock()) // self.window
+        key = f"{KEY_PREFIX}:throttle:{cls}:{user_id}:{window}"
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, self.window * 2)
+            count, _ = await pipe.execute()
+        return count <= burst + rate * self.window
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Пропускає дію гравця, лише якщо в його bucket для класу команди є токен"""
+
+    def __init__(self, redis=None, max_keys: int = MAX_KEYS):
+        self.local = LocalLimiter(max_keys)
+        self.remote = RedisLimiter(redis) if redis is not None else None
+        self.throttled = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+        cls = command_class(event)
+        if self.remote is None:
+            allowed = self.local.allow(user.id, cls)
+        else:
+            allowed = await self.remote.allow(user.id, cls)
+        if allowed:
+            return await handler(event, data)
+        self.throttled += 1
+        # Callback треба підтвердити, інакше кнопка «висить»; повідомлення просто ігноруємо.
+        # Локаль - лише з кешу: відкинута дія не повинна йти в БД
+        if isinstance(event, CallbackQuery):
+            await event.answer(t("throttle.too_fast", cached_locale(user.id)))
+        return None
+
+
+def setup_throttling(dp, redis=None) -> ThrottlingMiddleware:
+    """Підключає обмеження до повідомлень і callback-запитів"""
+    middleware = ThrottlingMiddleware(redis)
+    dp.message.outer_middleware(middleware)
+    dp.callback_query.outer_middleware(middleware)
+    return middleware
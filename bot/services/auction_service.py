@@ -0,0 +1,315 @@
+"""
+Глобальний аукціон (GDD): книга лотів у пам'яті зі записом у таблицю auction.
+
+Для кожного предмета і валюти лоти впорядковані за ціною (SortedList),
+тож найдешевший лот і сторінка лотів знаходяться за O(log n). Строки дії
+зберігаються в мін-купі за expires_at з лінивим видаленням: куплені лоти
+лишаються в купі і пропускаються при евікції. Кожна зміна одразу
+записується в БД; предмет лоту списується з інвентаря продавця (ескроу)
+і повертається йому після закінчення строку. expires_at у БД - UTC без
+часового поясу (не залежить від TZ сервера); лот без строку не закінчується.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+from sqlalchemy import delete, select
+
+from bot import database
+from bot.services.character_service import CACHE, award, get_character, save_character, touch
+from bot.services import ledger_service
+from bot.services.inventory_service import upsert_stacks
+from bot.services.localization import t
+from models.base import Auction, Character, User
+
+logger = logging.getLogger(__name__)
+
+CURRENCY_GOLD = "gold"
+CURRENCY_GEMS = "gems"
+CURRENCIES = (CURRENCY_GOLD, CURRENCY_GEMS)
+
+# Строк дії лоту за замовчуванням
+LISTING_DURATION = 24 * 60 * 60
+# Розмір пакета рядків при завантаженні лотів з БД
+LOAD_BATCH = 10_000
+
+
+class Listing:
+    """Активний лот (один предмет); seller_telegram_id - для нарахування виручки"""
+    __slots__ = ("id", "seller_id", "seller_telegram_id", "item_id", "currency", "price", "expires_at")
+
+    def __init__(self, id: int, seller_id: Optional[int], seller_telegram_id: int, item_id: int,
+                 currency: str, price: int, expires_at: float):
+        self.id = id
+        self.seller_id = seller_id
+        self.seller_telegram_id = seller_telegram_id
+        self.item_id = item_id
+        self.currency = currency
+        self.price = price
+        self.expires_at = expires_at
+
+
+class AuctionHouse:
+    """Книги лотів за (item_id, валюта) та купа строків дії"""
+
+    def __init__(self):
+        self.listings: Dict[int, Listing] = {}
+        self._books: Dict[Tuple[int, str], SortedList] = {}
+        self._expiry: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def add(self, listing: Listing) -> None:
+        self.listings[listing.id] = listing
+        book = self._books.get((listing.item_id, listing.currency))
+        if book is None:
+            book = self._books[listing.item_id, listing.currency] = SortedList()
+        book.add((listing.price, listing.id))
+        heapq.heappush(self._expiry, (listing.expires_at, listing.id))
+
+    def remove(self, listing_id: int) -> Optional[Listing]:
+        """Знімає лот з книги (запис у купі видалиться ліниво)"""
+        listing = self.listings.pop(listing_id, None)
+        if listing is None:
+            return None
+        key = (listing.item_id, listing.currency)
+        book = self._books[key]
+        book.remove((listing.price, listing.id))
+        if not book:
+            del self._books[key]
+        # Купа не росте безмежно, якщо лоти переважно купують
+        if len(self._expiry) > 2 * len(self.listings) + 1_000:
+            self._expiry = [(entry.expires_at, entry.id) for entry in self.listings.values()]
+            heapq.heapify(self._expiry)
+        return listing
+
+    def best(self, item_id: int, currency: str = CURRENCY_GOLD) -> Optional[Listing]:
+        """Найдешевший лот предмета"""
+        book = self._books.get((item_id, currency))
+        return self.listings[book[0][1]] if book else None
+
+    def page(self, item_id: int, currency: str = CURRENCY_GOLD, limit: int = 10, offset: int = 0) -> List[Listing]:
+        book = self._books.get((item_id, currency))
+        if not book:
+            return []
+        return [self.listings[listing_id] for _, listing_id in book.islice(offset, offset + limit)]
+
+    def pop_expired(self, now: float) -> List[Listing]:
+        """Знімає всі лоти зі строком до now"""
+        expired = []
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, listing_id = heapq.heappop(self._expiry)
+            listing = self.listings.get(listing_id)
+            # Пропускаємо куплені лоти
+            if listing is not None and listing.expires_at == expires_at:
+                expired.append(self.remove(listing_id))
+        return expired
+
+    def clear(self) -> None:
+        self.listings.clear()
+        self._books.clear()
+        self._expiry.clear()
+
+
+HOUSE = AuctionHouse()
+# Ідентифікатори лотів без БД
+_LOCAL_IDS = itertools.count(1)
+
+
+def cheapest(item_id: int, currency: str = CURRENCY_GOLD) -> Optional[Listing]:
+    return HOUSE.best(item_id, currency)
+
+
+async def create_listing(user_id: int, item_id: int, price: int, currency: str = CURRENCY_GOLD,
+                         duration: float = LISTING_DURATION) -> str:
+    """Виставляє предмет з інвентаря на аукціон"""
+    seller = await get_character(user_id)
+    if currency not in CURRENCIES or price <= 0:
+        return t("auction.bad_price", seller.locale)
+    if seller.inventory.get(item_id, 0) < 1:
+        return t("auction.no_item", seller.locale)
+    seller.inventory[item_id] -= 1
+    touch(seller)
+    expires_at = time.time() + duration
+    try:
+        listing_id = await _insert_listing(seller.id, item_id, currency, price, expires_at)
+    except Exception:
+        seller.inventory[item_id] += 1
+        touch(seller)
+        raise
+    HOUSE.add(Listing(listing_id, seller.id, user_id, item_id, currency, price, expires_at))
+    return t("auction.listed", seller.locale, listing_id=listing_id, price=price,
+             currency=t(f"currency.{currency}", seller.locale))
+
+
+async def buy_listing(user_id: int, listing_id: int) -> str:
+    """Купівля лоту; лот отримує лише один покупець"""
+    buyer = await get_character(user_id)
+    listing = HOUSE.listings.get(listing_id)
+    if listing is None:
+        return t("auction.not_found", buyer.locale)
+    if listing.seller_telegram_id == user_id:
+        return t("auction.own_listing", buyer.locale)
+    balance = buyer.stats.get(listing.currency, 0)
+    if balance < listing.price:
+        return t("auction.no_funds", buyer.locale)
+
+    # Між перевіркою і зняттям лоту немає await, тому конкурентні
+    # колбеки не можуть купити той самий лот двічі
+    HOUSE.remove(listing_id)
+    _credit(buyer, listing.currency, -listing.price, "auction_buy")
+    try:
+        sold = await _write_sale(buyer.id, listing)
+    except Exception:
+        HOUSE.add(listing)
+        _credit(buyer, listing.currency, listing.price, "auction_refund")
+        raise
+    if not sold:
+        # Лот уже продав інший воркер
+        _credit(buyer, listing.currency, listing.price, "auction_refund")
+        return t("auction.not_found", buyer.locale)
+
+    buyer.inventory[listing.item_id] = buyer.inventory.get(listing.item_id, 0) + 1
+    await save_character(buyer, {"stats"})
+    seller = await get_character(listing.seller_telegram_id)
+    _credit(seller, listing.currency, listing.price, "auction_sale")
+    await save_character(seller, {"stats"})
+    return t("auction.bought", buyer.locale, listing_id=listing_id, price=listing.price,
+             currency=t(f"currency.{listing.currency}", buyer.locale))
+
+
+async def expire_listings(now: Optional[float] = None) -> int:
+    """Знімає прострочені лоти і повертає предмети продавцям"""
+    expired = HOUSE.pop_expired(time.time() if now is None else now)
+    if not expired:
+        return 0
+    if database.get_sessionmaker() is not None:
+        try:
+            expired = await _delete_expired(expired)
+        except Exception:
+            # Лоти повертаються в книгу - наступна евікція повторить запис
+            for listing in expired:
+                HOUSE.add(listing)
+            raise
+    # Персонажі, що вже в кеші, отримують предмет і в пам'яті
+    for listing in expired:
+        seller = CACHE.peek(listing.seller_telegram_id)
+        if seller is not None:
+            seller.inventory[listing.item_id] = seller.inventory.get(listing.item_id, 0) + 1
+            touch(seller)
+    return len(expired)
+
+
+async def load_listings() -> int:
+    """Завантажує активні лоти з БД потоковим запитом"""
+    HOUSE.clear()
+    if database.get_sessionmaker() is None:
+        return 0
+    query = (
+        select(Auction, User.telegram_id)
+        .join(Character, Auction.seller_id == Character.id)
+        .join(User, Character.user_id == User.id)
+        .execution_options(yield_per=LOAD_BATCH)
+    )
+    async with database.session() as session:
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            for auction, telegram_id in partition:
+                currency = CURRENCY_GOLD if auction.price_gold is not None else CURRENCY_GEMS
+                price = auction.price_gold if currency == CURRENCY_GOLD else auction.price_gems
+                HOUSE.add(Listing(auction.id, auction.seller_id, telegram_id, auction.item_id,
+                                  currency, price, _from_utc(auction.expires_at)))
+    return len(HOUSE)
+
+
+async def run_auction_loop(interval: float = 30.0) -> None:
+    """Фонова евікція прострочених лотів"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await expire_listings()
+        except Exception:
+            logger.exception("Failed to expire auction listings")
+
+
+def _to_utc(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def _from_utc(value: Optional[datetime]) -> float:
+    """Timestamp строку лоту з БД; без строку - лот не закінчується"""
+    if value is None:
+        return float("inf")
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _credit(character, currency: str, amount: int, reason: str) -> None:
+    """Змінює баланс персонажа (золото - через award, щоб оновились рейтинги)"""
+    if currency == CURRENCY_GOLD:
+        award(character, gold=amount, reason=reason)
+    else:
+        character.stats[currency] = character.stats.get(currency, 0) + amount
+        touch(character)
+        ledger_service.record(character.id, amount, currency, reason)
+
+
+async def _insert_listing(seller_id: Optional[int], item_id: int, currency: str,
+                          price: int, expires_at: float) -> int:
+    if seller_id is None or database.get_sessionmaker() is None:
+        return next(_LOCAL_IDS)
+    async with database.session() as session:
+        async with session.begin():
+            auction = Auction(
+                seller_id=seller_id,
+                item_id=item_id,
+                price_gold=price if currency == CURRENCY_GOLD else None,
+                price_gems=price if currency == CURRENCY_GEMS else None,
+                expires_at=_to_utc(expires_at),
+            )
+            session.add(auction)
+            await upsert_stacks(session, [{"character_id": seller_id, "item_id": item_id, "quantity": -1}])
+            await session.flush()
+            return auction.id
+
+
+async def _write_sale(buyer_id: Optional[int], listing: Listing) -> bool:
+    """Видаляє лот і передає предмет покупцю; False, якщо лот уже продано"""
+    if listing.seller_id is None or database.get_sessionmaker() is None:
+        return True
+    async with database.session() as session:
+        async with session.begin():
+            result = await session.execute(delete(Auction).where(Auction.id == listing.id))
+            if result.rowcount != 1:
+                return False
+            if buyer_id is not None:
+                await upsert_stacks(session, [{"character_id": buyer_id, "item_id": listing.item_id, "quantity": 1}])
+            return True
+
+
+async def _delete_expired(expired: List[Listing]) -> List[Listing]:
+    """Видаляє лоти з БД і повертає предмети продавцям; лоти, яких у БД уже немає
+    (продав інший воркер), відкидаються"""
+    stored = [listing.id for listing in expired if listing.seller_id is not None]
+    if not stored:
+        return expired
+    async with database.session() as session:
+        async with session.begin():
+            result = await session.execute(delete(Auction).where(Auction.id.in_(stored)).returning(Auction.id))
+            deleted = set(result.scalars())
+            returned: Dict[Tuple[int, int], int] = {}
+            for listing in expired:
+                if listing.id in deleted:
+                    key = (listing.seller_id, listing.item_id)
+                    returned[key] = returned.get(key, 0) + 1
+            if returned:
+                await upsert_stacks(session, [
+                    {"character_id": character_id, "item_id": item_id, "quantity": quantity}
+                    for (character_id, item_id), quantity in returned.items()
+                ])
+    return [listing for listing in expired if listing.seller_id is None or listing.id in deleted]
@@ -0,0 +1,105 @@
+"""
+Запис і відтворення боїв через BattleSession.state.
+
+Замість покрокового JSON зберігаються seed бою, знімок характеристик
+сторін і varint-потік журналу (стартове HP гравця і ворога, далі код
+дії на кожен раунд), закодований base64. Кожен раунд відтворюється
+детерміновано тим самим рушієм, що і під час бою. Записи версії 1
+(без стартового HP ворога) відтворюються з HP ворога з шаблону.
+"""
+import asyncio
+import base64
+import logging
+from typing import Dict, List
+
+from models.base import BattleSession
+from bot import database
+from bot.services.battle_service import (
+    ACTION_CODES, BATTLE_ACTIONS, FINISHED_BATTLES, BattleState, battle_engine, round_rng,
+)
+from bot.utils.varint import iter_varints
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 2
+
+_ACTIONS_BY_CODE = {code: action for action, code in ACTION_CODES.items()}
+
+
+def session_state(battle: BattleState, outcome: str) -> Dict:
+    """Компактний стан бою для BattleSession.state"""
+    enemy = battle.enemy
+    return {
+        "v": STATE_VERSION,
+        "seed": battle.seed,
+        "outcome": outcome,
+        "player": list(battle.combat),
+        "enemy": {
+            "id": battle.enemy_id,
+            "name": enemy["name"],
+            "max_hp": battle.enemy_max_hp,
+            "attack": enemy["attack"],
+            "defense": enemy["defense"],
+            "speed": enemy["speed"],
+        },
+        "log": base64.b64encode(bytes(battle.log)).decode("ascii"),
+    }
+
+
+def build_session(user_id: int, battle: BattleState, outcome: str) -> BattleSession:
+    """Створює (ще не збережений) запис BattleSession для завершеного бою"""
+    return BattleSession(
+        participants=[{"user_id": user_id}, {"enemy_id": battle.enemy_id}],
+        state=session_state(battle, outcome),
+    )
+
+
+def replay(state: Dict) -> List[Dict]:
+    """
+    Відтворює бій з BattleSession.state. Повертає по запису на раунд:
+    дія гравця, події рушія та HP сторін після раунду.
+    """
+    version = state.get("v")
+    if version not in (1, STATE_VERSION):
+        raise ValueError(f"Unsupported battle state version: {version}")
+    codes = iter_varints(base64.b64decode(state["log"]))
+    player_hp = next(codes)
+    enemy = state["enemy"]
+    if version == 1:
+        enemy_hp = enemy_max_hp = enemy["hp"]
+    else:
+        enemy_hp, enemy_max_hp = next(codes), enemy["max_hp"]
+
+    rounds = []
+    # Один рушій на весь бій: кулдауни і бафи переходять між раундами, як у play_round
+    engine = battle_engine(tuple(state["player"]), player_hp, enemy, enemy_hp, enemy_max_hp)
+    for round_no, code in enumerate(codes):
+        action = _ACTIONS_BY_CODE[code]
+        events = engine.resolve_round({0: (BATTLE_ACTIONS[action], 1, -1)}, round_rng(state["seed"], round_no))
+        rounds.append({"action": action, "events": events, "player_hp": engine.hp[0], "enemy_hp": engine.hp[1]})
+    return rounds
+
+
+async def flush_finished_battles() -> int:
+    """Записує завершені бої в battle_sessions одним батчем"""
+    if database.get_sessionmaker() is None:
+        FINISHED_BATTLES.clear()
+        return 0
+    sessions = []
+    while FINISHED_BATTLES:
+        sessions.append(build_session(*FINISHED_BATTLES.popleft()))
+    if sessions:
+        async with database.session() as session:
+            async with session.begin():
+                session.add_all(sessions)
+    return len(sessions)
+
+
+async def run_recorder_loop(interval: float = 5.0) -> None:
+    """Фоновий запис завершених боїв"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush_finished_battles()
+        except Exception:
+            logger.exception("Failed to store finished battles")
@@ -1,11 +1,173 @@
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import InlineKeyboardMarkup
 import random
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple, List
+import struct
+import time
+from typing import Dict, Mapping, Optional, Tuple, List
+from collections import deque
+from bot.keyboards.battle_keyboard import BATTLE_KEYBOARD, EXPLORE_KEYBOARD
+from bot.utils.varint import encode_varint, iter_varints
+from bot.services import expiry_service, metrics
+from bot.services.game_store import StateStore
+from bot.services.character_service import DEFAULT_STATS, PlayerCharacter, award, get_character, save_character, user_locale
+from bot.services.localization import t
+from bot.services.inventory_service import grant_loot
+from bot.services.render_cache import RENDERS, SCREEN_BATTLE
+from bot.services.quest_progress import gather_event, kill_event
+from bot.services.quest_service import record_events
+from bot.services.damage import (
+    CRIT_MULTIPLIER, DAMAGE_VARIATION, calculate_effective_dmg, calculate_final_dmg, damage_spread,
+)
+from bot.services.turn_engine import ACTION_ATTACK, ACTION_DEFEND, ACTION_FLEE, ACTION_SKILL, TurnEngine
+from bot.services.loot_service import ENCOUNTER_ENEMY, ENCOUNTER_TRACKS, compile_location, roll_hunt
 
-# Тимчасове сховище для боїв та досліджень
-ACTIVE_BATTLES: Dict[int, Dict] = {}
+# Тривалість бою в секундах
+BATTLE_DURATION = 5 * 60
+# Скільки запис бою живе в Redis після дедлайну: таймер, відновлений після
+# перезапуску (rearm_timers), має встигнути його завершити і сповістити гравця
+BATTLE_STORE_GRACE = 24 * 60 * 60
+
+
+class BattleState:
+    """
+    Компактний стан бою: ворог за ID (ключ ENEMIES), HP цілими числами,
+    дедлайн як timestamp. Клавіатура не зберігається - вона спільна.
+    seed і номер раунду визначають випадковість кожного раунду, log -
+    varint-потік (стартове HP гравця і ворога, далі коди дій по раундах).
+    combat - бойові характеристики гравця на початок бою (combat_stats),
+    enemy_max_hp - максимум HP ворога в цьому бою (не обов'язково з шаблону).
+    engine_state - стан рушія між раундами (MP, кулдауни, бафи; TurnEngine.state).
+    """
+    __slots__ = ("enemy_id", "player_hp", "enemy_hp", "enemy_max_hp", "deadline", "seed", "round", "log",
+                 "combat", "engine_state")
+
+    def __init__(self, enemy_id: str, player_hp: int, enemy_hp: int, deadline: float,
+                 seed: Optional[int] = None, combat: Optional[Tuple] = None, enemy_max_hp: Optional[int] = None):
+        self.enemy_id = enemy_id
+        self.player_hp = player_hp
+        self.enemy_hp = enemy_hp
+        self.enemy_max_hp = enemy_max_hp or max(enemy_hp, ENEMIES[enemy_id]["hp"])
+        self.deadline = deadline
+        self.combat = combat or DEFAULT_COMBAT
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.round = 0
+        self.log = bytearray()
+        encode_varint(player_hp, self.log)
+        encode_varint(enemy_hp, self.log)
+        self.engine_state = b""
+
+    @property
+    def enemy(self) -> Dict:
+        return ENEMIES[self.enemy_id]
+
+
+def combat_stats(stats: Dict) -> Tuple:
+    """(max_hp, attack, defense, speed, crit) з характеристик персонажа"""
+    return stats["max_hp"], stats["attack"], stats["defense"], stats["speed"], stats["crit"]
+
+
+DEFAULT_COMBAT = combat_stats(DEFAULT_STATS)
+
+
+def round_rng(seed: int, round_no: int) -> random.Random:
+    """Детермінований генератор для раунду бою"""
+    return random.Random((seed << 20) + round_no)
+
+
+# max_hp, attack, defense, speed, crit
+_COMBAT_FORMAT = struct.Struct("<4id")
+
+
+def encode_battle(battle: BattleState) -> Dict[str, object]:
+    """Поля hash-запису бою в Redis"""
+    return {
+        "e": battle.enemy_id,
+        "p": battle.player_hp,
+        "h": battle.enemy_hp,
+        "m": battle.enemy_max_hp,
+        "d": repr(battle.deadline),
+        "s": battle.seed,
+        "r": battle.round,
+        "l": bytes(battle.log),
+        "c": _COMBAT_FORMAT.pack(*battle.combat),
+        "x": battle.engine_state,
+    }
+
+
+def decode_battle(data: Mapping[bytes, bytes]) -> BattleState:
+    battle = BattleState.__new__(BattleState)
+    battle.enemy_id = data[b"e"].decode()
+    battle.player_hp = int(data[b"p"])
+    battle.enemy_hp = int(data[b"h"])
+    battle.deadline = float(data[b"d"])
+    battle.seed = int(data[b"s"])
+    battle.round = int(data[b"r"])
+    battle.log = bytearray(data[b"l"])
+    if b"m" in data:
+        battle.enemy_max_hp = int(data[b"m"])
+    else:
+        # Запис до появи enemy_max_hp: ворог починав з HP шаблону, якого немає в журналі
+        template_hp = ENEMIES[battle.enemy_id]["hp"]
+        battle.enemy_max_hp = max(battle.enemy_hp, template_hp)
+        codes = iter_varints(bytes(battle.log))
+        log = bytearray()
+        encode_varint(next(codes), log)
+        encode_varint(template_hp, log)
+        for code in codes:
+            encode_varint(code, log)
+        battle.log = log
+    battle.combat = _COMBAT_FORMAT.unpack(data[b"c"])
+    battle.engine_state = data.get(b"x", b"")
+    return battle
+
+
+# Тимчасове сховище для боїв та досліджень (з Redis - лише через BATTLES)
+ACTIVE_BATTLES: Dict[int, BattleState] = {}
 EXPLORATION_RESULTS: Dict[int, Dict] = {}
+BATTLES = StateStore("battle", ACTIVE_BATTLES, encode_battle, decode_battle)
+metrics.gauge("active_battles", "Battles held in process memory", lambda: len(ACTIVE_BATTLES))
+
+
+async def _store_battle(user_id: int, battle: BattleState) -> None:
+    await BATTLES.put(user_id, battle, battle.deadline + BATTLE_STORE_GRACE)
+
+
+async def rearm_timers() -> int:
+    """Таймери збережених боїв (після перезапуску бота з Redis)"""
+    return await expiry_service.rearm(
+        "battle", ((user_id, battle.deadline) async for user_id, battle in BATTLES.items()))
+
+
+# Завершені бої (user_id, стан, результат), що очікують запису в BattleSession
+FINISHED_BATTLES: deque = deque(maxlen=10_000)
+
+# Результати бою
+OUTCOME_WON = "won"
+OUTCOME_LOST = "lost"
+OUTCOME_FLED = "fled"
+OUTCOME_TIMEOUT = "timeout"
+
+
+async def _end_battle(user_id: int, outcome: str = OUTCOME_TIMEOUT) -> Optional[BattleState]:
+    """Видаляє бій і його таймер, передає бій на запис"""
+    battle = await BATTLES.pop(user_id)
+    expiry_service.cancel("battle", user_id)
+    if battle is not None:
+        FINISHED_BATTLES.append((user_id, battle, outcome))
+    return battle
+
+
+async def _on_battle_timeout(user_id: int, now: float) -> Optional[str]:
+    """Обробник таймера: евікція бою, що не завершився вчасно"""
+    battle = await BATTLES.get(user_id)
+    if battle is None or now < battle.deadline:
+        return None
+    # Бій міг уже завершити інший воркер
+    if await _end_battle(user_id) is None:
+        return None
+    return t("battle.timeout", await user_locale(user_id))
+
+
+expiry_service.register_expiry_handler("battle", _on_battle_timeout)
 
 # Можливі ресурси та їх шанс появи
 RESOURCES = {
@@ -22,6 +184,7 @@ ENEMIES = {
         "hp": 50,
         "attack": 8,
         "defense": 3,
+        "speed": 40,
         "exp": 20,
         "gold": 15,
         "chance": 0.3,
@@ -32,6 +195,7 @@ ENEMIES = {
         "hp": 100,
         "attack": 15,
         "defense": 8,
+        "speed": 20,
         "exp": 40,
         "gold": 30,
         "chance": 0.1,
@@ -42,6 +206,7 @@ ENEMIES = {
         "hp": 80,
         "attack": 12,
         "defense": 5,
+        "speed": 30,
         "exp": 35,
         "gold": 50,
         "chance": 0.2,
@@ -49,19 +214,16 @@ ENEMIES = {
     }
 }
 
-def calculate_effective_dmg(atk: int, def_: int) -> int:
-    """
-    Обчислення ефективного урону без випадковості.
-    Формула: floor(atk * 100 / (100 + def_)).
-    """
-    return (atk * 100) // (100 + def_)
+# Скомпільовані таблиці полювання (шанс слідів, якщо ворога не знайдено - 40%)
+HUNT_TABLE = compile_location(RESOURCES, ENEMIES, tracks_chance=0.4)
 
-def calculate_final_dmg(atk: int, def_: int, variation_percent: float = 0.05, random_factor: int = 0) -> int:
-    """
-    Обчислення фінального урону з варіацією.
-    """
-    effective = calculate_effective_dmg(atk, def_)
-    return effective + random_factor
+# Стартові характеристики класів (GDD 3.2)
+CLASSES = {
+    "рицар": {"name": "Рицар", "hp": 1200, "mp": 100, "attack": 80, "defense": 50, "speed": 30, "magic": 10, "crit": 0.02},
+    "маг": {"name": "Маг", "hp": 800, "mp": 200, "attack": 20, "defense": 20, "speed": 25, "magic": 90, "crit": 0.05},
+    "розбійник": {"name": "Розбійник", "hp": 900, "mp": 120, "attack": 70, "defense": 30, "speed": 50, "magic": 20, "crit": 0.07},
+    "жрець": {"name": "Жрець", "hp": 1000, "mp": 150, "attack": 30, "defense": 40, "speed": 28, "magic": 60, "crit": 0.03},
+}
 
 def simulate_fight(player: dict, monster: dict, random_factor: int = 0) -> tuple[list[tuple[str,int]], bool]:
     """
@@ -81,167 +243,167 @@ def simulate_fight(player: dict, monster: dict, random_factor: int = 0) -> tuple
         logs.append(('monster', dmg_m))
     return logs, p_hp > 0
 
-async def quick_hunt(user_id: int) -> Tuple[str, InlineKeyboardMarkup]:
-    """Дослідження території"""
+@metrics.timed("quick_hunt")
+async def quick_hunt(user_id: int, rng: Optional[random.Random] = None) -> Tuple[str, InlineKeyboardMarkup]:
+    """Дослідження території (rng - джерело випадковості, за замовчуванням модуль random)"""
+    character = await get_character(user_id)
+    locale = character.locale
     # Перевірка чи персонаж вже в бою
-    if user_id in ACTIVE_BATTLES:
-        battle = ACTIVE_BATTLES[user_id]
-        if datetime.now() < battle["end_time"]:
-            remaining = battle["end_time"] - datetime.now()
-            return (
-                f"⚔️ Ви вже в бою!\n"
-                f"⏳ Залишилось: {remaining.seconds // 60} хвилин\n"
-                f"❤️ Ваше здоров'я: {battle['player_hp']}\n"
-                f"❤️ Здоров'я ворога: {battle['enemy_hp']}",
-                battle["keyboard"]
-            )
+    battle = await BATTLES.get(user_id)
+    if battle is not None:
+        remaining = battle.deadline - time.time()
+        if remaining > 0:
+            minutes = int(remaining) // 60
+
+            async def render() -> str:
+                return t("battle.in_progress", locale, minutes=minutes,
+                         player_hp=battle.player_hp, enemy_hp=battle.enemy_hp)
+
+            status = await RENDERS.get(character, SCREEN_BATTLE, render,
+                                       extra=(minutes, battle.player_hp, battle.enemy_hp))
+            return status.text, BATTLE_KEYBOARD.get(locale)
         else:
-            del ACTIVE_BATTLES[user_id]
+            await _end_battle(user_id)
     
-    # Шанс знайти ресурси
-    found_resources = []
-    for resource, data in RESOURCES.items():
-        if random.random() < data["chance"]:
-            amount = random.randint(data["min"], data["max"])
-            found_resources.append(f"{amount} {resource}")
-    
-    # Шанс знайти ворога
-    enemy = None
-    for enemy_data in ENEMIES.values():
-        if random.random() < enemy_data["chance"]:
-            enemy = enemy_data
-            break
+    if character.stats["hp"] <= 0:
+        return t("hunt.exhausted", locale), EXPLORE_KEYBOARD.get(locale)
     
-    # Шанс знайти сліди
-    tracks = None
-    if not enemy and random.random() < 0.4:
-        tracks = random.choice(list(ENEMIES.values()))["tracks"]
+    # Ресурси, ворог або сліди - одна вибірка зі скомпільованої таблиці
+    found, encounter, encounter_enemy_id = roll_hunt(HUNT_TABLE, rng or random)
+    found_resources = [t("hunt.resource", locale, amount=amount, name=resource) for resource, amount in found]
+    # Знахідки - в інвентар одним записом, і як події для квестів
+    await grant_loot(character, found)
+    quest_text = await record_events(character, [(gather_event(resource), amount) for resource, amount in found])
+    enemy_id = encounter_enemy_id if encounter == ENCOUNTER_ENEMY else None
+    enemy = ENEMIES[enemy_id] if enemy_id else None
+    tracks = ENEMIES[encounter_enemy_id]["tracks"] if encounter == ENCOUNTER_TRACKS else None
     
     # Формування повідомлення
-    text = "🔍 Ви досліджуєте територію...\n\n"
+    text = t("hunt.exploring", locale)
     
     if found_resources:
-        text += "📦 Знайдено ресурси:\n" + "\n".join(f"• {r}" for r in found_resources) + "\n\n"
+        text += t("hunt.resources", locale) + "\n".join(found_resources) + "\n\n"
     
     if tracks:
-        text += f"👣 Ви помітили {tracks}\n\n"
+        text += t("hunt.tracks", locale, tracks=tracks)
     
     if enemy:
-        text += (
-            f"⚠️ Ви натрапили на {enemy['name']}!\n\n"
-            f"❤️ Ваше здоров'я: 100\n"  # TODO: Отримати з БД
-            f"❤️ Здоров'я ворога: {enemy['hp']}\n"
-            f"⚔️ Атака ворога: {enemy['attack']}\n"
-            f"🛡 Захист ворога: {enemy['defense']}\n\n"
-            "Оберіть дію:"
-        )
+        text += t("hunt.enemy", locale, enemy=enemy["name"], player_hp=character.stats["hp"],
+                  enemy_hp=enemy["hp"], attack=enemy["attack"], defense=enemy["defense"])
         
         # Створення бою
-        battle = {
-            "enemy": enemy,
-            "player_hp": 100,  # TODO: Отримати з БД
-            "enemy_hp": enemy["hp"],
-            "end_time": datetime.now() + timedelta(minutes=5),
-            "keyboard": None
-        }
-        
-        buttons = [
-            [
-                InlineKeyboardButton(text="⚔️ Атакувати", callback_data="hunt:attack"),
-                InlineKeyboardButton(text="🛡 Захищатися", callback_data="hunt:defend")
-            ],
-            [
-                InlineKeyboardButton(text="🏃 Втекти", callback_data="hunt:flee"),
-                InlineKeyboardButton(text="🔙 Назад", callback_data="menu:main")
-            ]
-        ]
-        kb = InlineKeyboardMarkup(inline_keyboard=buttons)
-        battle["keyboard"] = kb
-        ACTIVE_BATTLES[user_id] = battle
+        deadline = time.time() + BATTLE_DURATION
+        await _store_battle(user_id, BattleState(
+            enemy_id,
+            character.stats["hp"],
+            enemy["hp"],
+            deadline,
+            combat=combat_stats(character.stats),
+        ))
+        expiry_service.schedule("battle", user_id, deadline)
+        kb = BATTLE_KEYBOARD.get(locale)
     else:
-        text += "✅ Ви безпечно дослідили територію"
-        buttons = [[InlineKeyboardButton(text="🔙 Назад", callback_data="menu:main")]]
-        kb = InlineKeyboardMarkup(inline_keyboard=buttons)
+        text += t("hunt.safe", locale)
+        kb = EXPLORE_KEYBOARD.get(locale)
     
+    if quest_text:
+        text += "\n\n" + quest_text
     return text, kb
 
+def battle_engine(combat: Tuple, player_hp: int, enemy: Dict, enemy_hp: int, enemy_max_hp: int) -> TurnEngine:
+    """Бій гравця (індекс 0) з ворогом (індекс 1) на рушії ходів"""
+    max_hp, attack, defense, speed, crit = combat
+    engine = TurnEngine()
+    engine.add("player", 0, player_hp, attack, defense, speed, crit=crit, max_hp=max_hp)
+    engine.add(enemy["name"], 1, enemy_hp, enemy["attack"], enemy["defense"], enemy["speed"], max_hp=enemy_max_hp)
+    return engine
+
+
+BATTLE_ACTIONS = {"attack": ACTION_ATTACK, "defend": ACTION_DEFEND, "flee": ACTION_FLEE}
+# Коди дій у журналі бою (порядок не змінювати - від нього залежать записи)
+ACTION_CODES = {"attack": 0, "defend": 1, "flee": 2}
+
+
+def play_round(battle: BattleState, action: str) -> List:
+    """Розігрує раунд бою, оновлює HP і журнал, повертає події рушія"""
+    engine = battle_engine(battle.combat, battle.player_hp, battle.enemy, battle.enemy_hp, battle.enemy_max_hp)
+    # Кулдауни і бафи попередніх раундів
+    if battle.engine_state:
+        engine.load_state(battle.engine_state)
+    events = engine.resolve_round({0: (BATTLE_ACTIONS[action], 1, -1)}, round_rng(battle.seed, battle.round))
+    battle.player_hp, battle.enemy_hp = engine.hp[0], engine.hp[1]
+    battle.round += 1
+    battle.engine_state = engine.state()
+    encode_varint(ACTION_CODES[action], battle.log)
+    return events
+
+
+async def _settle(user_id: int, battle: BattleState, gold: int = 0, exp: int = 0) -> PlayerCharacter:
+    """Записує HP після бою та нагороду персонажу"""
+    character = await get_character(user_id)
+    character.stats["hp"] = max(battle.player_hp, 0)
+    award(character, gold=gold, xp=exp, reason="battle")
+    await save_character(character)
+    return character
+
+
+# Ключ тексту удару за (чи б'є гравець, чи критичний)
+_HIT_TEXTS = {
+    (True, False): "battle.player_hit",
+    (True, True): "battle.player_crit",
+    (False, False): "battle.enemy_hit",
+    (False, True): "battle.enemy_crit",
+}
+
+
+@metrics.timed("process_battle_action")
 async def process_battle_action(user_id: int, action: str) -> str:
     """Обробка бойових дій"""
-    if user_id not in ACTIVE_BATTLES:
-        return "❌ Ви не в бою!"
+    locale = await user_locale(user_id)
+    battle = await BATTLES.get(user_id)
+    if battle is None:
+        return t("battle.not_in_battle", locale)
     
-    battle = ACTIVE_BATTLES[user_id]
-    if datetime.now() >= battle["end_time"]:
-        del ACTIVE_BATTLES[user_id]
-        return "⏰ Час бою вийшов!"
+    if time.time() >= battle.deadline:
+        await _end_battle(user_id)
+        return t("battle.timeout", locale)
     
-    enemy = battle["enemy"]
-    player_hp = battle["player_hp"]
-    enemy_hp = battle["enemy_hp"]
+    if action not in BATTLE_ACTIONS:
+        return t("battle.unknown_action", locale)
     
-    if action == "attack":
-        # Атака гравця
-        damage = calculate_final_dmg(15, enemy["defense"])  # TODO: Отримати атаку гравця з БД
-        enemy_hp -= damage
-        battle["enemy_hp"] = enemy_hp
-        
-        # Атака ворога
-        if enemy_hp > 0:
-            enemy_damage = calculate_final_dmg(enemy["attack"], 5)  # TODO: Отримати захист гравця з БД
-            player_hp -= enemy_damage
-            battle["player_hp"] = player_hp
-            
-            if player_hp <= 0:
-                del ACTIVE_BATTLES[user_id]
-                return "❌ Ви програли бій!"
-        
-        if enemy_hp <= 0:
-            del ACTIVE_BATTLES[user_id]
-            return f"✅ Ви перемогли {enemy['name']}!\n💰 Отримано: {enemy['gold']} золота\n✨ Досвід: {enemy['exp']}"
-        
-        return (
-            f"⚔️ Ви завдали {damage} шкоди!\n"
-            f"⚔️ Ворог завдав {enemy_damage} шкоди!\n\n"
-            f"❤️ Ваше здоров'я: {player_hp}\n"
-            f"❤️ Здоров'я ворога: {enemy_hp}"
-        )
-    
-    elif action == "defend":
-        # Захист гравця
-        enemy_damage = calculate_final_dmg(enemy["attack"], 10)  # TODO: Отримати захист гравця з БД
-        player_hp -= enemy_damage // 2  # Зменшуємо шкоду вдвічі
-        battle["player_hp"] = player_hp
-        
-        if player_hp <= 0:
-            del ACTIVE_BATTLES[user_id]
-            return "❌ Ви програли бій!"
-        
-        return (
-            f"🛡 Ви захищаєтесь!\n"
-            f"⚔️ Ворог завдав {enemy_damage // 2} шкоди!\n\n"
-            f"❤️ Ваше здоров'я: {player_hp}\n"
-            f"❤️ Здоров'я ворога: {enemy_hp}"
-        )
+    enemy = battle.enemy
+    events = play_round(battle, action)
     
-    elif action == "flee":
-        # Спроба втечі
-        if random.random() < 0.5:  # 50% шанс втечі
-            del ACTIVE_BATTLES[user_id]
-            return "🏃 Вам вдалося втекти!"
+    lines = []
+    for actor, kind, target, value, crit in events:
+        if kind == ACTION_FLEE:
+            if value:
+                if await _end_battle(user_id, OUTCOME_FLED) is None:
+                    return t("battle.not_in_battle", locale)
+                await _settle(user_id, battle)
+                return t("battle.fled", locale)
+            lines.append(t("battle.flee_failed", locale))
+        elif kind == ACTION_DEFEND:
+            lines.append(t("battle.defend", locale))
+        elif kind not in (ACTION_ATTACK, ACTION_SKILL):
+            continue
         else:
-            enemy_damage = calculate_final_dmg(enemy["attack"], 5)
-            player_hp -= enemy_damage
-            battle["player_hp"] = player_hp
-            
-            if player_hp <= 0:
-                del ACTIVE_BATTLES[user_id]
-                return "❌ Ви програли бій!"
-            
-            return (
-                f"❌ Втеча не вдалася!\n"
-                f"⚔️ Ворог завдав {enemy_damage} шкоди!\n\n"
-                f"❤️ Ваше здоров'я: {player_hp}\n"
-                f"❤️ Здоров'я ворога: {enemy_hp}"
-            )
+            lines.append(t(_HIT_TEXTS[actor == 0, crit], locale, damage=value))
+    
+    if battle.player_hp <= 0:
+        if await _end_battle(user_id, OUTCOME_LOST) is None:
+            return t("battle.not_in_battle", locale)
+        await _settle(user_id, battle)
+        return t("battle.lost", locale)
+    
+    if battle.enemy_hp <= 0:
+        # Бій уже завершив інший обробник (таймаут, інший воркер) - нагорода не видається
+        if await _end_battle(user_id, OUTCOME_WON) is None:
+            return t("battle.not_in_battle", locale)
+        character = await _settle(user_id, battle, gold=enemy["gold"], exp=enemy["exp"])
+        text = t("battle.won", locale, enemy=enemy["name"], gold=enemy["gold"], exp=enemy["exp"])
+        quest_text = await record_events(character, [(kill_event(battle.enemy_id), 1)])
+        return text + "\n\n" + quest_text if quest_text else text
     
-    return "❌ Невідома дія" 
\ No newline at end of file
+    await _store_battle(user_id, battle)
+    return "\n".join(lines) + "\n\n" + t("battle.status", locale, player_hp=battle.player_hp, enemy_hp=battle.enemy_hp)
@@ -0,0 +1,115 @@
+"""
+Векторизована Monte Carlo симуляція боїв для балансування.
+
+Кожен раунд розігрується одразу для N боїв масивами NumPy. Порядок
+випадкових значень фіксований: у кожному раунді спочатку атакує гравець
+(rng.integers(-R, R + 1, n), потім rng.random(n) для криту), потім ворог
+у тому ж порядку. Тому для того самого seed результати збігаються з
+покроковим розрахунком через calculate_final_dmg.
+"""
+import numpy as np
+from typing import Dict, Optional
+
+from bot.services.battle_service import CLASSES, ENEMIES
+from bot.services.damage import CRIT_MULTIPLIER, calculate_effective_dmg, damage_spread
+
+# Обмеження довжини бою (бій, що не завершився, вважається поразкою)
+MAX_ROUNDS = 500
+# Розмір порції боїв, що обробляється за раз (обмежує пам'ять)
+CHUNK_SIZE = 1 << 16
+
+
+def _roll_damage(rng: np.random.Generator, n: int, atk: int, def_: int, crit_chance: float) -> np.ndarray:
+    """Векторний аналог calculate_final_dmg для n ударів"""
+    spread = damage_spread(atk)
+    random_factor = rng.integers(-spread, spread + 1, size=n)
+    crit = rng.random(n) < crit_chance
+    dmg = np.maximum(calculate_effective_dmg(atk, def_) + random_factor, 0)
+    return np.where(crit, np.floor(dmg * CRIT_MULTIPLIER).astype(np.int64), dmg)
+
+
+def _simulate_chunk(player: dict, monster: dict, n: int, rng: np.random.Generator, max_rounds: int):
+    p_hp = np.full(n, player["hp"], dtype=np.int64)
+    m_hp = np.full(n, monster["hp"], dtype=np.int64)
+    turns = np.zeros(n, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    p_crit = player.get("crit", 0.0)
+    m_crit = monster.get("crit", 0.0)
+
+    for _ in range(max_rounds):
+        dmg = _roll_damage(rng, n, player["attack"], monster["defense"], p_crit)
+        m_hp -= np.where(active, dmg, 0)
+        turns += active
+        active &= m_hp > 0
+
+        dmg = _roll_damage(rng, n, monster["attack"], player["defense"], m_crit)
+        p_hp -= np.where(active, dmg, 0)
+        active &= p_hp > 0
+
+        if not active.any():
+            break
+
+    return m_hp <= 0, turns, np.maximum(p_hp, 0)
+
+
+def simulate_batch(player: dict, monster: dict, n: int, seed: Optional[int] = None,
+                   rng: Optional[np.random.Generator] = None, max_rounds: int = MAX_ROUNDS,
+                   chunk_size: int = CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Симулює n боїв гравця проти ворога (гравець атакує першим).
+    Характеристики у форматі ENEMIES/CLASSES: hp, attack, defense, crit.
+    Повертає масиви won, turns (кількість атак гравця) та hp_left.
+    Результат відтворюваний для тих самих seed і chunk_size; інший
+    chunk_size змінює порядок вибірки з rng, тож окремі бої інші, а
+    статистика - та сама.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+
+    won = np.empty(n, dtype=bool)
+    turns = np.empty(n, dtype=np.int64)
+    hp_left = np.empty(n, dtype=np.int64)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        won[start:stop], turns[start:stop], hp_left[start:stop] = _simulate_chunk(
+            player, monster, stop - start, rng, max_rounds
+        )
+    return {"won": won, "turns": turns, "hp_left": hp_left}
+
+
+def balance_sweep(n: int, seed: int = 0, classes: Optional[Dict[str, dict]] = None,
+                  enemies: Optional[Dict[str, dict]] = None, max_rounds: int = MAX_ROUNDS) -> Dict:
+    """
+    Прогін усіх класів проти всіх ворогів по n боїв на пару.
+    Повертає матриці [клас, ворог]: win_rate, mean_turns (по перемогах)
+    та mean_hp_left (по перемогах).
+    """
+    classes = CLASSES if classes is None else classes
+    enemies = ENEMIES if enemies is None else enemies
+    class_ids = list(classes)
+    enemy_ids = list(enemies)
+    shape = (len(class_ids), len(enemy_ids))
+    win_rate = np.zeros(shape)
+    mean_turns = np.zeros(shape)
+    mean_hp_left = np.zeros(shape)
+
+    # Незалежний, але відтворюваний потік для кожної пари
+    streams = np.random.SeedSequence(seed).spawn(shape[0] * shape[1])
+    for i, class_id in enumerate(class_ids):
+        for j, enemy_id in enumerate(enemy_ids):
+            rng = np.random.default_rng(streams[i * shape[1] + j])
+            result = simulate_batch(classes[class_id], enemies[enemy_id], n, rng=rng, max_rounds=max_rounds)
+            won = result["won"]
+            wins = int(won.sum())
+            win_rate[i, j] = wins / n
+            if wins:
+                mean_turns[i, j] = result["turns"][won].mean()
+                mean_hp_left[i, j] = result["hp_left"][won].mean()
+
+    return {
+        "classes": class_ids,
+        "enemies": enemy_ids,
+        "win_rate": win_rate,
+        "mean_turns": mean_turns,
+        "mean_hp_left": mean_hp_left,
+    }
@@ -0,0 +1,166 @@
+"""
+Write-behind кеш персонажів.
+
+Читання обслуговуються з пам'яті (LRU з обмеженим розміром), зміни лише
+позначають персонажа та змінені поля брудними. Брудні записи
+скидаються в БД пакетами (UPDATE за первинним ключем через executemany)
+за інтервалом або при досягненні порогу, а також при зупинці бота.
+Витіснений з LRU брудний персонаж залишається в черзі запису до скидання
+і при повторному зверненні повертається з неї, а не перечитується з БД.
+Поки БД недоступна, черга обмежена max_dirty: найстаріші незаписані
+зміни відкидаються з помилкою в лозі.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from itertools import islice
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from sqlalchemy import update
+
+from bot import database
+from models.base import Character
+
+logger = logging.getLogger(__name__)
+
+# Поля персонажа, що записуються в таблицю characters
+FIELDS = ("level", "xp", "stats")
+
+
+class CharacterCache:
+    """LRU-кеш персонажів за telegram_id з відкладеним записом"""
+
+    def __init__(self, loader: Callable[[int], Awaitable], max_size: int = 10_000,
+                 flush_threshold: int = 500, flush_interval: float = 2.0, max_dirty: int = 50_000):
+        self._loader = loader
+        self.max_size = max_size
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self._entries: "OrderedDict[int, object]" = OrderedDict()
+        self._loading: Dict[int, asyncio.Future] = {}
+        # telegram_id -> (персонаж, змінені поля); _flushing - знімок, що саме записується
+        self._dirty: Dict[int, tuple] = {}
+        self._flushing: Dict[int, tuple] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.hits = self.misses = self.flushed_rows = self.dropped_rows = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    async def get(self, telegram_id: int):
+        character = self._entries.get(telegram_id)
+        if character is not None:
+            self._entries.move_to_end(telegram_id)
+            self.hits += 1
+            return character
+
+        # Витіснений, але ще не записаний персонаж новіший за рядок у БД
+        entry = self._dirty.get(telegram_id) or self._flushing.get(telegram_id)
+        if entry is not None:
+            self.hits += 1
+            self._put(telegram_id, entry[0])
+            return entry[0]
+
+        # Конкурентні промахи по тому самому гравцю чекають одне завантаження
+        pending = self._loading.get(telegram_id)
+        if pending is not None:
+            return await pending
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[telegram_id] = future
+        try:
+            character = await self._loader(telegram_id)
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # позначаємо виняток як отриманий
+            raise
+        finally:
+            del self._loading[telegram_id]
+        if not future.done():
+            future.set_result(character)
+        self._put(telegram_id, character)
+        return character
+
+    def peek(self, telegram_id: int):
+        """Персонаж з кешу без завантаження (None, якщо його там немає)"""
+        return self._entries.get(telegram_id)
+
+    def _put(self, telegram_id: int, character) -> None:
+        self._entries[telegram_id] = character
+        self._entries.move_to_end(telegram_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def mark_dirty(self, character, fields: Set[str] = frozenset(FIELDS)) -> None:
+        """Позначає змінені поля персонажа для відкладеного запису"""
+        if character.id is None:
+            return
+        entry = self._dirty.get(character.telegram_id)
+        self._dirty[character.telegram_id] = (character, (entry[1] | fields) if entry else frozenset(fields))
+        if len(self._dirty) >= self.flush_threshold and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Скидає всі брудні записи; повертає кількість оновлених рядків"""
+        async with self._flush_lock:
+            if not self._dirty or database.get_sessionmaker() is None:
+                self._dirty.clear()
+                return 0
+            dirty, self._dirty = self._dirty, {}
+            self._flushing = dirty
+
+            # Один executemany на кожен набір змінених полів
+            batches: Dict[frozenset, list] = {}
+            for character, fields in dirty.values():
+                row = {"id": character.id}
+                for field in fields:
+                    value = getattr(character, field)
+                    row[field] = dict(value) if field == "stats" else value
+                batches.setdefault(fields, []).append(row)
+            try:
+                async with database.session() as session:
+                    async with session.begin():
+                        for rows in batches.values():
+                            await session.execute(update(Character), rows)
+            except Exception:
+                # Повертаємо знімок у чергу, об'єднуючи з новішими змінами
+                for telegram_id, (character, fields) in self._dirty.items():
+                    entry = dirty.get(telegram_id)
+                    dirty[telegram_id] = (character, entry[1] | fields) if entry else (character, fields)
+                self._dirty = dirty
+                self._trim_backlog()
+                raise
+            finally:
+                self._flushing = {}
+            self.flushed_rows += len(dirty)
+            return len(dirty)
+
+    def _trim_backlog(self) -> None:
+        """Відкидає найстаріші незаписані зміни понад max_dirty"""
+        excess = len(self._dirty) - self.max_dirty
+        if excess <= 0:
+            return
+        for telegram_id in list(islice(self._dirty, excess)):
+            del self._dirty[telegram_id]
+        self.dropped_rows += excess
+        logger.error("Character write backlog over %d: dropped %d unsaved characters", self.max_dirty, excess)
+
+    async def run_flush_loop(self) -> None:
+        """Фонове скидання брудних записів за інтервалом"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush character cache")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._dirty.clear()
+        self._flushing = {}
@@ -0,0 +1,180 @@
+"""
+Персонажі гравців: читання та запис через асинхронний пул з'єднань.
+
+Персонаж разом з локаллю власника та інвентарем читається одним
+SELECT (JOIN) і далі живе у write-behind кеші (character_cache). Без
+налаштованої БД використовується персонаж за замовчуванням, що
+зберігається лише в пам'яті процесу.
+"""
+from itertools import count
+from typing import Dict, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from bot import database
+from bot.services import leaderboard, ledger_service
+from bot.services.character_cache import FIELDS, CharacterCache
+from models.base import Character, User
+
+DEFAULT_CLASS = "новачок"
+DEFAULT_LOCALE = "uk"
+DEFAULT_STATS = {
+    "hp": 100,
+    "max_hp": 100,
+    "mp": 50,
+    "max_mp": 50,
+    "attack": 15,
+    "defense": 5,
+    "speed": 30,
+    "crit": 0.05,
+    "gold": 0,
+}
+
+
+def xp_required(level: int) -> int:
+    """Досвід для досягнення наступного рівня: floor(100 * L^1.5) (GDD 3.2)"""
+    return int(100 * level ** 1.5)
+
+
+# Версії персонажів наскрізні для процесу: новий знімок (зокрема
+# перезавантажений після евікції) ніколи не повторює старої версії
+_VERSIONS = count(1)
+
+
+class PlayerCharacter:
+    """
+    Знімок персонажа в пам'яті; inventory - item_id -> кількість.
+    version змінюється при кожній зміні (touch) - за нею кешуються тексти екранів.
+    """
+    __slots__ = ("id", "telegram_id", "locale", "class_name", "level", "xp", "stats", "inventory", "version")
+
+    def __init__(self, id: Optional[int], telegram_id: int, locale: str, class_name: str,
+                 level: int, xp: int, stats: Dict, inventory: Dict[int, int]):
+        self.id = id
+        self.telegram_id = telegram_id
+        self.locale = locale
+        self.class_name = class_name
+        self.level = level
+        self.xp = xp
+        self.stats = stats
+        self.inventory = inventory
+        self.version = next(_VERSIONS)
+
+
+def touch(character: PlayerCharacter) -> None:
+    """Нова версія персонажа після зміни (скидає кешовані тексти екранів)"""
+    character.version = next(_VERSIONS)
+
+
+def default_character(telegram_id: int) -> PlayerCharacter:
+    return PlayerCharacter(None, telegram_id, DEFAULT_LOCALE, DEFAULT_CLASS, 1, 0, dict(DEFAULT_STATS), {})
+
+
+def _from_row(character: Character, telegram_id: int, locale: Optional[str]) -> PlayerCharacter:
+    return PlayerCharacter(
+        character.id,
+        telegram_id,
+        locale or DEFAULT_LOCALE,
+        character.class_name,
+        character.level,
+        character.xp,
+        {**DEFAULT_STATS, **(character.stats or {})},
+        {entry.item_id: entry.quantity for entry in character.inventory_items},
+    )
+
+
+async def load_character(telegram_id: int) -> Optional[PlayerCharacter]:
+    """Персонаж з інвентарем та локаллю за один запит або None"""
+    async with database.session() as session:
+        result = await session.execute(
+            select(Character, User.locale)
+            .join(User, Character.user_id == User.id)
+            .where(User.telegram_id == telegram_id)
+            .options(joinedload(Character.inventory_items))
+            .order_by(Character.id)
+        )
+        row = result.unique().first()
+    if row is None:
+        return None
+    character, locale = row
+    return _from_row(character, telegram_id, locale)
+
+
+async def create_character(telegram_id: int, username: Optional[str] = None,
+                           class_name: str = DEFAULT_CLASS) -> PlayerCharacter:
+    """Створює користувача (якщо його немає) та персонажа; наявного персонажа повертає як є"""
+    async with database.session() as session:
+        async with session.begin():
+            # ON CONFLICT замість SELECT + INSERT: паралельний перший вхід гравця
+            # чекає на транзакцію, що вже вставила користувача, і не створює другого
+            await session.execute(
+                database.insert(session, User)
+                .values(telegram_id=telegram_id, username=username, locale=DEFAULT_LOCALE)
+                .on_conflict_do_nothing(index_elements=["telegram_id"])
+            )
+            user_id, locale = (await session.execute(
+                select(User.id, User.locale).where(User.telegram_id == telegram_id)
+            )).one()
+            existing = await session.scalar(select(Character.id).where(Character.user_id == user_id).limit(1))
+            if existing is None:
+                character = Character(user_id=user_id, class_name=class_name, level=1, xp=0,
+                                      stats=dict(DEFAULT_STATS))
+                session.add(character)
+                await session.flush()
+                return PlayerCharacter(character.id, telegram_id, locale or DEFAULT_LOCALE, class_name,
+                                       1, 0, dict(DEFAULT_STATS), {})
+    return await load_character(telegram_id)
+
+
+async def _load_or_create(telegram_id: int) -> PlayerCharacter:
+    if database.get_sessionmaker() is None:
+        return default_character(telegram_id)
+    character = await load_character(telegram_id)
+    if character is None:
+        character = await create_character(telegram_id)
+    leaderboard.update_player(telegram_id, character.level, character.xp, character.stats)
+    return character
+
+
+# Персонажі читаються з кешу, зміни записуються пакетами у фоні
+CACHE = CharacterCache(_load_or_create)
+
+
+async def get_character(telegram_id: int) -> PlayerCharacter:
+    """Персонаж гравця (створюється при першому зверненні)"""
+    return await CACHE.get(telegram_id)
+
+
+async def user_locale(telegram_id: int) -> str:
+    """Локаль гравця для текстів інтерфейсу"""
+    return (await get_character(telegram_id)).locale
+
+
+def cached_locale(telegram_id: int) -> str:
+    """Локаль гравця з кешу без звернення до БД (DEFAULT_LOCALE, якщо його там немає)"""
+    character = CACHE.peek(telegram_id)
+    return character.locale if character is not None else DEFAULT_LOCALE
+
+
+async def save_character(character: PlayerCharacter, fields: Set[str] = frozenset(FIELDS)) -> None:
+    """Позначає рівень, досвід та/або характеристики для запису в БД"""
+    touch(character)
+    CACHE.mark_dirty(character, fields)
+
+
+def award(character: PlayerCharacter, gold: int = 0, xp: int = 0, reason: str = "reward") -> bool:
+    """
+    Нараховує золото (з записом у журнал транзакцій) та досвід, оновлює
+    рейтинги; повертає True при підвищенні рівня
+    """
+    character.stats["gold"] = character.stats.get("gold", 0) + gold
+    touch(character)
+    ledger_service.record(character.id, gold, ledger_service.CURRENCY_GOLD, reason)
+    character.xp += xp
+    leveled = False
+    while character.xp >= xp_required(character.level):
+        character.level += 1
+        leveled = True
+    leaderboard.update_player(character.telegram_id, character.level, character.xp, character.stats)
+    return leveled
@@ -0,0 +1,35 @@
+"""
+Формули урону (GDD 3.1)
+"""
+
+# Варіація урону та множник критичного удару
+DAMAGE_VARIATION = 0.05
+CRIT_MULTIPLIER = 1.5
+
+def calculate_effective_dmg(atk: int, def_: int) -> int:
+    """
+    Обчислення ефективного урону без випадковості.
+    Формула: floor(atk * 100 / (100 + def_)).
+    """
+    return (atk * 100) // (100 + def_)
+
+def damage_spread(atk: int, variation_percent: float = DAMAGE_VARIATION) -> int:
+    """
+    Межа випадкової варіації урону: R = round(atk * variation_percent).
+    """
+    return round(atk * variation_percent)
+
+def calculate_final_dmg(atk: int, def_: int, variation_percent: float = DAMAGE_VARIATION,
+                        random_factor: int = 0, crit: bool = False) -> int:
+    """
+    Обчислення фінального урону з варіацією.
+    random_factor має лежати в межах [-R, +R], де R = damage_spread(atk).
+    Якщо урон <= 0, він відбитий (0). При криті урон множиться на CRIT_MULTIPLIER.
+    """
+    effective = calculate_effective_dmg(atk, def_)
+    final = effective + random_factor
+    if final <= 0:
+        return 0
+    if crit:
+        final = int(final * CRIT_MULTIPLIER)
+    return final
@@ -0,0 +1,81 @@
+"""
+Планувальник завершення боїв та відпочинку.
+
+Сервіси реєструють обробник для свого типу таймера і планують дедлайни.
+Фоновий цикл у event loop бота раз на тік просуває TimerWheel, викликає
+обробники прострочених таймерів та надсилає гравцям їх повідомлення.
+Колесо живе в процесі: після перезапуску сервіси заново планують
+таймери збережених станів (rearm).
+"""
+import asyncio
+import inspect
+import logging
+import time
+from typing import AsyncIterable, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from bot.services import outbox
+from bot.services.user_locks import USER_LOCKS
+from bot.utils.timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+# Обробник отримує user_id і поточний час циклу (timestamp) і повертає
+# текст повідомлення або None (може бути корутиною, якщо стан у Redis)
+ExpiryHandler = Callable[[int, float], Union[Optional[str], Awaitable[Optional[str]]]]
+
+TICK_SECONDS = 1.0
+
+WHEEL = TimerWheel(resolution=TICK_SECONDS, now=time.time())
+_HANDLERS: Dict[str, ExpiryHandler] = {}
+
+
+def register_expiry_handler(kind: str, handler: ExpiryHandler) -> None:
+    """Реєструє обробник для типу таймера ("battle", "rest", ...)"""
+    _HANDLERS[kind] = handler
+
+
+def schedule(kind: str, user_id: int, deadline: float) -> None:
+    """Планує таймер kind для user_id на timestamp deadline"""
+    WHEEL.schedule((kind, user_id), deadline)
+
+
+def cancel(kind: str, user_id: int) -> None:
+    WHEEL.cancel((kind, user_id))
+
+
+async def rearm(kind: str, deadlines: AsyncIterable[Tuple[int, float]]) -> int:
+    """Планує таймери kind для збережених станів (user_id, дедлайн); прострочені спрацюють на наступному тіку"""
+    count = 0
+    async for user_id, deadline in deadlines:
+        schedule(kind, user_id, deadline)
+        count += 1
+    return count
+
+
+async def collect_expired(now: float) -> List[Tuple[int, str]]:
+    """Обробляє прострочені таймери і повертає (user_id, текст) для надсилання"""
+    messages = []
+    for (kind, user_id), _ in WHEEL.advance(now):
+        handler = _HANDLERS.get(kind)
+        if handler is None:
+            continue
+        # Не перемежовується з діями гравця, що саме обробляються
+        async with USER_LOCKS.hold(user_id):
+            text = handler(user_id, now)
+            if inspect.isawaitable(text):
+                text = await text
+        if text:
+            messages.append((user_id, text))
+    return messages
+
+
+async def run_expiry_loop(bot, clock: Callable[[], float] = time.time,
+                          sleep: Callable[[float], Awaitable] = asyncio.sleep) -> None:
+    """Фоновий цикл: евікція прострочених станів та сповіщення гравців"""
+    while True:
+        for user_id, text in await collect_expired(clock()):
+            try:
+                await outbox.send_message(bot, user_id, text)
+            except Exception:
+                logger.exception("Failed to notify user %s", user_id)
+        await sleep(TICK_SECONDS)
@@ -0,0 +1,95 @@
+"""
+Сховище ігрового стану гравців (бої, відпочинок).
+
+За замовчуванням стан живе у словниках процесу. Після use_redis()
+усі сховища працюють через Redis: кожен запис - компактний hash
+`eldoria:<тип>:<user_id>` з короткими полями, запис і TTL (EXPIREAT)
+відправляються одним pipeline, а pop виконується атомарно (MULTI/EXEC).
+
+Redis зберігає стан між перезапусками, але не робить бота
+горизонтально масштабованим: кеш персонажів (write-behind), рейтинги,
+таймери (expiry_service) і блокування гравців живуть у процесі. Тому
+одночасно має працювати лише один воркер бота. Після перезапуску
+таймери боїв і відпочинку відновлюються зі сховища (rearm_timers у
+battle_service і rest_service), тож прострочені стани завершуються
+обробниками, а не зникають разом із ключем Redis.
+"""
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple
+
+KEY_PREFIX = "eldoria"
+
+Encoder = Callable[[Any], Mapping[str, Any]]
+Decoder = Callable[[Mapping[bytes, bytes]], Any]
+
+
+class StateStore:
+    """Стан одного типу за user_id: у пам'яті або в Redis"""
+
+    def __init__(self, namespace: str, local: Dict[int, Any], encode: Encoder, decode: Decoder):
+        self.namespace = namespace
+        self.local = local
+        self.encode = encode
+        self.decode = decode
+        self.redis = None
+        _STORES.append(self)
+
+    def key(self, user_id: int) -> str:
+        return f"{KEY_PREFIX}:{self.namespace}:{user_id}"
+
+    async def get(self, user_id: int) -> Optional[Any]:
+        if self.redis is None:
+            return self.local.get(user_id)
+        data = await self.redis.hgetall(self.key(user_id))
+        return self.decode(data) if data else None
+
+    async def put(self, user_id: int, value: Any, expire_at: float) -> None:
+        """Зберігає стан; у Redis запис зникне після expire_at (timestamp)"""
+        if self.redis is None:
+            self.local[user_id] = value
+            return
+        key = self.key(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=self.encode(value))
+            pipe.expireat(key, int(expire_at) + 1)
+            await pipe.execute()
+
+    async def pop(self, user_id: int) -> Optional[Any]:
+        """Атомарно видаляє стан і повертає його (None, якщо його вже немає)"""
+        if self.redis is None:
+            return self.local.pop(user_id, None)
+        key = self.key(user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hgetall(key)
+            pipe.delete(key)
+            data, _ = await pipe.execute()
+        return self.decode(data) if data else None
+
+    async def items(self) -> AsyncIterator[Tuple[int, Any]]:
+        """Усі записи (user_id, стан); у Redis - через SCAN"""
+        if self.redis is None:
+            for user_id, value in list(self.local.items()):
+                yield user_id, value
+            return
+        async for key in self.redis.scan_iter(match=f"{KEY_PREFIX}:{self.namespace}:*", count=1000):
+            data = await self.redis.hgetall(key)
+            if data:
+                key = key.decode() if isinstance(key, bytes) else key
+                yield int(key.rsplit(":", 1)[1]), self.decode(data)
+
+    async def count(self) -> int:
+        """Кількість активних записів (у Redis - через SCAN)"""
+        if self.redis is None:
+            return len(self.local)
+        total = 0
+        async for _ in self.redis.scan_iter(match=f"{KEY_PREFIX}:{self.namespace}:*", count=1000):
+            total += 1
+        return total
+
+
+_STORES: List[StateStore] = []
+
+
+def use_redis(client) -> None:
+    """Перемикає всі сховища на Redis (None - назад у пам'ять процесу)"""
+    for store in _STORES:
+        store.redis = client
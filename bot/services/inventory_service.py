@@ -0,0 +1,127 @@
+"""
+Видача луту в інвентар.
+
+Знахідки за полювання (або за весь рейд) складаються в стеки в пам'яті
+і записуються одним INSERT ... ON CONFLICT (character_id, item_id)
+DO UPDATE SET quantity = quantity + excluded.quantity замість
+SELECT + INSERT/UPDATE на кожен предмет. Назви ресурсів відображаються
+на рядки items і кешуються в пам'яті процесу.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from sqlalchemy import select
+
+from bot import database
+from bot.services.character_service import touch
+from models.base import Inventory, Item
+
+# Рядків в одному INSERT (ліміт параметрів SQLite - 32766)
+UPSERT_CHUNK = 1_000
+
+RESOURCE_TYPE = "resource"
+RESOURCE_RARITY = "common"
+
+# Назва предмета -> items.id і навпаки
+ITEM_IDS: Dict[str, int] = {}
+ITEM_NAMES: Dict[int, str] = {}
+
+
+def stack_drops(drops: Iterable[Tuple[str, int]]) -> Counter:
+    """Складає знахідки [(назва, кількість)] у стеки за назвою"""
+    stacks = Counter()
+    for name, amount in drops:
+        if amount > 0:
+            stacks[name] += amount
+    return stacks
+
+
+async def resolve_items(names: Iterable[str]) -> Dict[str, int]:
+    """items.id для назв ресурсів; відсутні предмети створюються"""
+    missing = [name for name in set(names) if name not in ITEM_IDS]
+    if missing:
+        if database.get_sessionmaker() is None:
+            # Без БД - лише локальні ідентифікатори
+            for name in missing:
+                ITEM_IDS[name] = len(ITEM_IDS) + 1
+                ITEM_NAMES[ITEM_IDS[name]] = name
+        else:
+            async with database.session() as session:
+                async with session.begin():
+                    rows = await session.execute(
+                        select(Item.name, Item.id).where(Item.name.in_(missing)).order_by(Item.id.desc())
+                    )
+                    # При дублікатах назви перемагає найменший id
+                    found = dict(rows.all())
+                    new_items = [Item(name=name, type=RESOURCE_TYPE, rarity=RESOURCE_RARITY)
+                                 for name in missing if name not in found]
+                    if new_items:
+                        session.add_all(new_items)
+                        await session.flush()
+                        found.update((item.name, item.id) for item in new_items)
+            ITEM_IDS.update(found)
+            ITEM_NAMES.update((item_id, name) for name, item_id in found.items())
+    return {name: ITEM_IDS[name] for name in names}
+
+
+async def item_names(item_ids: Iterable[int]) -> Dict[int, str]:
+    """Назви предметів за items.id (невідомі дочитуються з БД одним запитом)"""
+    item_ids = set(item_ids)
+    missing = [item_id for item_id in item_ids if item_id not in ITEM_NAMES]
+    if missing and database.get_sessionmaker() is not None:
+        async with database.session() as session:
+            rows = await session.execute(select(Item.id, Item.name).where(Item.id.in_(missing)))
+            ITEM_NAMES.update(rows.all())
+    return {item_id: ITEM_NAMES.get(item_id, f"#{item_id}") for item_id in item_ids}
+
+
+def upsert_statement(session, rows: List[Dict]):
+    """Багаторядковий INSERT зі збільшенням кількості при конфлікті"""
+    stmt = database.insert(session, Inventory).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[Inventory.character_id, Inventory.item_id],
+        set_={"quantity": Inventory.quantity + stmt.excluded.quantity},
+    )
+
+
+async def upsert_stacks(session, rows: List[Dict]) -> None:
+    """Додає кількості (можуть бути від'ємні) в межах транзакції session"""
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        await session.execute(upsert_statement(session, rows[start:start + UPSERT_CHUNK]))
+
+
+async def write_stacks(rows: List[Dict]) -> None:
+    """Записує рядки {character_id, item_id, quantity} без дублікатів ключа"""
+    if not rows or database.get_sessionmaker() is None:
+        return
+    async with database.session() as session:
+        async with session.begin():
+            await upsert_stacks(session, rows)
+
+
+async def grant_loot_many(grants: Iterable[Tuple[object, Mapping[str, int]]]) -> int:
+    """
+    Видає лут кільком персонажам (рейд) одним записом.
+    grants - [(персонаж, {назва: кількість})]; повертає кількість стеків.
+    """
+    grants = [(character, stacks) for character, stacks in grants if stacks]
+    ids = await resolve_items({name for _, stacks in grants for name in stacks})
+    merged: Dict[Tuple[int, int], int] = {}
+    for character, stacks in grants:
+        touch(character)
+        for name, amount in stacks.items():
+            item_id = ids[name]
+            character.inventory[item_id] = character.inventory.get(item_id, 0) + amount
+            if character.id is not None:
+                key = (character.id, item_id)
+                merged[key] = merged.get(key, 0) + amount
+    await write_stacks([
+        {"character_id": character_id, "item_id": item_id, "quantity": quantity}
+        for (character_id, item_id), quantity in merged.items()
+    ])
+    return len(merged)
+
+
+async def grant_loot(character, drops: Iterable[Tuple[str, int]]) -> int:
+    """Видає знахідки одного полювання"""
+    return await grant_loot_many([(character, stack_drops(drops))])
@@ -0,0 +1,148 @@
+"""
+Рейтинги гравців за рівнем, досвідом і золотом (GDD). Рейтинг PvP
+з'явиться разом з PvP-боями: перемог поки ніщо не нараховує.
+
+Кожен рейтинг - відсортований індекс (SortedList) у пам'яті, тож місце
+гравця і сторінка топу знаходяться за O(log n) без ORDER BY по JSON-колонці.
+Запис у індексі - одне ціле число: (-значення << ID_BITS) | telegram_id,
+тобто вищі значення йдуть першими, при рівності - менший telegram_id
+(ID_BITS з запасом: ідентифікатори Telegram займають до 52 біт).
+Індекс оновлюється при нарахуванні досвіду/золота (award) і повністю
+перебудовується з БД при старті потоковим запитом.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+from sqlalchemy import select
+
+from bot import database
+from models.base import Character, User
+
+ID_BITS = 64
+ID_MASK = (1 << ID_BITS) - 1
+
+METRIC_LEVEL = "level"
+METRIC_XP = "xp"
+METRIC_GOLD = "gold"
+METRICS = (METRIC_LEVEL, METRIC_XP, METRIC_GOLD)
+
+# Розмір пакета рядків при потоковій перебудові
+REBUILD_BATCH = 10_000
+
+
+def _key(score: int, telegram_id: int) -> int:
+    return (-score << ID_BITS) | telegram_id
+
+
+class Leaderboard:
+    """Рейтинг за однією метрикою"""
+
+    def __init__(self):
+        self._index = SortedList()
+        self._scores: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def update(self, telegram_id: int, score: int) -> None:
+        old = self._scores.get(telegram_id)
+        if old == score:
+            return
+        if old is not None:
+            self._index.remove(_key(old, telegram_id))
+        self._index.add(_key(score, telegram_id))
+        self._scores[telegram_id] = score
+
+    def discard(self, telegram_id: int) -> None:
+        score = self._scores.pop(telegram_id, None)
+        if score is not None:
+            self._index.remove(_key(score, telegram_id))
+
+    def score(self, telegram_id: int) -> Optional[int]:
+        return self._scores.get(telegram_id)
+
+    def rank(self, telegram_id: int) -> Optional[int]:
+        """Місце гравця (з 1) або None, якщо його немає в рейтингу"""
+        score = self._scores.get(telegram_id)
+        if score is None:
+            return None
+        return self._index.index(_key(score, telegram_id)) + 1
+
+    def top(self, limit: int = 10, offset: int = 0) -> List[Tuple[int, int]]:
+        """Сторінка рейтингу: [(telegram_id, значення)]"""
+        return [(key & ID_MASK, -(key >> ID_BITS)) for key in self._index.islice(offset, offset + limit)]
+
+    def load(self, scores: Dict[int, int]) -> None:
+        """Замінює вміст рейтингу (одне сортування замість n вставок)"""
+        self._scores = scores
+        self._index = SortedList(_key(score, telegram_id) for telegram_id, score in scores.items())
+
+
+LEADERBOARDS: Dict[str, Leaderboard] = {metric: Leaderboard() for metric in METRICS}
+
+
+def metric_values(level: int, xp: int, stats: Dict) -> Tuple[int, int, int]:
+    """Значення метрик у порядку METRICS"""
+    return level, xp, int(stats.get("gold", 0))
+
+
+def update_player(telegram_id: int, level: int, xp: int, stats: Dict) -> None:
+    """Оновлює всі рейтинги гравця"""
+    for metric, value in zip(METRICS, metric_values(level, xp, stats)):
+        LEADERBOARDS[metric].update(telegram_id, value)
+
+
+def get_rank(metric: str, telegram_id: int) -> Optional[int]:
+    return LEADERBOARDS[metric].rank(telegram_id)
+
+
+def get_top(metric: str, limit: int = 10, offset: int = 0) -> List[Tuple[int, int]]:
+    return LEADERBOARDS[metric].top(limit, offset)
+
+
+Row = Tuple[int, int, int, Optional[int]]
+
+
+def _add_rows(columns: List[Dict[int, int]], rows: Iterable[Row]) -> None:
+    for telegram_id, level, xp, gold in rows:
+        # Перший (найстаріший) персонаж гравця, як у load_character
+        if telegram_id in columns[0]:
+            continue
+        for column, value in zip(columns, (level or 1, xp or 0, gold or 0)):
+            column[telegram_id] = value
+
+
+def _install(columns: List[Dict[int, int]]) -> int:
+    for metric, column in zip(METRICS, columns):
+        LEADERBOARDS[metric].load(column)
+    return len(columns[0])
+
+
+def load_rows(rows: Iterable[Row]) -> int:
+    """Перебудовує рейтинги з рядків (telegram_id, level, xp, gold)"""
+    columns: List[Dict[int, int]] = [{} for _ in METRICS]
+    _add_rows(columns, rows)
+    return _install(columns)
+
+
+async def rebuild() -> int:
+    """Перебудовує рейтинги з БД потоковим запитом; повертає кількість гравців"""
+    if database.get_sessionmaker() is None:
+        return 0
+    query = (
+        select(
+            User.telegram_id,
+            Character.level,
+            Character.xp,
+            Character.stats["gold"].as_integer(),
+        )
+        .join(User, Character.user_id == User.id)
+        .order_by(Character.id)
+        .execution_options(yield_per=REBUILD_BATCH)
+    )
+    columns: List[Dict[int, int]] = [{} for _ in METRICS]
+    async with database.session() as session:
+        result = await session.stream(query)
+        async for partition in result.partitions():
+            _add_rows(columns, partition)
+    return _install(columns)
@@ -0,0 +1,240 @@
+"""
+Журнал транзакцій золота та самоцвітів (персонажі та скарбниці гільдій).
+
+Транзакції лише додаються: record() кладе їх у буфер, який записується
+в transactions пакетними INSERT (за порогом, інтервалом і при зупинці).
+Баланси періодично «прокручуються» у balance_snapshots: знімок містить
+баланс і останню враховану транзакцію, тож читання балансу - це знімок
+плюс коротка дельта після нього (індекс за власником, валютою та id)
+плюс ще не записаний буфер. reconcile() потоково перевіряє знімки по
+всій історії.
+"""
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, insert, select
+
+from bot import database
+from models.base import BalanceSnapshot, Transaction
+
+logger = logging.getLogger(__name__)
+
+OWNER_CHARACTER = "character"
+OWNER_GUILD = "guild"
+
+CURRENCY_GOLD = "gold"
+CURRENCY_GEMS = "gems"
+
+FLUSH_THRESHOLD = 500
+# Розмір пакета рядків при звірці
+RECONCILE_BATCH = 10_000
+
+Owner = Tuple[str, int, str]  # (тип власника, id, валюта)
+
+_pending: List[Dict] = []
+# Сума незаписаних (і тих, що записуються) транзакцій за власником
+_pending_delta: Counter = Counter()
+# Баланси без БД
+_local: Counter = Counter()
+_flush_lock = asyncio.Lock()
+_flush_task: Optional[asyncio.Task] = None
+# Покоління запису буфера: непарне, поки пакет записується і знімається з _pending_delta
+_flush_generation = 0
+
+
+def _owner(character_id: Optional[int], guild_id: Optional[int], currency: str) -> Owner:
+    if guild_id is not None:
+        return OWNER_GUILD, guild_id, currency
+    return OWNER_CHARACTER, character_id, currency
+
+
+def record(character_id: Optional[int], amount: int, currency: str, type: str,
+           guild_id: Optional[int] = None) -> None:
+    """Додає транзакцію (guild_id - рух коштів скарбниці гільдії)"""
+    global _flush_task
+    if amount == 0 or (character_id is None and guild_id is None):
+        return
+    owner = _owner(character_id, guild_id, currency)
+    if database.get_sessionmaker() is None:
+        _local[owner] += amount
+        return
+    _pending.append({"character_id": character_id, "guild_id": guild_id, "type": type,
+                     "amount": amount, "currency": currency})
+    _pending_delta[owner] += amount
+    if len(_pending) >= FLUSH_THRESHOLD and (_flush_task is None or _flush_task.done()):
+        _flush_task = asyncio.get_running_loop().create_task(flush())
+
+
+async def flush() -> int:
+    """Записує буфер транзакцій одним пакетним INSERT"""
+    global _pending, _flush_generation
+    async with _flush_lock:
+        if not _pending or database.get_sessionmaker() is None:
+            return 0
+        rows, _pending = _pending, []
+        _flush_generation += 1
+        try:
+            async with database.session() as session:
+                async with session.begin():
+                    await session.execute(insert(Transaction), rows)
+        except Exception:
+            _pending[:0] = rows
+            raise
+        else:
+            # Тепер ці суми видно в БД
+            for row in rows:
+                owner = _owner(row["character_id"], row["guild_id"], row["currency"])
+                _pending_delta[owner] -= row["amount"]
+                if not _pending_delta[owner]:
+                    del _pending_delta[owner]
+        finally:
+            _flush_generation += 1
+        return len(rows)
+
+
+def _owner_columns():
+    owner_type = case((Transaction.guild_id.is_not(None), OWNER_GUILD), else_=OWNER_CHARACTER)
+    owner_id = func.coalesce(Transaction.guild_id, Transaction.character_id)
+    return owner_type, owner_id
+
+
+def _owner_filter(owner_type: str, owner_id: int, currency: str):
+    if owner_type == OWNER_GUILD:
+        return Transaction.guild_id == owner_id, Transaction.currency == currency
+    return Transaction.character_id == owner_id, Transaction.guild_id.is_(None), Transaction.currency == currency
+
+
+async def roll_snapshots() -> int:
+    """
+    Переносить у знімки транзакції після знімка кожного власника. Межа
+    своя для кожного власника: транзакція іншого воркера з меншим id, що
+    закомітилась пізніше, не губиться за чужою межею.
+    """
+    await flush()
+    if database.get_sessionmaker() is None:
+        return 0
+    owner_type, owner_id = _owner_columns()
+    async with database.session() as session:
+        async with session.begin():
+            deltas = (await session.execute(
+                select(owner_type, owner_id, Transaction.currency, func.sum(Transaction.amount), func.max(Transaction.id))
+                .outerjoin(BalanceSnapshot, and_(
+                    BalanceSnapshot.owner_type == owner_type,
+                    BalanceSnapshot.owner_id == owner_id,
+                    BalanceSnapshot.currency == Transaction.currency,
+                ))
+                .where(Transaction.id > func.coalesce(BalanceSnapshot.last_transaction_id, 0))
+                .group_by(owner_type, owner_id, Transaction.currency)
+            )).all()
+            if not deltas:
+                return 0
+            stmt = database.insert(session, BalanceSnapshot)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[BalanceSnapshot.owner_type, BalanceSnapshot.owner_id, BalanceSnapshot.currency],
+                set_={
+                    "balance": BalanceSnapshot.balance + stmt.excluded.balance,
+                    "last_transaction_id": stmt.excluded.last_transaction_id,
+                },
+            )
+            await session.execute(stmt, [
+                {"owner_type": kind, "owner_id": oid, "currency": currency, "balance": delta,
+                 "last_transaction_id": last_id}
+                for kind, oid, currency, delta, last_id in deltas
+            ])
+    return len(deltas)
+
+
+async def get_balance(owner_type: str, owner_id: int, currency: str = CURRENCY_GOLD) -> int:
+    """Баланс: знімок + дельта після нього + незаписані транзакції"""
+    owner = (owner_type, owner_id, currency)
+    if database.get_sessionmaker() is None:
+        return _local[owner]
+    while True:
+        generation = _flush_generation
+        stored = await _stored_balance(owner_type, owner_id, currency)
+        # Буфер читається після БД і лише якщо між ними не було запису пакета,
+        # інакше транзакції пакета порахуються двічі або жодного разу
+        if generation % 2 == 0 and generation == _flush_generation:
+            return stored + _pending_delta[owner]
+        async with _flush_lock:
+            pass
+
+
+async def _stored_balance(owner_type: str, owner_id: int, currency: str) -> int:
+    """Записаний у БД баланс: знімок + дельта після нього"""
+    async with database.session() as session:
+        snapshot = (await session.execute(
+            select(BalanceSnapshot.balance, BalanceSnapshot.last_transaction_id).where(
+                BalanceSnapshot.owner_type == owner_type,
+                BalanceSnapshot.owner_id == owner_id,
+                BalanceSnapshot.currency == currency,
+            )
+        )).first()
+        balance, last_id = snapshot if snapshot else (0, 0)
+        delta = await session.scalar(
+            select(func.coalesce(func.sum(Transaction.amount), 0))
+            .where(*_owner_filter(owner_type, owner_id, currency), Transaction.id > last_id)
+        )
+    return balance + delta
+
+
+async def reconcile() -> List[Tuple[Owner, int, int]]:
+    """
+    Звіряє знімки з історією: потоково сумує всі транзакції до
+    last_transaction_id кожного знімка. Власники без знімка (їх
+    транзакції ще не прокручено) не звіряються. Повертає розбіжності
+    [(власник, сума за історією, баланс знімка)].
+    """
+    if database.get_sessionmaker() is None:
+        return []
+    async with database.session() as session:
+        snapshots = {
+            (kind, oid, currency): (balance, last_id)
+            for kind, oid, currency, balance, last_id in (await session.execute(select(
+                BalanceSnapshot.owner_type, BalanceSnapshot.owner_id, BalanceSnapshot.currency,
+                BalanceSnapshot.balance, BalanceSnapshot.last_transaction_id,
+            ))).all()
+        }
+        watermark = max((last_id for _, last_id in snapshots.values()), default=0)
+        sums: Counter = Counter()
+        result = await session.stream(
+            select(Transaction.id, Transaction.character_id, Transaction.guild_id,
+                   Transaction.currency, Transaction.amount)
+            .where(Transaction.id <= watermark)
+            .order_by(Transaction.id)
+            .execution_options(yield_per=RECONCILE_BATCH)
+        )
+        async for partition in result.partitions():
+            for tx_id, character_id, guild_id, currency, amount in partition:
+                owner = _owner(character_id, guild_id, currency)
+                snapshot = snapshots.get(owner)
+                if snapshot is not None and tx_id <= snapshot[1]:
+                    sums[owner] += amount
+    return [
+        (owner, sums[owner], balance)
+        for owner, (balance, _) in snapshots.items()
+        if sums[owner] != balance
+    ]
+
+
+async def run_ledger_loop(flush_interval: float = 2.0, snapshot_every: int = 30) -> None:
+    """Фоновий запис буфера та прокручування знімків (кожні snapshot_every інтервалів)"""
+    ticks = 0
+    while True:
+        await asyncio.sleep(flush_interval)
+        ticks += 1
+        try:
+            if ticks % snapshot_every == 0:
+                await roll_snapshots()
+            else:
+                await flush()
+        except Exception:
+            logger.exception("Failed to write ledger")
+
+
+def clear() -> None:
+    _pending.clear()
+    _pending_delta.clear()
+    _local.clear()
@@ -0,0 +1,231 @@
+"""
+Каталог текстів інтерфейсу за локаллю.
+
+Уся таблиця localization завантажується при старті в словники
+locale -> key -> шаблон. Рядки інтерновані, шаблони перевіряються і
+готуються один раз: текст без підстановок повертається як є, з
+підстановками - через заздалегідь зв'язаний str.format. Вбудовані
+українські тексти (DEFAULT_TEXTS) є запасним варіантом для будь-якого
+ключа. Перезавантаження будує новий каталог окремо і підміняє його
+одним присвоєнням, тож рендер ніколи не бачить напівзавантажений стан.
+"""
+import asyncio
+import logging
+import sys
+from string import Formatter
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+from sqlalchemy import func, select
+
+from bot import database
+from models.base import Localization
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCALE = "uk"
+
+# Вбудовані тексти; рядки таблиці localization перекривають їх
+DEFAULT_TEXTS: Dict[str, str] = {
+    # Кнопки
+    "button.profile": "👤 Профіль",
+    "button.rest": "🏕 Відпочинок",
+    "button.hunt": "🗡 Полювання",
+    "button.quests": "📜 Квести",
+    "button.stats": "📊 Характеристики",
+    "button.inventory": "🎒 Інвентар",
+    "button.back": "🔙 Назад",
+    "button.attack": "⚔️ Атакувати",
+    "button.defend": "🛡 Захищатися",
+    "button.flee": "🏃 Втекти",
+    # Меню
+    "menu.main": "🏰 Легенди Ельдорії\nВітаю, Герою! Обери дію:",
+    "profile.already_open": "Профіль вже відкритий",
+    "profile.stats_already_open": "Статистика вже відображена",
+    "profile.text": (
+        "👤 Профіль персонажа\n\n"
+        "📊 Рівень: {level}\n"
+        "❤️ Здоров'я: {hp}/{max_hp}\n"
+        "⚔️ Атака: {attack}\n"
+        "🛡 Захист: {defense}\n"
+        "💰 Золото: {gold}\n"
+        "✨ Досвід: {xp}/{xp_next}\n"
+        "🏆 Місце в рейтингу: {rank}"
+    ),
+    "inventory.empty": "🎒 Інвентар порожній",
+    "inventory.header": "🎒 Інвентар:\n",
+    "inventory.item": "• {name} ×{amount}",
+    "inventory.already_open": "Інвентар вже відкритий",
+    # Полювання та бій
+    "hunt.already_in_battle": "Ви вже в бою",
+    "hunt.exhausted": "❤️ Ви занадто виснажені для полювання. Відпочиньте!",
+    "hunt.exploring": "🔍 Ви досліджуєте територію...\n\n",
+    "hunt.resources": "📦 Знайдено ресурси:\n",
+    "hunt.resource": "• {amount} {name}",
+    "hunt.tracks": "👣 Ви помітили {tracks}\n\n",
+    "hunt.enemy": (
+        "⚠️ Ви натрапили на {enemy}!\n\n"
+        "❤️ Ваше здоров'я: {player_hp}\n"
+        "❤️ Здоров'я ворога: {enemy_hp}\n"
+        "⚔️ Атака ворога: {attack}\n"
+        "🛡 Захист ворога: {defense}\n\n"
+        "Оберіть дію:"
+    ),
+    "hunt.safe": "✅ Ви безпечно дослідили територію",
+    "battle.in_progress": (
+        "⚔️ Ви вже в бою!\n"
+        "⏳ Залишилось: {minutes} хвилин\n"
+        "❤️ Ваше здоров'я: {player_hp}\n"
+        "❤️ Здоров'я ворога: {enemy_hp}"
+    ),
+    "battle.timeout": "⏰ Час бою вийшов!",
+    "battle.not_in_battle": "❌ Ви не в бою!",
+    "battle.unknown_action": "❌ Невідома дія",
+    "battle.action_done": "Дія вже виконана",
+    "battle.fled": "🏃 Вам вдалося втекти!",
+    "battle.flee_failed": "❌ Втеча не вдалася!",
+    "battle.defend": "🛡 Ви захищаєтесь!",
+    "battle.player_hit": "⚔️ Ви завдали {damage} шкоди!",
+    "battle.player_crit": "💥 Критичний удар! Ви завдали {damage} шкоди!",
+    "battle.enemy_hit": "⚔️ Ворог завдав {damage} шкоди!",
+    "battle.enemy_crit": "💥 Критичний удар! Ворог завдав {damage} шкоди!",
+    "battle.status": "❤️ Ваше здоров'я: {player_hp}\n❤️ Здоров'я ворога: {enemy_hp}",
+    "battle.lost": "❌ Ви програли бій!",
+    "battle.won": "✅ Ви перемогли {enemy}!\n💰 Отримано: {gold} золота\n✨ Досвід: {exp}",
+    # Відпочинок
+    "rest.already_resting": "Ви вже відпочиваєте",
+    "rest.in_progress": "⏳ Ви вже відпочиваєте. Залишилось: {minutes} хвилин",
+    "rest.started": (
+        "😴 Ви почали відпочивати на {hours} годин.\n"
+        "⏰ Час закінчення: {end_time}\n\n"
+        "Поверніться після відпочинку, щоб отримати бонуси!"
+    ),
+    "rest.finished": "✅ Відпочинок завершено! Ви знову готові до пригод.",
+    "rest.restored": "🛌 Відпочили {hours:.1f}h: HP +{hp_diff} ({old_hp}->{new_hp}), MP +{mp_diff} ({old_mp}->{new_mp})",
+    # Квести
+    "quests.header": "📜 Доступні квести:\n\n",
+    "quests.item": (
+        "🔹 {title}\n"
+        "📝 {description}\n"
+        "💰 Нагорода: {gold} золота, {exp} досвіду\n"
+        "📊 Рівень: {level}+\n\n"
+    ),
+    "quests.footer": "Натисніть на квест, щоб прийняти його",
+    "quests.empty": "Для вашого рівня квестів немає",
+    "quests.already_open": "Список квестів вже відкритий",
+    "quest.not_found": "❌ Квест не знайдено",
+    "quest.accepted": "✅ Ви прийняли квест: {title}",
+    "quest.accepted_id": "Квест #{quest_id} прийнято!",
+    "quest.already_accepted": "Квест вже прийнято",
+    "quest.completed": "Квест завершено",
+    "quest.not_ready": "⏳ Квест ще не виконано",
+    "quest.level_required": "❌ Потрібен рівень {level}",
+    "quest.rewarded": "🎉 Квест «{title}» виконано!\n💰 Нагорода: {gold} золота, {exp} досвіду",
+    # Обмеження частоти
+    "throttle.too_fast": "⏳ Не так швидко!",
+    # Аукціон
+    "auction.bad_price": "❌ Некоректна ціна",
+    "auction.no_item": "❌ У вас немає цього предмета",
+    "auction.listed": "✅ Лот #{listing_id} виставлено за {price} {currency}",
+    "auction.not_found": "❌ Лот не знайдено або його вже продано",
+    "auction.own_listing": "❌ Не можна купити власний лот",
+    "auction.no_funds": "❌ Недостатньо коштів",
+    "auction.bought": "✅ Лот #{listing_id} куплено за {price} {currency}",
+    "currency.gold": "золота",
+    "currency.gems": "самоцвітів",
+}
+
+# Підготовлений шаблон: готовий рядок або зв'язаний str.format
+Template = Union[str, Callable[..., str]]
+
+_FORMATTER = Formatter()
+
+
+def template_fields(text: str) -> FrozenSet[str]:
+    """Імена підстановок шаблону (ValueError для некоректного шаблону)"""
+    return frozenset(field for _, field, _, _ in _FORMATTER.parse(text) if field is not None)
+
+
+def compile_template(text: str) -> Template:
+    text = sys.intern(text)
+    return text.format if template_fields(text) else text
+
+
+_DEFAULT_FIELDS = {key: template_fields(text) for key, text in DEFAULT_TEXTS.items()}
+
+
+class Catalog:
+    """Незмінний набір шаблонів за локаллю"""
+    __slots__ = ("locales", "fingerprint")
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str]], fingerprint: Optional[Tuple] = None):
+        locales: Dict[str, Dict[str, Template]] = {
+            DEFAULT_LOCALE: {sys.intern(key): compile_template(text) for key, text in DEFAULT_TEXTS.items()}
+        }
+        for key, locale, text in rows:
+            expected = _DEFAULT_FIELDS.get(key)
+            try:
+                fields = template_fields(text)
+            except ValueError:
+                fields = None
+            # Переклад не може вимагати підстановок, яких сервіси не передають
+            if fields is None or (expected is not None and not fields <= expected):
+                logger.warning("Skipping invalid localization %s/%s", locale, key)
+                continue
+            locales.setdefault(sys.intern(locale), {})[sys.intern(key)] = compile_template(text)
+        self.locales = locales
+        self.fingerprint = fingerprint
+
+    def render(self, key: str, locale: str = DEFAULT_LOCALE, **values) -> str:
+        templates = self.locales.get(locale)
+        template = templates.get(key) if templates is not None else None
+        if template is None:
+            template = self.locales[DEFAULT_LOCALE].get(key, key)
+        return template if isinstance(template, str) else template(**values)
+
+
+CATALOG = Catalog(())
+
+
+def t(key: str, locale: str = DEFAULT_LOCALE, **values) -> str:
+    """Текст за ключем у локалі гравця (з підстановкою values)"""
+    return CATALOG.render(key, locale, **values)
+
+
+async def _fingerprint(session) -> Tuple:
+    return tuple((await session.execute(
+        select(func.count(), func.max(Localization.updated_at))
+    )).one())
+
+
+async def load_catalog() -> Catalog:
+    """Завантажує всю таблицю і атомарно підміняє каталог"""
+    global CATALOG
+    if database.get_sessionmaker() is None:
+        return CATALOG
+    async with database.session() as session:
+        fingerprint = await _fingerprint(session)
+        rows = (await session.execute(select(Localization.key, Localization.locale, Localization.text))).all()
+    CATALOG = Catalog(rows, fingerprint)
+    return CATALOG
+
+
+async def reload_if_changed() -> bool:
+    """Перезавантажує каталог, якщо таблиця змінилась (кількість або updated_at)"""
+    if database.get_sessionmaker() is None:
+        return False
+    async with database.session() as session:
+        fingerprint = await _fingerprint(session)
+    if fingerprint == CATALOG.fingerprint:
+        return False
+    await load_catalog()
+    return True
+
+
+async def run_reload_loop(interval: float = 60.0) -> None:
+    """Фонова перевірка змін у таблиці localization"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reload_if_changed()
+        except Exception:
+            logger.exception("Failed to reload localization")
@@ -0,0 +1,192 @@
+"""
+Вибірка луту та зустрічей на полюванні.
+
+Таблиці локації компілюються один раз: категоріальні розподіли (ворог /
+сліди / нічого, набір знайдених ресурсів, тир і предмет луту)
+перетворюються на alias-таблиці (метод Вокера-Воуза), тож кожна вибірка
+коштує один індекс та одне порівняння незалежно від кількості варіантів.
+Ресурси зберігають незалежні шанси: таблиця будується над усіма 2^k
+наборами знайдених ресурсів, тому розрахована на кілька ресурсів локації.
+
+Поки що в грі одна локація полювання (HUNT_TABLE у battle_service) і немає
+предметів з рідкістю: тирові таблиці (Common/Rare/Epic/Legendary з GDD)
+компілює compile_drops і підключає compile_location(drops=...), щойно
+з'являться дані.
+"""
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Типи результату зустрічі
+ENCOUNTER_NONE = 0
+ENCOUNTER_ENEMY = 1
+ENCOUNTER_TRACKS = 2
+
+# Ваги тирів загальної таблиці луту (GDD 3.3)
+TIERS = (("common", 60), ("rare", 30), ("epic", 8), ("legendary", 2))
+
+
+class AliasTable:
+    """Alias-таблиця для вибірки з дискретного розподілу за O(1)"""
+    __slots__ = ("outcomes", "prob", "alias", "_np_prob", "_np_alias")
+
+    def __init__(self, weighted: Sequence[Tuple[Any, float]]):
+        weighted = [(outcome, weight) for outcome, weight in weighted if weight > 0]
+        if not weighted:
+            raise ValueError("Alias table needs at least one positive weight")
+        n = len(weighted)
+        total = sum(weight for _, weight in weighted)
+        scaled = [weight * n / total for _, weight in weighted]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Решта комірок (з точністю до округлення) має prob = 1
+        self.outcomes = tuple(outcome for outcome, _ in weighted)
+        self.prob = tuple(prob)
+        self.alias = tuple(alias)
+        self._np_prob = np.array(prob)
+        self._np_alias = np.array(alias)
+
+    def sample_index(self, rng: random.Random) -> int:
+        i = int(rng.random() * len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+    def sample(self, rng: random.Random) -> Any:
+        return self.outcomes[self.sample_index(rng)]
+
+    def sample_indices(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Пакетна вибірка size індексів в outcomes"""
+        i = rng.integers(0, len(self.prob), size=size)
+        return np.where(rng.random(size) < self._np_prob[i], i, self._np_alias[i])
+
+
+class DropTable:
+    """Тирова таблиця луту: alias-таблиця тирів і по одній на предмети тиру"""
+    __slots__ = ("tiers", "items")
+
+    def __init__(self, tiers: AliasTable, items: Dict[str, AliasTable]):
+        self.tiers = tiers
+        self.items = items
+
+
+def compile_drops(items: Dict[str, Dict[str, float]],
+                  tiers: Sequence[Tuple[str, float]] = TIERS, nothing: float = 0.0) -> DropTable:
+    """
+    Компілює тирову таблицю. items - {тир: {предмет: вага}}; тири без
+    предметів не випадають, nothing - вага результату "нічого" (None).
+    """
+    compiled = {tier: AliasTable(list(weights.items())) for tier, weights in items.items() if weights}
+    weighted = [(tier, weight) for tier, weight in tiers if tier in compiled]
+    weighted.append((None, nothing))
+    return DropTable(AliasTable(weighted), compiled)
+
+
+def roll_drop(table: DropTable, rng: random.Random) -> Optional[Tuple[str, str]]:
+    """Один предмет луту: (тир, предмет) або None"""
+    tier = table.tiers.sample(rng)
+    if tier is None:
+        return None
+    return tier, table.items[tier].sample(rng)
+
+
+def roll_drops(table: DropTable, n: int, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Пакетна вибірка n предметів. Повертає "tiers" - індекси в
+    table.tiers.outcomes та "items" - індекси в outcomes таблиці тиру
+    (-1, якщо випало "нічого").
+    """
+    rng = np.random.default_rng(seed)
+    tiers = table.tiers.sample_indices(rng, n)
+    items = np.full(n, -1)
+    for index, tier in enumerate(table.tiers.outcomes):
+        if tier is None:
+            continue
+        rows = np.flatnonzero(tiers == index)
+        items[rows] = table.items[tier].sample_indices(rng, len(rows))
+    return {"tiers": tiers, "items": items}
+
+
+class LocationTable:
+    """Скомпільовані таблиці полювання для однієї локації"""
+    __slots__ = ("resources", "found", "encounters", "drops", "_masks", "_mins", "_maxs")
+
+    def __init__(self, resources: Tuple[Tuple[str, int, int], ...], found: AliasTable,
+                 encounters: AliasTable, drops: Optional[DropTable] = None):
+        self.resources = resources
+        self.found = found
+        self.encounters = encounters
+        self.drops = drops
+        # Маска знайдених ресурсів для кожного результату found
+        self._masks = np.array([[i in subset for i in range(len(resources))] for subset in found.outcomes],
+                               dtype=bool)
+        self._mins = np.array([low for _, low, _ in resources])
+        self._maxs = np.array([high for _, _, high in resources])
+
+
+def _found_subsets(chances: Sequence[float]) -> List[Tuple[Tuple[int, ...], float]]:
+    """Усі набори знайдених ресурсів з їх імовірностями (шанси незалежні)"""
+    subsets = [((), 1.0)]
+    for i, chance in enumerate(chances):
+        subsets = [
+            outcome
+            for subset, p in subsets
+            for outcome in ((subset + (i,), p * chance), (subset, p * (1.0 - chance)))
+        ]
+    return subsets
+
+
+def compile_location(resources: Dict[str, Dict], enemies: Dict[str, Dict], tracks_chance: float,
+                     drops: Optional[DropTable] = None) -> LocationTable:
+    """
+    Компілює таблиці локації. Ворог обирається як і раніше: перший ворог
+    (у порядку словника), що пройшов перевірку свого chance; якщо ворога
+    немає - з імовірністю tracks_chance знаходимо сліди випадкового ворога.
+    """
+    weighted = []
+    remaining = 1.0
+    for enemy_id, enemy in enemies.items():
+        weighted.append(((ENCOUNTER_ENEMY, enemy_id), remaining * enemy["chance"]))
+        remaining *= 1.0 - enemy["chance"]
+    for enemy_id in enemies:
+        weighted.append(((ENCOUNTER_TRACKS, enemy_id), remaining * tracks_chance / len(enemies)))
+    weighted.append(((ENCOUNTER_NONE, None), remaining * (1.0 - tracks_chance)))
+
+    compiled_resources = tuple((name, data["min"], data["max"]) for name, data in resources.items())
+    found = AliasTable(_found_subsets([data["chance"] for data in resources.values()]))
+    return LocationTable(compiled_resources, found, AliasTable(weighted), drops)
+
+
+def roll_hunt(table: LocationTable, rng: random.Random) -> Tuple[List[Tuple[str, int]], int, Optional[str]]:
+    """
+    Один прогін полювання. Повертає (знайдені ресурси [(назва, кількість)],
+    тип зустрічі, ID ворога або None).
+    """
+    found = []
+    for i in table.found.sample(rng):
+        name, low, high = table.resources[i]
+        found.append((name, rng.randint(low, high)))
+    kind, enemy_id = table.encounters.sample(rng)
+    return found, kind, enemy_id
+
+
+def roll_hunts(table: LocationTable, n: int, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Пакетний прогін n полювань. Повертає "resources" - кількості ресурсів
+    (n x кількість ресурсів, 0 якщо не знайдено) та "encounters" - індекси
+    в table.encounters.outcomes.
+    """
+    rng = np.random.default_rng(seed)
+    found = table._masks[table.found.sample_indices(rng, n)]
+    amounts = rng.integers(table._mins, table._maxs + 1, size=(n, len(table.resources)))
+    return {
+        "resources": np.where(found, amounts, 0),
+        "encounters": table.encounters.sample_indices(rng, n),
+    }
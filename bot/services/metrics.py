@@ -0,0 +1,182 @@
+"""
+Метрики бота у форматі Prometheus.
+
+Лічильники, гістограми і gauge живуть у пам'яті процесу; оновлення -
+кілька операцій зі словником і списком, без блокувань (усе в одному
+event loop), тож метрики можна не вимикати в продакшні. Gauge рахується
+функцією лише під час збирання. render() віддає текстовий формат
+Prometheus, start_server() - локальний HTTP-ендпоінт /metrics.
+"""
+import functools
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from aiohttp import web
+
+PREFIX = "eldoria_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Межі кошиків гістограм затримки, секунди
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _labels(names: Sequence[str], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.label_names = tuple(labels)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}_total{_labels(self.label_names, key)} {_number(value)}"
+                for key, value in self.values.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.bounds = tuple(buckets)
+        # значення міток -> [лічильники кошиків (останній - +Inf), сума]
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.bounds) + 1), 0.0]
+        series[0][bisect_left(self.bounds, value)] += 1
+        series[1] += value
+
+    def count(self, *label_values) -> int:
+        series = self.series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), counts):
+                cumulative += count
+                labels = _labels(self.label_names + ("le",), key + (_number(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(Metric):
+    """Значення обчислюється функцією під час збирання"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.read = read
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_number(self.read())}"]
+
+
+REGISTRY: Dict[str, Metric] = {}
+
+
+def _register(metric: Metric) -> Metric:
+    existing = REGISTRY.get(metric.name)
+    if existing is not None:
+        return existing
+    REGISTRY[metric.name] = metric
+    return metric
+
+
+def counter(name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+    return _register(Counter(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: Sequence[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, labels, buckets))
+
+
+def gauge(name: str, help_text: str, read: Callable[[], float]) -> Gauge:
+    """Gauge з функцією читання (повторна реєстрація замінює функцію)"""
+    metric = _register(Gauge(name, help_text, read))
+    metric.read = read
+    return metric
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY.values()) + "\n"
+
+
+SERVICE_SECONDS = histogram("service_seconds", "Service call latency", ("service",))
+SERVICE_ERRORS = counter("service_errors", "Service calls that raised", ("service",))
+
+
+def timed(service: str):
+    """Декоратор: час виконання async-функції сервісу і помилки"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                SERVICE_ERRORS.inc(service)
+                raise
+            finally:
+                SERVICE_SECONDS.observe(time.perf_counter() - start, service)
+        return wrapper
+    return decorator
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(body=render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+async def start_server(host: str, port: int) -> web.AppRunner:
+    """Локальний HTTP-сервер з /metrics; повертає runner для cleanup()"""
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
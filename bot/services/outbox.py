@@ -0,0 +1,333 @@
+"""
+Черга вихідних повідомлень.
+
+Хендлери ставлять відправку/редагування в чергу і не чекають на Telegram.
+Один воркер розсилає чергу з урахуванням лімітів: спільного (GLOBAL_RATE
+повідомлень на секунду) і окремого для кожного чату (CHAT_RATE, з запасом
+CHAT_BURST) - обидва як token bucket. Для одного чату одночасно
+відправляється не більше одного запиту, тож порядок зберігається. Кілька
+редагувань одного повідомлення, що чекають у черзі, зливаються в останнє.
+На 429 (retry_after) чат відкладається на вказаний час, на мережеві
+помилки - повтор з експоненційною затримкою.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from aiogram.exceptions import TelegramBadRequest, TelegramNetworkError, TelegramRetryAfter
+
+from bot.services.render_cache import RENDERS
+
+logger = logging.getLogger(__name__)
+
+# Ліміти Telegram: ~30 повідомлень/с загалом, ~1/с в один чат
+GLOBAL_RATE = 30.0
+CHAT_RATE = 1.0
+CHAT_BURST = 3
+MAX_CONCURRENCY = 30
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+# Як часто (у відправках) прибирати бездіяльні чати
+SWEEP_EVERY = 1024
+
+KIND_SEND = "send"
+KIND_EDIT = "edit"
+
+
+class TokenBucket:
+    """rate токенів на секунду, не більше capacity"""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Бере токен; повертає 0 або скільки секунд чекати до наступного"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class Job:
+    """Запит до Telegram; futures - усі, хто чекає на нього (зокрема злиті редагування)"""
+    __slots__ = ("kind", "chat_id", "message_id", "text", "kwargs", "futures", "attempts")
+
+    def __init__(self, kind: str, chat_id: int, message_id: Optional[int], text: str, kwargs: Dict,
+                 future: asyncio.Future):
+        self.kind = kind
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = text
+        self.kwargs = kwargs
+        self.futures = [future]
+        self.attempts = 0
+
+
+class ChatQueue:
+    __slots__ = ("jobs", "bucket", "busy", "blocked_until")
+
+    def __init__(self, bucket: TokenBucket):
+        self.jobs: Deque[Job] = deque()
+        self.bucket = bucket
+        self.busy = False
+        self.blocked_until = 0.0
+
+
+class Outbox:
+    """Черга відправки з лімітами та злиттям редагувань"""
+
+    def __init__(self, bot, global_rate: float = GLOBAL_RATE, chat_rate: float = CHAT_RATE,
+                 chat_burst: float = CHAT_BURST, max_concurrency: int = MAX_CONCURRENCY,
+                 max_retries: int = MAX_RETRIES, clock: Callable[[], float] = time.monotonic):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.clock = clock
+        self._global = TokenBucket(global_rate, max(global_rate / 10, 1), clock())
+        self._chats: Dict[int, ChatQueue] = {}
+        # (chat_id, message_id) -> редагування, яке ще не відправлене
+        self._edits: Dict[Tuple[int, int], Job] = {}
+        self._ready: Deque[int] = deque()
+        self._delayed: List[Tuple[float, int]] = []
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._inflight: set = set()
+        self._dispatched = 0
+        self.delivered = 0
+        self.dropped_edits = 0
+        self.retries = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue.jobs) for queue in self._chats.values()) + len(self._inflight)
+
+    def send_message(self, chat_id: int, text: str, **kwargs) -> asyncio.Future:
+        """Ставить нове повідомлення в чергу"""
+        return self._enqueue(Job(KIND_SEND, chat_id, None, text, kwargs, self._future()))
+
+    def edit_text(self, chat_id: int, message_id: int, text: str, **kwargs) -> asyncio.Future:
+        """Ставить редагування в чергу; очікуване редагування того ж повідомлення замінюється"""
+        pending = self._edits.get((chat_id, message_id))
+        if pending is not None:
+            pending.text = text
+            pending.kwargs = kwargs
+            self.dropped_edits += 1
+            return pending.futures[0]
+        job = Job(KIND_EDIT, chat_id, message_id, text, kwargs, self._future())
+        self._edits[chat_id, message_id] = job
+        return self._enqueue(job)
+
+    def _future(self) -> asyncio.Future:
+        return asyncio.get_running_loop().create_future()
+
+    def _enqueue(self, job: Job) -> asyncio.Future:
+        queue = self._chats.get(job.chat_id)
+        if queue is None:
+            queue = self._chats[job.chat_id] = ChatQueue(TokenBucket(self.chat_rate, self.chat_burst, self.clock()))
+        queue.jobs.append(job)
+        if len(queue.jobs) == 1 and not queue.busy and queue.blocked_until <= self.clock():
+            self._ready.append(job.chat_id)
+            self._wakeup.set()
+        return job.futures[0]
+
+    def _schedule(self, chat_id: int, queue: ChatQueue, now: float) -> None:
+        """Повертає чат у чергу готових або відкладених"""
+        if not queue.jobs or queue.busy:
+            return
+        if queue.blocked_until > now:
+            heapq.heappush(self._delayed, (queue.blocked_until, chat_id))
+        else:
+            self._ready.append(chat_id)
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """Воркер розсилки"""
+        while True:
+            now = self.clock()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, chat_id = heapq.heappop(self._delayed)
+                queue = self._chats.get(chat_id)
+                if queue is not None and queue.jobs and not queue.busy:
+                    self._ready.append(chat_id)
+            if not self._ready:
+                self._wakeup.clear()
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            chat_id = self._ready.popleft()
+            queue = self._chats.get(chat_id)
+            if queue is None or queue.busy or not queue.jobs:
+                continue
+            if queue.blocked_until > now:
+                heapq.heappush(self._delayed, (queue.blocked_until, chat_id))
+                continue
+            wait = queue.bucket.take(now)
+            if wait:
+                queue.blocked_until = now + wait
+                heapq.heappush(self._delayed, (queue.blocked_until, chat_id))
+                continue
+            wait = self._global.take(now)
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self._global.take(self.clock())
+
+            job = queue.jobs.popleft()
+            if job.kind == KIND_EDIT and self._edits.get((chat_id, job.message_id)) is job:
+                del self._edits[chat_id, job.message_id]
+            queue.busy = True
+            await self._slots.acquire()
+            task = asyncio.create_task(self._deliver(queue, job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+            self._dispatched += 1
+            if self._dispatched % SWEEP_EVERY == 0:
+                self._sweep(now)
+
+    async def _call(self, job: Job) -> Any:
+        if job.kind == KIND_EDIT:
+            return await self.bot.edit_message_text(text=job.text, chat_id=job.chat_id,
+                                                    message_id=job.message_id, **job.kwargs)
+        return await self.bot.send_message(job.chat_id, job.text, **job.kwargs)
+
+    async def _deliver(self, queue: ChatQueue, job: Job) -> None:
+        try:
+            result = await self._call(job)
+        except TelegramRetryAfter as error:
+            self._retry(queue, job, error.retry_after)
+        except TelegramNetworkError:
+            self._retry(queue, job, BACKOFF_BASE * 2 ** job.attempts)
+        except TelegramBadRequest as error:
+            # Текст не змінився - редагування просто не потрібне
+            if "message is not modified" in str(error):
+                self._resolve(job)
+            else:
+                logger.warning("Telegram rejected %s to chat %s: %s", job.kind, job.chat_id, error)
+                self._fail(job, error)
+        except Exception as error:
+            logger.exception("Failed to deliver %s to chat %s", job.kind, job.chat_id)
+            self._fail(job, error)
+        else:
+            self.delivered += 1
+            self._resolve(job, result)
+        finally:
+            self._slots.release()
+            queue.busy = False
+        self._schedule(job.chat_id, queue, self.clock())
+
+    def _retry(self, queue: ChatQueue, job: Job, delay: float) -> None:
+        job.attempts += 1
+        if job.attempts > self.max_retries:
+            self._fail(job, RuntimeError(f"Gave up sending to chat {job.chat_id}"))
+            return
+        self.retries += 1
+        self._requeue(queue, job)
+        queue.blocked_until = max(queue.blocked_until, self.clock() + delay)
+
+    def _fail(self, job: Job, error: BaseException) -> None:
+        self.failed += 1
+        self._resolve(job, error=error)
+
+    def _requeue(self, queue: ChatQueue, job: Job) -> None:
+        """Повертає запит на початок черги чату; новіше редагування поглинає старе"""
+        if job.kind == KIND_EDIT:
+            newer = self._edits.get((job.chat_id, job.message_id))
+            if newer is not None:
+                newer.futures.extend(job.futures)
+                self.dropped_edits += 1
+                return
+            self._edits[job.chat_id, job.message_id] = job
+        queue.jobs.appendleft(job)
+
+    @staticmethod
+    def _resolve(job: Job, result: Any = None, error: Optional[BaseException] = None) -> None:
+        for future in job.futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+                # Хендлери зазвичай не чекають на доставку
+                future.exception()
+            else:
+                future.set_result(result)
+
+    def _sweep(self, now: float) -> None:
+        """Прибирає чати без черги з повним bucket (їхній стан нічого не обмежує)"""
+        idle = [chat_id for chat_id, queue in self._chats.items()
+                if not queue.jobs and not queue.busy and queue.bucket.full(now)]
+        for chat_id in idle:
+            del self._chats[chat_id]
+
+    async def drain(self, timeout: float = 10.0) -> bool:
+        """Чекає, доки черга спорожніє; False, якщо вийшов час"""
+        deadline = self.clock() + timeout
+        while self.pending:
+            if self.clock() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+
+OUTBOX: Optional[Outbox] = None
+_task: Optional[asyncio.Task] = None
+
+
+def start(bot, **kwargs) -> Outbox:
+    """Створює чергу і запускає воркер"""
+    global OUTBOX, _task
+    OUTBOX = Outbox(bot, **kwargs)
+    _task = asyncio.create_task(OUTBOX.run())
+    return OUTBOX
+
+
+async def stop(timeout: float = 10.0) -> None:
+    """Дочікується відправки черги і зупиняє воркер"""
+    global OUTBOX, _task
+    if OUTBOX is None:
+        return
+    if not await OUTBOX.drain(timeout):
+        logger.warning("Outbox stopped with %d pending messages", OUTBOX.pending)
+    _task.cancel()
+    OUTBOX, _task = None, None
+
+
+async def send_message(bot, chat_id: int, text: str, **kwargs):
+    """Відправка через чергу (без очікування доставки) або напряму, якщо черга не запущена"""
+    if OUTBOX is None:
+        return await bot.send_message(chat_id, text, **kwargs)
+    return OUTBOX.send_message(chat_id, text, **kwargs)
+
+
+async def answer(message, text: str, **kwargs):
+    """message.answer через чергу"""
+    return await send_message(message.bot, message.chat.id, text, **kwargs)
+
+
+async def edit_text(message, text: str, **kwargs):
+    """message.edit_text через чергу (зі злиттям редагувань)"""
+    # Повідомлення більше не показує записаний екран (див. render_cache.mark_shown)
+    RENDERS.forget(message.chat.id, message.message_id)
+    if OUTBOX is None:
+        return await message.edit_text(text, **kwargs)
+    return OUTBOX.edit_text(message.chat.id, message.message_id, text, **kwargs)
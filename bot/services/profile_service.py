@@ -1,35 +1,41 @@
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from bot.services.character_service import get_character, xp_required
+from bot.services.inventory_service import item_names
+from bot.services.leaderboard import METRIC_LEVEL, get_rank
+from bot.services.localization import t
+from bot.services.render_cache import RENDERS, SCREEN_INVENTORY, SCREEN_PROFILE, Rendered
+
+async def profile_screen(user_id: int) -> Rendered:
+    """Текст профілю (з кешу, поки персонаж і місце в рейтингу не змінились)"""
+    character = await get_character(user_id)
+    rank = get_rank(METRIC_LEVEL, user_id)
+
+    async def render() -> str:
+        stats = character.stats
+        return t(
+            "profile.text", character.locale,
+            level=character.level, hp=stats['hp'], max_hp=stats['max_hp'], attack=stats['attack'],
+            defense=stats['defense'], gold=stats['gold'], xp=character.xp, xp_next=xp_required(character.level),
+            rank=rank or '—',
+        )
+
+    return await RENDERS.get(character, SCREEN_PROFILE, render, extra=rank)
 
 async def get_profile_text(user_id: int) -> str:
     """Повертає текст профілю персонажа"""
-    # TODO: Отримати дані з бази даних
-    return (
-        "👤 Профіль персонажа\n\n"
-        "📊 Рівень: 1\n"
-        "❤️ Здоров'я: 100/100\n"
-        "⚔️ Атака: 10\n"
-        "🛡 Захист: 5\n"
-        "💰 Золото: 0\n"
-        "✨ Досвід: 0/100"
-    )
+    return (await profile_screen(user_id)).text
 
-def get_profile_keyboard() -> InlineKeyboardMarkup:
-    """Повертає клавіатуру профілю"""
-    buttons = [
-        [
-            InlineKeyboardButton(text="📊 Характеристики", callback_data="profile:stats"),
-            InlineKeyboardButton(text="🎒 Інвентар", callback_data="profile:inventory")
-        ],
-        [
-            InlineKeyboardButton(text="🔙 Назад", callback_data="menu:main")
-        ]
-    ]
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+async def inventory_screen(user_id: int) -> Rendered:
+    """Текст інвентаря (з кешу, поки персонаж не змінився)"""
+    character = await get_character(user_id)
 
-async def list_quests(user_id: int) -> list:
-    # TODO: отримати список квестів з БД
-    return []
+    async def render() -> str:
+        stacks = [(item_id, amount) for item_id, amount in character.inventory.items() if amount > 0]
+        if not stacks:
+            return t("inventory.empty", character.locale)
+        names = await item_names(item_id for item_id, _ in stacks)
+        items = sorted((names[item_id], amount) for item_id, amount in stacks)
+        return t("inventory.header", character.locale) + "\n".join(
+            t("inventory.item", character.locale, name=name, amount=amount) for name, amount in items
+        )
 
-async def accept_quest(user_id: int, quest_id: int) -> str:
-    # TODO: прийняти квест
-    return f"Квест #{quest_id} прийнято!" 
\ No newline at end of file
+    return await RENDERS.get(character, SCREEN_INVENTORY, render)
@@ -0,0 +1,166 @@
+"""
+Каталог квестів.
+
+Рядки таблиці quests завантажуються один раз і індексуються за ID, типом
+і діапазоном рівнів (LEVEL_BUCKET рівнів на діапазон). Список гравця -
+квести всіх діапазонів до його власного з рівнем не вищим за його;
+текст рендериться один раз на (локаль, рівень) і далі береться зі
+словника. Новий каталог будується окремо і підміняється одним
+присвоєнням; кеш текстів також скидається при зміні каталогу локалізації.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+
+from bot import database
+from bot.services import localization
+from bot.services.localization import t
+from models.base import Quest
+
+logger = logging.getLogger(__name__)
+
+# Рівнів в одному діапазоні списку квестів
+LEVEL_BUCKET = 5
+# Квестів в одному списку (обмеження довжини повідомлення Telegram)
+LISTING_LIMIT = 20
+
+# Вбудовані квести; додаються в таблицю quests при старті
+QUESTS = [
+    {
+        "id": 1,
+        "title": "Перші кроки",
+        "description": "Знайдіть 5 грибів у лісі",
+        "reward": {"gold": 100, "exp": 50},
+        "requirements": {"level": 1, "objectives": {"gather:гриби": 5}},
+        "type": "gathering"
+    },
+    {
+        "id": 2,
+        "title": "Охоронець лісу",
+        "description": "Перемогти 3 вовків",
+        "reward": {"gold": 200, "exp": 100},
+        "requirements": {"level": 2, "objectives": {"kill:вовк": 3}},
+        "type": "combat"
+    }
+]
+
+
+def required_level(quest: Dict) -> int:
+    return quest["requirements"].get("level", 1)
+
+
+def level_bucket(level: int) -> int:
+    return (max(level, 1) - 1) // LEVEL_BUCKET
+
+
+def quest_from_row(row: Quest) -> Dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description or "",
+        "reward": row.rewards or {"gold": 0, "exp": 0},
+        "requirements": row.requirements or {},
+        "type": row.type,
+    }
+
+
+class QuestCatalog:
+    """Незмінний набір квестів з індексами та кешем текстів списку"""
+    __slots__ = ("by_id", "by_type", "by_bucket", "_listings", "_texts")
+
+    def __init__(self, quests):
+        by_id: Dict[int, Dict] = {}
+        by_type: Dict[str, List[Dict]] = {}
+        by_bucket: Dict[int, List[Dict]] = {}
+        for quest in sorted(quests, key=lambda q: (required_level(q), q["id"])):
+            by_id[quest["id"]] = quest
+            by_type.setdefault(quest["type"], []).append(quest)
+            by_bucket.setdefault(level_bucket(required_level(quest)), []).append(quest)
+        self.by_id = by_id
+        self.by_type = {key: tuple(value) for key, value in by_type.items()}
+        self.by_bucket = {key: tuple(value) for key, value in by_bucket.items()}
+        # (локаль, рівень) -> готовий текст списку
+        self._listings: Dict[Tuple[str, int], str] = {}
+        self._texts = localization.CATALOG
+
+    def get(self, quest_id: int) -> Optional[Dict]:
+        return self.by_id.get(quest_id)
+
+    def of_type(self, quest_type: str) -> Tuple[Dict, ...]:
+        return self.by_type.get(quest_type, ())
+
+    def available(self, level: int, limit: int = LISTING_LIMIT) -> List[Dict]:
+        """До limit доступних квестів з найвищим рівнем (за зростанням рівня)"""
+        quests: List[Dict] = []
+        for bucket in range(level_bucket(level), -1, -1):
+            for quest in reversed(self.by_bucket.get(bucket, ())):
+                if required_level(quest) <= level:
+                    quests.append(quest)
+                    if len(quests) == limit:
+                        return quests[::-1]
+        return quests[::-1]
+
+    def listing(self, locale: str, level: int) -> str:
+        """Список квестів, доступних на рівні гравця"""
+        if self._texts is not localization.CATALOG:
+            self._listings = {}
+            self._texts = localization.CATALOG
+        key = (locale, max(level, 1))
+        text = self._listings.get(key)
+        if text is None:
+            text = self._listings[key] = self._render(locale, key[1])
+        return text
+
+    def _render(self, locale: str, level: int) -> str:
+        quests = self.available(level)
+        if not quests:
+            return t("quests.header", locale) + t("quests.empty", locale)
+        items = [
+            t("quests.item", locale, title=quest["title"], description=quest["description"],
+              gold=quest["reward"]["gold"], exp=quest["reward"]["exp"], level=required_level(quest))
+            for quest in quests
+        ]
+        return t("quests.header", locale) + "".join(items) + t("quests.footer", locale)
+
+
+CATALOG = QuestCatalog(QUESTS)
+
+
+def get_quest(quest_id: int) -> Optional[Dict]:
+    return CATALOG.by_id.get(quest_id)
+
+
+async def sync_quests() -> None:
+    """
+    Додає вбудовані квести в таблицю quests (на них посилається quest_progress).
+    ID вбудованих квестів сталі (їх містять callback-и і прогрес), тому
+    вставляються явно, а послідовність PostgreSQL після цього зсувається за
+    них - інакше наступний квест без ID отримав би вже зайнятий.
+    """
+    async with database.session() as session:
+        async with session.begin():
+            stmt = database.insert(session, Quest).values([
+                {"id": q["id"], "type": q["type"], "title": q["title"], "description": q["description"],
+                 "requirements": q["requirements"], "rewards": q["reward"]}
+                for q in QUESTS
+            ])
+            await session.execute(stmt.on_conflict_do_nothing(index_elements=["id"]))
+            if session.bind.dialect.name == "postgresql":
+                await session.execute(text(
+                    "SELECT setval(pg_get_serial_sequence('quests', 'id'), (SELECT MAX(id) FROM quests))"
+                ))
+
+
+async def load_catalog() -> QuestCatalog:
+    """Завантажує таблицю quests і атомарно підміняє каталог"""
+    global CATALOG
+    if database.get_sessionmaker() is None:
+        return CATALOG
+    await sync_quests()
+    async with database.session() as session:
+        rows = (await session.scalars(select(Quest))).all()
+        quests = [quest_from_row(row) for row in rows]
+    CATALOG = QuestCatalog(quests)
+    logger.info("Loaded %d quests", len(quests))
+    return CATALOG
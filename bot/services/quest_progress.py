@@ -0,0 +1,246 @@
+"""
+Прогрес квестів за подіями гри.
+
+Цілі квесту - лічильники подій ("kill:вовк": 3, "gather:гриби": 5).
+Активні квести гравця завантажуються одним запитом і індексуються за
+ключем події, тож подія оновлює лише відповідні цілі за O(1). Квест
+завершується в тому ж проході, коли виконано останню ціль. Зміни
+прогресу записуються в quest_progress пакетами (UPDATE за первинним
+ключем через executemany), як і в кеші персонажів. Гравці тримаються в
+LRU обмеженого розміру; гравець з незаписаним прогресом не витісняється,
+інакше його квести перечитались би з БД застарілими.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update
+
+from bot import database
+from models.base import QuestProgress
+
+logger = logging.getLogger(__name__)
+
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_COMPLETED = "completed"
+
+
+def kill_event(enemy_id: str) -> str:
+    return f"kill:{enemy_id}"
+
+
+def gather_event(resource: str) -> str:
+    return f"gather:{resource}"
+
+
+def objectives_of(quest: Dict) -> Dict[str, int]:
+    """Цілі квесту {ключ події: потрібна кількість}"""
+    return quest.get("requirements", {}).get("objectives", {})
+
+
+class ActiveQuest:
+    """Прийнятий квест гравця; remaining - кількість ще не виконаних цілей"""
+    __slots__ = ("quest_id", "progress_id", "targets", "counts", "remaining", "status")
+
+    def __init__(self, quest_id: int, progress_id: Optional[int], targets: Dict[str, int],
+                 counts: Optional[Dict[str, int]] = None):
+        self.quest_id = quest_id
+        self.progress_id = progress_id
+        self.targets = targets
+        self.counts = {key: min((counts or {}).get(key, 0), target) for key, target in targets.items()}
+        self.remaining = sum(1 for key, target in targets.items() if self.counts[key] < target)
+        self.status = STATUS_IN_PROGRESS
+
+
+class PlayerQuests:
+    """Активні квести гравця, індекс за ключем події та виконані квести"""
+    __slots__ = ("telegram_id", "by_id", "by_event", "completed")
+
+    def __init__(self, telegram_id: Optional[int] = None):
+        self.telegram_id = telegram_id
+        self.by_id: Dict[int, ActiveQuest] = {}
+        self.by_event: Dict[str, List[ActiveQuest]] = {}
+        self.completed: Set[int] = set()
+
+    def add(self, active: ActiveQuest) -> None:
+        self.by_id[active.quest_id] = active
+        for key in active.targets:
+            self.by_event.setdefault(key, []).append(active)
+
+    def remove(self, active: ActiveQuest) -> None:
+        del self.by_id[active.quest_id]
+        for key in active.targets:
+            entries = self.by_event[key]
+            entries.remove(active)
+            if not entries:
+                del self.by_event[key]
+
+
+class QuestTracker:
+    """Прогрес квестів гравців за telegram_id з пакетним записом"""
+
+    def __init__(self, get_quest: Callable[[int], Optional[Dict]], flush_threshold: int = 500,
+                 flush_interval: float = 2.0, max_players: int = 10_000):
+        self._get_quest = get_quest
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self.max_players = max_players
+        self._players: "OrderedDict[int, PlayerQuests]" = OrderedDict()
+        # progress_id -> квест, прогрес якого ще не записано
+        self._dirty: Dict[int, ActiveQuest] = {}
+        # Гравці з незаписаним прогресом і ті, чий прогрес саме записується
+        self._dirty_players: Set[int] = set()
+        self._flushing_players: Set[int] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.events = 0
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    async def player(self, telegram_id: int, character_id: Optional[int]) -> PlayerQuests:
+        """Квести гравця (завантажуються одним запитом при першому зверненні)"""
+        player = self._players.get(telegram_id)
+        if player is not None:
+            self._players.move_to_end(telegram_id)
+            return player
+        loaded = PlayerQuests(telegram_id)
+        if character_id is not None and database.get_sessionmaker() is not None:
+            async with database.session() as session:
+                rows = await session.scalars(
+                    select(QuestProgress).where(QuestProgress.character_id == character_id)
+                )
+                for row in rows:
+                    quest = self._get_quest(row.quest_id)
+                    if row.status == STATUS_COMPLETED:
+                        loaded.completed.add(row.quest_id)
+                    elif quest is not None:
+                        loaded.add(ActiveQuest(row.quest_id, row.id, objectives_of(quest), row.progress))
+        # Конкурентне завантаження того самого гравця - лишаємо перше
+        player = self._players.setdefault(telegram_id, loaded)
+        self._evict(telegram_id)
+        return player
+
+    def _evict(self, keep: int) -> None:
+        """Витісняє найстаріших гравців понад max_players (крім keep), чий прогрес уже записано"""
+        excess = len(self._players) - self.max_players
+        if excess <= 0:
+            return
+        victims = []
+        for telegram_id in self._players:
+            if telegram_id == keep or telegram_id in self._dirty_players or telegram_id in self._flushing_players:
+                continue
+            victims.append(telegram_id)
+            if len(victims) == excess:
+                break
+        for telegram_id in victims:
+            del self._players[telegram_id]
+
+    async def accept(self, telegram_id: int, character_id: Optional[int], quest: Dict) -> Optional[ActiveQuest]:
+        """Додає квест гравцю; None, якщо квест уже прийнято або виконано"""
+        player = await self.player(telegram_id, character_id)
+        if quest["id"] in player.by_id or quest["id"] in player.completed:
+            return None
+        progress_id = None
+        if character_id is not None and database.get_sessionmaker() is not None:
+            async with database.session() as session:
+                async with session.begin():
+                    # Унікальний (character_id, quest_id): паралельне прийняття
+                    # (зокрема на іншому воркері) не створює другого рядка
+                    progress_id = await session.scalar(
+                        database.insert(session, QuestProgress)
+                        .values(character_id=character_id, quest_id=quest["id"], progress={},
+                                status=STATUS_IN_PROGRESS)
+                        .on_conflict_do_nothing(index_elements=["character_id", "quest_id"])
+                        .returning(QuestProgress.id)
+                    )
+            if progress_id is None:
+                return None
+        if quest["id"] in player.by_id:
+            return None
+        active = ActiveQuest(quest["id"], progress_id, objectives_of(quest))
+        player.add(active)
+        return active
+
+    def record(self, player: PlayerQuests, events: Iterable[Tuple[str, int]]) -> List[ActiveQuest]:
+        """Застосовує події до цілей; повертає щойно виконані квести"""
+        completed = []
+        for key, amount in events:
+            self.events += 1
+            entries = player.by_event.get(key)
+            if not entries:
+                continue
+            for active in tuple(entries):
+                count = active.counts[key]
+                target = active.targets[key]
+                if count >= target:
+                    continue
+                active.counts[key] = min(count + amount, target)
+                if active.counts[key] >= target:
+                    active.remaining -= 1
+                    if active.remaining == 0:
+                        self.finish(player, active)
+                        completed.append(active)
+                        continue
+                self._mark_dirty(player, active)
+        return completed
+
+    def finish(self, player: PlayerQuests, active: ActiveQuest) -> None:
+        """Позначає квест виконаним і прибирає його з індексу"""
+        active.status = STATUS_COMPLETED
+        player.remove(active)
+        player.completed.add(active.quest_id)
+        self._mark_dirty(player, active)
+
+    def _mark_dirty(self, player: PlayerQuests, active: ActiveQuest) -> None:
+        if active.progress_id is None:
+            return
+        self._dirty[active.progress_id] = active
+        if player.telegram_id is not None:
+            self._dirty_players.add(player.telegram_id)
+        if len(self._dirty) >= self.flush_threshold and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Записує змінений прогрес; повертає кількість рядків"""
+        async with self._flush_lock:
+            if not self._dirty or database.get_sessionmaker() is None:
+                self._dirty.clear()
+                self._dirty_players.clear()
+                return 0
+            dirty, self._dirty = self._dirty, {}
+            self._flushing_players, self._dirty_players = self._dirty_players, set()
+            rows = [{"id": progress_id, "progress": dict(active.counts), "status": active.status}
+                    for progress_id, active in dirty.items()]
+            try:
+                async with database.session() as session:
+                    async with session.begin():
+                        await session.execute(update(QuestProgress), rows)
+            except Exception:
+                for progress_id, active in dirty.items():
+                    self._dirty.setdefault(progress_id, active)
+                self._dirty_players |= self._flushing_players
+                raise
+            finally:
+                self._flushing_players = set()
+            return len(rows)
+
+    async def run_flush_loop(self) -> None:
+        """Фоновий запис прогресу квестів"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush quest progress")
+
+    def clear(self) -> None:
+        self._players.clear()
+        self._dirty.clear()
+        self._dirty_players.clear()
+        self._flushing_players = set()
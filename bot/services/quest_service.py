@@ -1,56 +1,77 @@
-from typing import List, Dict
-from datetime import datetime
-
-# Тимчасове сховище квестів (пізніше перенесемо в базу даних)
-QUESTS = [
-    {
-        "id": 1,
-        "title": "Перші кроки",
-        "description": "Знайдіть 5 грибів у лісі",
-        "reward": {"gold": 100, "exp": 50},
-        "requirements": {"level": 1},
-        "type": "gathering"
-    },
-    {
-        "id": 2,
-        "title": "Охоронець лісу",
-        "description": "Перемогти 3 вовків",
-        "reward": {"gold": 200, "exp": 100},
-        "requirements": {"level": 2},
-        "type": "combat"
-    }
-]
+from typing import Dict, Iterable, Tuple
+from bot.services import quest_catalog
+from bot.services.character_service import award, get_character, save_character
+from bot.services.localization import t
+from bot.services.quest_progress import QuestTracker, objectives_of
+
+# Прогрес прийнятих квестів з індексом за подіями
+TRACKER = QuestTracker(quest_catalog.get_quest)
 
 async def list_quests(user_id: int) -> str:
-    """Повертає список доступних квестів"""
-    text = "📜 Доступні квести:\n\n"
-    
-    for quest in QUESTS:
-        text += f"🔹 {quest['title']}\n"
-        text += f"📝 {quest['description']}\n"
-        text += f"💰 Нагорода: {quest['reward']['gold']} золота, {quest['reward']['exp']} досвіду\n"
-        text += f"📊 Рівень: {quest['requirements']['level']}+\n\n"
-    
-    text += "Натисніть на квест, щоб прийняти його"
-    return text
+    """Повертає список квестів для рівня гравця (готовий текст з каталогу)"""
+    character = await get_character(user_id)
+    return quest_catalog.CATALOG.listing(character.locale, character.level)
 
 async def accept_quest(user_id: int, quest_id: int) -> str:
     """Приймає квест для користувача"""
-    quest = next((q for q in QUESTS if q["id"] == quest_id), None)
+    character = await get_character(user_id)
+    locale = character.locale
+    quest = quest_catalog.get_quest(quest_id)
     if not quest:
-        return "❌ Квест не знайдено"
-    
-    # TODO: Перевірка рівня персонажа
-    # TODO: Збереження активного квесту в базі даних
-    
-    return f"✅ Ви прийняли квест: {quest['title']}"
+        return t("quest.not_found", locale)
+    level = quest_catalog.required_level(quest)
+    if character.level < level:
+        return t("quest.level_required", locale, level=level)
+    if await TRACKER.accept(user_id, character.id, quest) is None:
+        return t("quest.already_accepted", locale)
+    return t("quest.accepted", locale, title=quest['title'])
+
+
+def _reward(character, quest_id: int) -> str:
+    """Видає нагороду за виконаний квест; текст для гравця"""
+    quest = quest_catalog.get_quest(quest_id)
+    reward = quest["reward"]
+    award(character, gold=reward["gold"], xp=reward["exp"], reason="quest")
+    return t("quest.rewarded", character.locale, title=quest["title"], gold=reward["gold"], exp=reward["exp"])
+
+
+async def record_events(character, events: Iterable[Tuple[str, int]]) -> str:
+    """Застосовує події гравця (ключ, кількість) до квестів; текст про виконані квести"""
+    player = await TRACKER.player(character.telegram_id, character.id)
+    if not player.by_event:
+        return ""
+    completed = TRACKER.record(player, events)
+    if not completed:
+        return ""
+    texts = [_reward(character, active.quest_id) for active in completed]
+    await save_character(character)
+    return "\n\n".join(texts)
+
 
 async def check_quest_progress(user_id: int, quest_id: int) -> Dict:
     """Перевіряє прогрес квесту"""
-    # TODO: Реалізувати перевірку прогресу
-    return {"completed": False, "progress": 0}
+    character = await get_character(user_id)
+    player = await TRACKER.player(user_id, character.id)
+    if quest_id in player.completed:
+        return {"completed": True, "progress": dict(objectives_of(quest_catalog.get_quest(quest_id)))}
+    active = player.by_id.get(quest_id)
+    return {"completed": False, "progress": dict(active.counts) if active else {}}
+
 
 async def complete_quest(user_id: int, quest_id: int) -> str:
     """Завершує квест і видає нагороду"""
-    # TODO: Реалізувати завершення квесту
-    return "Квест завершено" 
\ No newline at end of file
+    character = await get_character(user_id)
+    player = await TRACKER.player(user_id, character.id)
+    if quest_id in player.completed:
+        return t("quest.completed", character.locale)
+    active = player.by_id.get(quest_id)
+    if active is None:
+        return t("quest.not_found", character.locale)
+    # Зазвичай квест завершується подією; тут - якщо цілі вже виконані
+    if active.remaining:
+        return t("quest.not_ready", character.locale)
+    TRACKER.finish(player, active)
+    text = _reward(character, quest_id)
+    await save_character(character)
+    return text
+
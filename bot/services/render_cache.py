@@ -0,0 +1,131 @@
+"""
+Кеш готових текстів екранів (профіль, інвентар, стан бою).
+
+Текст зберігається на пару (гравець, екран) разом з відбитком: версія
+персонажа (змінюється при кожній зміні, character_service.touch), локаль
+і дані поза персонажем, від яких залежить текст (місце в рейтингу, HP у
+бою). Поки відбиток той самий, екран не рендериться повторно.
+
+Для кожного повідомлення запам'ятовується відбиток екрана, записаного в
+нього (mark_shown; будь-яке інше редагування через outbox його забуває):
+якщо він збігається, редагування не потрібне без порівняння текстів. Для
+повідомлень без запису (до перезапуску) порівнюється текст у вигляді, в
+якому його показує Telegram (без HTML-розмітки). Кеш скидається при зміні
+каталогу локалізації.
+"""
+import html
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Tuple
+
+from bot.services import localization, metrics
+
+SCREEN_PROFILE = "profile"
+SCREEN_INVENTORY = "inventory"
+SCREEN_BATTLE = "battle"
+
+MAX_ENTRIES = 50_000
+
+RENDER_LOOKUPS = metrics.counter("render_cache_lookups", "Screen text lookups", ("screen", "result"))
+RENDER_SECONDS = metrics.histogram("render_cache_seconds", "Screen text lookup latency", ("screen", "result"))
+SKIPPED_EDITS = metrics.counter("render_cache_skipped_edits", "Edits skipped: message already shows the text",
+                                ("screen",))
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+def plain_text(text: str) -> str:
+    """Текст так, як його поверне Telegram у message.text (parse_mode HTML)"""
+    return html.unescape(_TAG.sub("", text)).strip()
+
+
+class Rendered:
+    """Готовий текст екрана з відбитком стану, з якого його зроблено"""
+    __slots__ = ("screen", "stamp", "text", "plain")
+
+    def __init__(self, screen: str, stamp: Tuple, text: str):
+        self.screen = screen
+        self.stamp = stamp
+        self.text = text
+        self.plain = plain_text(text)
+
+
+class RenderCache:
+    """LRU (гравець, екран) -> Rendered"""
+
+    def __init__(self, max_size: int = MAX_ENTRIES):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[int, str], Rendered]" = OrderedDict()
+        # (чат, повідомлення) -> (екран, відбиток), записані в повідомлення
+        self._shown: "OrderedDict[Tuple[int, int], Tuple[str, Tuple]]" = OrderedDict()
+        self._texts = localization.CATALOG
+        self.hits = self.misses = self.skipped_edits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def get(self, character, screen: str, render: Callable[[], Awaitable[str]],
+                  extra: Hashable = ()) -> Rendered:
+        """Текст екрана: з кешу, якщо відбиток не змінився, інакше render()"""
+        start = time.perf_counter()
+        if self._texts is not localization.CATALOG:
+            self._entries.clear()
+            self._shown.clear()
+            self._texts = localization.CATALOG
+        key = (character.telegram_id, screen)
+        stamp = (character.version, character.locale, extra)
+        entry = self._entries.get(key)
+        if entry is not None and entry.stamp == stamp:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = "hit"
+        else:
+            entry = Rendered(screen, stamp, await render())
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self.misses += 1
+            result = "miss"
+        RENDER_LOOKUPS.inc(screen, result)
+        RENDER_SECONDS.observe(time.perf_counter() - start, screen, result)
+        return entry
+
+    def shown(self, entry: Rendered, message) -> bool:
+        """True, якщо повідомлення вже показує цей екран (редагування можна пропустити)"""
+        record = self._shown.get((message.chat.id, message.message_id))
+        if record is not None:
+            same = record == (entry.screen, entry.stamp)
+        else:
+            same = message.text == entry.plain
+        if not same:
+            return False
+        self.skipped_edits += 1
+        SKIPPED_EDITS.inc(entry.screen)
+        return True
+
+    def mark_shown(self, entry: Rendered, message) -> None:
+        """Запам'ятовує, що екран записано в повідомлення"""
+        key = (message.chat.id, message.message_id)
+        self._shown[key] = (entry.screen, entry.stamp)
+        self._shown.move_to_end(key)
+        while len(self._shown) > self.max_size:
+            self._shown.popitem(last=False)
+
+    def forget(self, chat_id: int, message_id: int) -> None:
+        """Повідомлення змінено не екраном з кешу"""
+        self._shown.pop((chat_id, message_id), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._shown.clear()
+        self.hits = self.misses = self.skipped_edits = 0
+
+
+RENDERS = RenderCache()
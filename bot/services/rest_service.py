@@ -1,10 +1,62 @@
 from bot.utils.time_parser import parse_duration
+from bot.services import expiry_service, metrics
+from bot.services.game_store import StateStore
+from bot.services.character_service import get_character, save_character, user_locale
+from bot.services.localization import t
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional, Tuple
 
-# Тимчасове сховище для відпочинку (пізніше перенесемо в базу даних)
-RESTING_USERS: Dict[int, datetime] = {}
+# Скільки запис відпочинку живе в Redis після завершення: відновлення HP/MP
+# застосовується і після довгого простою бота (rearm_timers, rest, check_rest_status)
+REST_STORE_GRACE = 7 * 24 * 60 * 60
+
+
+class Rest(NamedTuple):
+    """Відпочинок: коли закінчується і за скільки годин відновити HP/MP"""
+    end_time: datetime
+    hours: float
+
+
+# Тимчасове сховище для відпочинку (з Redis - лише через RESTS)
+RESTING_USERS: Dict[int, Rest] = {}
+RESTS = StateStore(
+    "rest",
+    RESTING_USERS,
+    lambda rest: {"t": repr(rest.end_time.timestamp()), "h": repr(rest.hours)},
+    lambda data: Rest(datetime.fromtimestamp(float(data[b"t"])), float(data.get(b"h", b"1"))),
+)
+metrics.gauge("resting_users", "Resting players held in process memory", lambda: len(RESTING_USERS))
+
+
+async def _on_rest_finished(user_id: int, now: float) -> Optional[str]:
+    """Обробник таймера: завершення відпочинку"""
+    state = await RESTS.get(user_id)
+    if state is None or now < state.end_time.timestamp():
+        return None
+    return await _finish_rest(user_id)
+
+
+async def _finish_rest(user_id: int) -> Optional[str]:
+    """Знімає завершений відпочинок і відновлює HP/MP; None, якщо його вже зняли"""
+    state = await RESTS.pop(user_id)
+    if state is None:
+        return None
+    current_hp, new_hp, current_mp, new_mp = await restore(user_id, state.hours)
+    locale = await user_locale(user_id)
+    return "\n".join((t("rest.finished", locale), t(
+        "rest.restored", locale, hours=state.hours,
+        hp_diff=new_hp - current_hp, old_hp=current_hp, new_hp=new_hp,
+        mp_diff=new_mp - current_mp, old_mp=current_mp, new_mp=new_mp)))
+
+
+expiry_service.register_expiry_handler("rest", _on_rest_finished)
+
+
+async def rearm_timers() -> int:
+    """Таймери збережених відпочинків (після перезапуску бота з Redis)"""
+    return await expiry_service.rearm(
+        "rest", ((user_id, state.end_time.timestamp()) async for user_id, state in RESTS.items()))
 
 def calculate_rest(current_hp: int, max_hp: int, current_mp: int, max_mp: int, hours: float) -> tuple[int,int]:
     """
@@ -14,16 +66,20 @@ def calculate_rest(current_hp: int, max_hp: int, current_mp: int, max_mp: int, h
     rest_mp = min(max_mp, current_mp + int(max_mp * 0.15 * hours))
     return rest_hp, rest_mp
 
+@metrics.timed("rest")
 async def rest(user_id: int, duration: str = "1h") -> str:
     """Обробка відпочинку персонажа"""
+    locale = await user_locale(user_id)
     # Перевірка чи персонаж вже відпочиває
-    if user_id in RESTING_USERS:
-        end_time = RESTING_USERS[user_id]
-        if datetime.now() < end_time:
-            remaining = end_time - datetime.now()
-            return f"⏳ Ви вже відпочиваєте. Залишилось: {remaining.seconds // 60} хвилин"
+    state = await RESTS.get(user_id)
+    if state is not None:
+        if datetime.now() < state.end_time:
+            remaining = state.end_time - datetime.now()
+            return t("rest.in_progress", locale, minutes=remaining.seconds // 60)
         else:
-            del RESTING_USERS[user_id]
+            # Таймер ще не спрацював - відновлення за минулий відпочинок
+            await _finish_rest(user_id)
+            expiry_service.cancel("rest", user_id)
     
     # Парсинг тривалості
     try:
@@ -33,25 +89,22 @@ async def rest(user_id: int, duration: str = "1h") -> str:
     
     # Встановлення таймера
     end_time = datetime.now() + timedelta(hours=hours)
-    RESTING_USERS[user_id] = end_time
+    # HP/MP відновлюються після завершення (_finish_rest)
+    await RESTS.put(user_id, Rest(end_time, hours), end_time.timestamp() + REST_STORE_GRACE)
+    expiry_service.schedule("rest", user_id, end_time.timestamp())
     
-    # TODO: Зберегти стан в базі даних
-    
-    return (
-        f"😴 Ви почали відпочивати на {hours} годин.\n"
-        f"⏰ Час закінчення: {end_time.strftime('%H:%M')}\n\n"
-        "Поверніться після відпочинку, щоб отримати бонуси!"
-    )
+    return t("rest.started", locale, hours=hours, end_time=end_time.strftime('%H:%M'))
 
 async def check_rest_status(user_id: int) -> Optional[Dict]:
     """Перевірка статусу відпочинку"""
-    if user_id not in RESTING_USERS:
+    state = await RESTS.get(user_id)
+    if state is None:
         return None
     
-    end_time = RESTING_USERS[user_id]
-    if datetime.now() >= end_time:
+    if datetime.now() >= state.end_time:
         # Відпочинок завершено
-        del RESTING_USERS[user_id]
+        await _finish_rest(user_id)
+        expiry_service.cancel("rest", user_id)
         return {
             "completed": True,
             "energy_restored": 100,  # TODO: Розрахувати на основі часу
@@ -60,17 +113,22 @@ async def check_rest_status(user_id: int) -> Optional[Dict]:
     
     return {
         "completed": False,
-        "remaining_minutes": (end_time - datetime.now()).seconds // 60
+        "remaining_minutes": (state.end_time - datetime.now()).seconds // 60
     }
 
+async def restore(user_id: int, hours: float) -> Tuple[int, int, int, int]:
+    """Відновлює HP/MP персонажа за hours годин; повертає (старе HP, нове HP, старе MP, нове MP)"""
+    character = await get_character(user_id)
+    stats = character.stats
+    current_hp, current_mp = stats["hp"], stats["mp"]
+    new_hp, new_mp = calculate_rest(current_hp, stats["max_hp"], current_mp, stats["max_mp"], hours)
+    stats["hp"], stats["mp"] = new_hp, new_mp
+    await save_character(character, {"stats"})
+    return current_hp, new_hp, current_mp, new_mp
+
 async def rest_service(user_id: int, args: str) -> str:
     hours = parse_duration(args) or 1.0
-    # TODO: отримати з БД current_hp, max_hp, current_mp, max_mp для user_id
-    # Для демонстрації використовуємо заглушки:
-    current_hp, max_hp = 50, 100
-    current_mp, max_mp = 20, 50
-    new_hp, new_mp = calculate_rest(current_hp, max_hp, current_mp, max_mp, hours)
-    hp_diff = new_hp - current_hp
-    mp_diff = new_mp - current_mp
-    # TODO: оновити БД
-    return f"🛌 Відпочили {hours:.1f}h: HP +{hp_diff} ({current_hp}->{new_hp}), MP +{mp_diff} ({current_mp}->{new_mp})" 
\ No newline at end of file
+    current_hp, new_hp, current_mp, new_mp = await restore(user_id, hours)
+    return t("rest.restored", await user_locale(user_id), hours=hours,
+             hp_diff=new_hp - current_hp, old_hp=current_hp, new_hp=new_hp,
+             mp_diff=new_mp - current_mp, old_mp=current_mp, new_mp=new_mp)
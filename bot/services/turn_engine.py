@@ -0,0 +1,258 @@
+"""
+Покроковий бій для N учасників (рейди, PvP, полювання) за GDD 3.1.
+
+Стан учасників зберігається в компактних масивах (array) за індексом
+учасника: HP/MP, характеристики, кулдауни умінь та бафи/дебафи по
+кожній характеристиці. Раунд розігрується одним викликом resolve_round:
+порядок ходів визначається чергою з пріоритетом за ініціативою
+(SPD + Random(0..5), при рівності - вищий SPD).
+"""
+import heapq
+import random
+import struct
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bot.services.damage import calculate_final_dmg, damage_spread
+
+# Дії
+ACTION_ATTACK = "attack"
+ACTION_DEFEND = "defend"
+ACTION_SKILL = "skill"
+ACTION_FLEE = "flee"
+# Подія тривалого ефекту (отрута, зцілення) в кінці раунду
+EVENT_EFFECT = "effect"
+
+# Характеристики для бафів/дебафів: HP - пласка зміна за хід, решта - у відсотках
+STAT_HP = 0
+STAT_ATK = 1
+STAT_DEF = 2
+STAT_SPD = 3
+STAT_NAMES = {"hp": STAT_HP, "atk": STAT_ATK, "def": STAT_DEF, "spd": STAT_SPD}
+
+INITIATIVE_RANDOM = 5
+
+_ROUND_FORMAT = struct.Struct("<i")
+
+# Подія раунду: (учасник, дія, ціль, значення, крит)
+Event = Tuple[int, str, int, int, bool]
+# Дія учасника: (дія, ціль або -1, індекс уміння або -1)
+Action = Tuple[str, int, int]
+
+
+class Skill:
+    """Активне уміння: урон = (ATK або MAG) * mult, опційний ефект на ціль"""
+    __slots__ = ("name", "mult", "cost", "cooldown", "magic", "effect")
+
+    def __init__(self, name: str, mult: float, cost: int, cooldown: int, magic: bool = False,
+                 effect: Optional[Tuple[str, int, int]] = None):
+        self.name = name
+        self.mult = mult
+        self.cost = cost
+        self.cooldown = cooldown
+        self.magic = magic
+        # (характеристика, модифікатор, тривалість у ходах), наприклад ("hp", -5, 3)
+        self.effect = (STAT_NAMES[effect[0]], effect[1], effect[2]) if effect else None
+
+
+class TurnEngine:
+    """Бій N учасників, поділених на команди"""
+    __slots__ = (
+        "names", "team", "hp", "max_hp", "mp", "attack", "defense", "speed", "magic", "crit",
+        "skills", "cooldowns", "_cd_offset", "buff_mod", "buff_turns", "defending", "fled", "round",
+    )
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.team = array("b")
+        self.hp = array("i")
+        self.max_hp = array("i")
+        self.mp = array("i")
+        self.attack = array("i")
+        self.defense = array("i")
+        self.speed = array("i")
+        self.magic = array("i")
+        self.crit = array("d")
+        self.skills: List[Tuple[Skill, ...]] = []
+        # Кулдауни всіх умінь підряд, _cd_offset[i] - початок умінь учасника i
+        self.cooldowns = array("h")
+        self._cd_offset = array("i")
+        # Бафи: по одному активному ефекту на характеристику
+        self.buff_mod = [array("i") for _ in STAT_NAMES]
+        self.buff_turns = [array("h") for _ in STAT_NAMES]
+        self.defending = array("b")
+        self.fled = array("b")
+        self.round = 0
+
+    def add(self, name: str, team: int, hp: int, attack: int, defense: int, speed: int,
+            magic: int = 0, mp: int = 0, crit: float = 0.0, max_hp: Optional[int] = None,
+            skills: Sequence[Skill] = ()) -> int:
+        """Додає учасника і повертає його індекс"""
+        self.names.append(name)
+        self.team.append(team)
+        self.hp.append(hp)
+        self.max_hp.append(max_hp or hp)
+        self.mp.append(mp)
+        self.attack.append(attack)
+        self.defense.append(defense)
+        self.speed.append(speed)
+        self.magic.append(magic)
+        self.crit.append(crit)
+        self.skills.append(tuple(skills))
+        self._cd_offset.append(len(self.cooldowns))
+        self.cooldowns.extend([0] * len(skills))
+        for mods, turns in zip(self.buff_mod, self.buff_turns):
+            mods.append(0)
+            turns.append(0)
+        self.defending.append(0)
+        self.fled.append(0)
+        return len(self.names) - 1
+
+    def _carried(self) -> List[array]:
+        return [self.mp, self.cooldowns, *self.buff_mod, *self.buff_turns]
+
+    def state(self) -> bytes:
+        """
+        Стан, що переходить між раундами (номер раунду, MP, кулдауни, бафи),
+        для збереження між діями гравця. HP і склад учасників зберігає викликач.
+        """
+        return _ROUND_FORMAT.pack(self.round) + b"".join(part.tobytes() for part in self._carried())
+
+    def load_state(self, data: bytes) -> None:
+        """Відновлює state() для того самого складу учасників і умінь"""
+        (self.round,) = _ROUND_FORMAT.unpack_from(data)
+        offset = _ROUND_FORMAT.size
+        for part in self._carried():
+            size = len(part) * part.itemsize
+            part[:] = array(part.typecode, data[offset:offset + size])
+            offset += size
+
+    def alive(self, i: int) -> bool:
+        return self.hp[i] > 0 and not self.fled[i]
+
+    def team_alive(self, team: int) -> bool:
+        return any(self.team[i] == team and self.alive(i) for i in range(len(self.names)))
+
+    def winner(self) -> Optional[int]:
+        """Команда-переможець або None, якщо бій триває"""
+        teams = {self.team[i] for i in range(len(self.names)) if self.alive(i)}
+        return teams.pop() if len(teams) == 1 else None
+
+    def apply_effect(self, target: int, stat: int, modifier: int, duration: int) -> None:
+        """Накладає баф/дебаф (новий ефект замінює попередній на тій самій характеристиці)"""
+        self.buff_mod[stat][target] = modifier
+        self.buff_turns[stat][target] = duration
+
+    def _stat(self, values: array, stat: int, i: int) -> int:
+        if self.buff_turns[stat][i]:
+            return values[i] * (100 + self.buff_mod[stat][i]) // 100
+        return values[i]
+
+    def effective_speed(self, i: int) -> int:
+        return self._stat(self.speed, STAT_SPD, i)
+
+    def initiative_order(self, rng: random.Random) -> List[int]:
+        """Черга ходів живих учасників на раунд"""
+        queue = []
+        for i in range(len(self.names)):
+            if self.alive(i):
+                spd = self.effective_speed(i)
+                queue.append((-(spd + rng.randint(0, INITIATIVE_RANDOM)), -spd, i))
+        heapq.heapify(queue)
+        return [heapq.heappop(queue)[2] for _ in range(len(queue))]
+
+    def _auto_target(self, i: int) -> int:
+        """Найслабший живий суперник"""
+        target, lowest = -1, None
+        for j in range(len(self.names)):
+            if self.team[j] != self.team[i] and self.alive(j) and (lowest is None or self.hp[j] < lowest):
+                target, lowest = j, self.hp[j]
+        return target
+
+    def _hit(self, i: int, target: int, base: int, mult: float, rng: random.Random) -> Tuple[int, bool]:
+        raw = int(base * mult)
+        defense = self._stat(self.defense, STAT_DEF, target)
+        if self.defending[target]:
+            defense = defense * 3 // 2
+        spread = damage_spread(base)
+        random_factor = rng.randint(-spread, spread)
+        crit = rng.random() < self.crit[i]
+        dmg = calculate_final_dmg(raw, defense, random_factor=random_factor, crit=crit)
+        self.hp[target] = max(self.hp[target] - dmg, 0)
+        return dmg, crit
+
+    def _flee(self, i: int, rng: random.Random) -> bool:
+        """Втеча: SPD * Random(0.8..1.2) має перевищити найшвидшого суперника"""
+        fastest = max(
+            (self.effective_speed(j) for j in range(len(self.names))
+             if self.team[j] != self.team[i] and self.alive(j)),
+            default=0,
+        )
+        return self.effective_speed(i) * rng.uniform(0.8, 1.2) > fastest * rng.uniform(0.8, 1.2)
+
+    def _act(self, i: int, action: Action, rng: random.Random) -> Event:
+        kind, target, skill_index = action
+        if kind == ACTION_DEFEND:
+            self.defending[i] = 1
+            return i, ACTION_DEFEND, i, 0, False
+        if kind == ACTION_FLEE:
+            if self._flee(i, rng):
+                self.fled[i] = 1
+                return i, ACTION_FLEE, i, 1, False
+            return i, ACTION_FLEE, i, 0, False
+
+        if target < 0 or not self.alive(target):
+            target = self._auto_target(i)
+            if target < 0:
+                return i, ACTION_DEFEND, i, 0, False
+
+        if kind == ACTION_SKILL and 0 <= skill_index < len(self.skills[i]):
+            skill = self.skills[i][skill_index]
+            slot = self._cd_offset[i] + skill_index
+            if not self.cooldowns[slot] and self.mp[i] >= skill.cost:
+                self.mp[i] -= skill.cost
+                self.cooldowns[slot] = skill.cooldown + 1  # +1: зменшиться в кінці цього раунду
+                base = self.magic[i] if skill.magic else self._stat(self.attack, STAT_ATK, i)
+                dmg, crit = self._hit(i, target, base, skill.mult, rng)
+                if skill.effect:
+                    self.apply_effect(target, *skill.effect)
+                return i, ACTION_SKILL, target, dmg, crit
+
+        dmg, crit = self._hit(i, target, self._stat(self.attack, STAT_ATK, i), 1.0, rng)
+        return i, ACTION_ATTACK, target, dmg, crit
+
+    def _end_round(self, events: List[Event]) -> None:
+        hp_mod, hp_turns = self.buff_mod[STAT_HP], self.buff_turns[STAT_HP]
+        for i in range(len(self.names)):
+            if hp_turns[i] and self.alive(i):
+                self.hp[i] = min(max(self.hp[i] + hp_mod[i], 0), self.max_hp[i])
+                events.append((i, EVENT_EFFECT, i, hp_mod[i], False))
+            for turns in self.buff_turns:
+                if turns[i]:
+                    turns[i] -= 1
+            self.defending[i] = 0
+        for slot in range(len(self.cooldowns)):
+            if self.cooldowns[slot]:
+                self.cooldowns[slot] -= 1
+
+    def resolve_round(self, actions: Dict[int, Action], rng: random.Random) -> List[Event]:
+        """
+        Розігрує один раунд. actions - дії учасників за індексом; хто не
+        вказаний, атакує найслабшого суперника. Повертає список подій.
+        """
+        self.round += 1
+        events: List[Event] = []
+        # Захист діє весь раунд, незалежно від місця в черзі ходів
+        for i, action in actions.items():
+            if action[0] == ACTION_DEFEND:
+                self.defending[i] = 1
+        for i in self.initiative_order(rng):
+            if not self.alive(i):
+                continue
+            event = self._act(i, actions.get(i, (ACTION_ATTACK, -1, -1)), rng)
+            events.append(event)
+            # Переможця перевіряємо лише коли ціль вибула з бою
+            if not self.alive(event[2]) and self.winner() is not None:
+                break
+        self._end_round(events)
+        return events
@@ -0,0 +1,42 @@
+"""
+Послідовна обробка дій одного гравця.
+
+Для кожного гравця, у якого зараз є хоч одна дія в обробці, існує
+asyncio.Lock; дії різних гравців не чекають одна на одну. Запис
+прибирається, щойно остання дія гравця завершилась, тож кількість
+записів дорівнює кількості гравців, активних саме зараз.
+
+Замки діють лише в межах процесу, тому бот (polling чи вебхук, також
+з Redis) має працювати одним воркером.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+
+class UserLocks:
+    """Замок на гравця з лічильником власників (запис живе, поки лічильник > 0)"""
+
+    def __init__(self):
+        # user_id -> [замок, кількість дій, що тримають або чекають замок]
+        self._locks: Dict[int, List] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, user_id: int) -> AsyncIterator[None]:
+        entry = self._locks.get(user_id)
+        if entry is None:
+            entry = self._locks[user_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[user_id]
+
+
+USER_LOCKS = UserLocks()
@@ -0,0 +1,111 @@
+"""
+Маршрутизація callback-запитів за словником.
+
+Замість ланцюжка фільтрів F.data == ... / F.data.startswith(...), які
+aiogram перевіряє по черзі, callback_data розбирається один раз: точний
+збіг шукається в словнику, інакше з кінця відрізаються сегменти
+("quest:accept:2" -> "quest:accept") до зареєстрованого префікса.
+Аргументи після префікса перетворюються вказаними типами. Розібрана дія
+кешується за рядком даних, тож повторні натискання тієї ж кнопки
+повертають той самий об'єкт.
+"""
+import sys
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from aiogram.types import CallbackQuery
+
+# Скільки різних callback_data тримати розібраними
+MAX_CACHED = 10_000
+
+
+class CallbackAction(NamedTuple):
+    """Розібраний callback: зареєстрований маршрут, аргументи, хендлер"""
+    route: str
+    args: Tuple[Any, ...]
+    handler: Callable
+
+
+class CallbackRouter:
+    """Точні маршрути і префікси в словниках з кешем розбору"""
+
+    def __init__(self, max_cached: int = MAX_CACHED):
+        self.max_cached = max_cached
+        self._exact: Dict[str, Callable] = {}
+        # префікс -> (хендлер, типи аргументів)
+        self._prefixes: Dict[str, Tuple[Callable, Tuple[type, ...]]] = {}
+        self._cache: Dict[str, CallbackAction] = {}
+
+    def exact(self, data: str):
+        """Декоратор: хендлер для callback_data, що дорівнює data"""
+        def decorator(handler):
+            self._add(data, self._exact, handler)
+            return handler
+        return decorator
+
+    def prefix(self, prefix: str, *types: type):
+        """Декоратор: хендлер для "prefix:arg1:arg2"; аргументи перетворюються types (за замовчуванням один str)"""
+        types = types or (str,)
+
+        def decorator(handler):
+            self._add(prefix, self._prefixes, (handler, types))
+            return handler
+        return decorator
+
+    def _add(self, key: str, table: Dict, value) -> None:
+        if key in table:
+            raise ValueError(f"Callback route {key!r} is already registered")
+        table[sys.intern(key)] = value
+        self._cache.clear()
+
+    def resolve(self, data: Optional[str]) -> Optional[CallbackAction]:
+        """Дія для callback_data або None, якщо маршруту немає чи аргументи некоректні"""
+        if data is None:
+            return None
+        action = self._cache.get(data)
+        if action is not None:
+            return action
+        action = self._parse(data)
+        if action is None:
+            return None
+        if len(self._cache) >= self.max_cached:
+            self._cache.clear()
+        self._cache[sys.intern(data)] = action
+        return action
+
+    def _parse(self, data: str) -> Optional[CallbackAction]:
+        handler = self._exact.get(data)
+        if handler is not None:
+            return CallbackAction(sys.intern(data), (), handler)
+        head, tail = data, []
+        while ":" in head:
+            head, part = head.rsplit(":", 1)
+            tail.append(part)
+            entry = self._prefixes.get(head)
+            if entry is None:
+                continue
+            handler, types = entry
+            parts = tail[::-1]
+            if len(parts) != len(types):
+                return None
+            try:
+                args = tuple(kind(part) for kind, part in zip(types, parts))
+            except ValueError:
+                return None
+            return CallbackAction(sys.intern(head), args, handler)
+        return None
+
+    def match(self, callback: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        """Фільтр aiogram: передає розібрану дію хендлеру і middleware як action"""
+        action = self.resolve(callback.data)
+        return {"action": action} if action is not None else False
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._prefixes)
+
+
+def handler_name(data: Dict[str, Any]) -> str:
+    """Ім'я хендлера оновлення (для callback - хендлера маршруту)"""
+    action = data.get("action")
+    if isinstance(action, CallbackAction):
+        return action.handler.__name__
+    return data["handler"].callback.__name__ if "handler" in data else "unknown"
@@ -0,0 +1,91 @@
+"""
+Неблокуючий структурований лог.
+
+Хендлери і сервіси пишуть через звичайний logging, але кореневий логер
+має лише QueueHandler: запис кладеться в чергу без форматування, а
+форматування (getMessage, JSON) і запис у потік виконує окремий потік
+QueueListener. Тому аргументи логування мають бути незмінними значеннями
+(числа, рядки). Поля user_id, handler, latency_ms, payload з extra
+потрапляють у JSON окремими ключами. Часті події (дії в бою) можна
+проріджувати: SAMPLE_RATES задає частку записів, що логуються.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Mapping, Optional
+
+STRUCTURED_FIELDS = ("user_id", "handler", "latency_ms", "payload")
+
+# Подія (ім'я хендлера) -> частка записів, що логуються
+SAMPLE_RATES: Dict[str, float] = {}
+
+
+def sampled(event: str) -> bool:
+    """Чи логувати цей екземпляр події (із урахуванням SAMPLE_RATES)"""
+    rate = SAMPLE_RATES.get(event)
+    return rate is None or random.random() < rate
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """"process_hunt_action=0.1,cmd_start=1" -> {"process_hunt_action": 0.1, "cmd_start": 1.0}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """Один JSON-об'єкт на рядок"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        # Після LazyQueueHandler.prepare траса вже відформатована в exc_text
+        if record.exc_info:
+            entry["exc"] = record.exc_text or self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler без форматування в потоці event loop"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Трасу винятку форматуємо одразу: traceback не переживе потік
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = "INFO", json_format: bool = True,
+                  sample_rates: Optional[Mapping[str, float]] = None,
+                  stream=None) -> QueueListener:
+    """Налаштовує кореневий логер на чергу і запускає потік запису"""
+    SAMPLE_RATES.clear()
+    SAMPLE_RATES.update(sample_rates or {})
+    target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(JsonFormatter() if json_format
+                        else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(records))
+    root.setLevel(level)
+    listener = QueueListener(records, target, respect_handler_level=True)
+    listener.start()
+    return listener
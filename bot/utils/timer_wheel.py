@@ -0,0 +1,99 @@
+"""
+Ієрархічне таймер-колесо (як у ядрі Linux).
+
+Рівень l має SLOTS комірок по SLOTS**l тіків. Таймер кладеться на
+найнижчий рівень, що покриває його дедлайн, і при переповненні нижчих
+рівнів спускається вниз (cascade). Кожен таймер переноситься не більше
+LEVELS разів, тому вставка, скасування та обробка тіку - O(1) амортизовано.
+"""
+import math
+from typing import Any, Dict, Hashable, List, Tuple
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+
+
+class TimerWheel:
+    """Колесо таймерів з ключами (повторне планування ключа замінює таймер)"""
+    __slots__ = ("resolution", "levels", "_tick", "_wheels", "_timers")
+
+    def __init__(self, resolution: float = 1.0, levels: int = 4, now: float = 0.0):
+        self.resolution = resolution
+        self.levels = levels
+        self._tick = int(now // resolution)
+        self._wheels: List[List[Dict[Hashable, int]]] = [[{} for _ in range(SLOTS)] for _ in range(levels)]
+        # key -> (tick дедлайну, payload, рівень, комірка)
+        self._timers: Dict[Hashable, Tuple[int, Any, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, deadline: float, payload: Any = None) -> None:
+        """Планує таймер на момент deadline (у тих самих одиницях, що й now)"""
+        self.cancel(key)
+        due = max(math.ceil(deadline / self.resolution), self._tick + 1)
+        self._insert(key, due, payload)
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        _, _, level, slot = timer
+        del self._wheels[level][slot][key]
+        return True
+
+    def _insert(self, key: Hashable, due: int, payload: Any) -> None:
+        current = self._tick
+        for level in range(self.levels):
+            shift = SLOT_BITS * level
+            if (due >> shift) - (current >> shift) < SLOTS:
+                slot = (due >> shift) & SLOT_MASK
+                break
+        else:
+            # Дедлайн за межами колеса - паркуємо на останній комірці верхнього
+            # рівня, при каскаді таймер буде розміщено заново
+            level = self.levels - 1
+            shift = SLOT_BITS * level
+            slot = ((current >> shift) + SLOT_MASK) & SLOT_MASK
+        self._wheels[level][slot][key] = due
+        self._timers[key] = (due, payload, level, slot)
+
+    def _cascade(self, level: int) -> List[Tuple[Hashable, Any]]:
+        """Переносить комірку рівня level на нижчі рівні, повертає прострочені"""
+        slot = (self._tick >> (SLOT_BITS * level)) & SLOT_MASK
+        bucket = self._wheels[level][slot]
+        self._wheels[level][slot] = {}
+        expired = []
+        for key, due in bucket.items():
+            payload = self._timers[key][1]
+            if due <= self._tick:
+                del self._timers[key]
+                expired.append((key, payload))
+            else:
+                self._insert(key, due, payload)
+        return expired
+
+    def advance(self, now: float) -> List[Tuple[Hashable, Any]]:
+        """Просуває колесо до now і повертає (key, payload) прострочених таймерів"""
+        target = int(now // self.resolution)
+        expired: List[Tuple[Hashable, Any]] = []
+        while self._tick < target:
+            if not self._timers:
+                self._tick = target
+                break
+            self._tick += 1
+            tick = self._tick
+            # Каскад з верхніх рівнів, коли нижчий рівень зробив повне коло
+            for level in range(self.levels - 1, 0, -1):
+                if tick & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                    expired.extend(self._cascade(level))
+            bucket = self._wheels[0][tick & SLOT_MASK]
+            if bucket:
+                self._wheels[0][tick & SLOT_MASK] = {}
+                for key in bucket:
+                    expired.append((key, self._timers.pop(key)[1]))
+        return expired
@@ -0,0 +1,23 @@
+from typing import Iterator
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    """Дописує невід'ємне ціле у форматі LEB128 (7 біт на байт)"""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def iter_varints(data: bytes) -> Iterator[int]:
+    """Послідовно декодує всі varint з data"""
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+    if shift:
+        raise ValueError("Truncated varint")
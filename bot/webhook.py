@@ -0,0 +1,124 @@
+"""
+Режим вебхука: aiohttp-сервер приймає оновлення від Telegram.
+
+Оновлення підтверджується одразу (200), а обробляється у фоновій задачі.
+Кількість оновлень в обробці обмежена семафором: коли всі слоти зайняті,
+запит чекає на вільний слот і не відповідає Telegram, тож той сам
+притримує нові оновлення. При зупинці сервер перестає приймати запити
+(503), дочікується оброблюваних оновлень і лише потім закривається.
+Вебхук обслуговує один процес: послідовність дій гравця (USER_LOCKS),
+таймери і кеш персонажів не спільні між процесами, тож кілька реплік
+за балансувальником знову дозволили б гонки в бою.
+"""
+import asyncio
+import logging
+import signal
+from typing import Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """Обробник вебхука з обмеженням одночасних оновлень"""
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, secret: Optional[str] = None,
+                 max_in_flight: int = 100, **kwargs):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.secret = secret
+        self.max_in_flight = max_in_flight
+        self.kwargs = kwargs
+        self.draining = False
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tasks: Set[asyncio.Task] = set()
+        self.received = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.secret is not None and request.headers.get(SECRET_HEADER) != self.secret:
+            return web.Response(status=401)
+        if self.draining:
+            return web.Response(status=503)
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except ValueError:
+            return web.Response(status=400)
+        await self._slots.acquire()
+        # Поки запит чекав на слот, почалася зупинка: drain() цієї задачі вже не дочекається
+        if self.draining:
+            self._slots.release()
+            return web.Response(status=503)
+        self.received += 1
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return web.Response()
+
+    async def _process(self, update: Update) -> None:
+        try:
+            await self.dispatcher.feed_update(self.bot, update, **self.kwargs)
+        except Exception:
+            logger.exception("Failed to process update %s", update.update_id)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._slots.release()
+
+    async def drain(self, timeout: float = 30.0) -> int:
+        """Перестає приймати оновлення і чекає на оброблювані; повертає кількість незавершених"""
+        self.draining = True
+        if not self._tasks:
+            return 0
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning("Cancelled %d updates after drain timeout", len(pending))
+        return len(pending)
+
+    def app(self, path: str) -> web.Application:
+        app = web.Application()
+        app.router.add_post(path, self.handle)
+        return app
+
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot, base_url: str, path: str, host: str, port: int,
+                      secret: Optional[str] = None, max_in_flight: int = 100, drain_timeout: float = 30.0) -> None:
+    """Запускає сервер вебхука до SIGINT/SIGTERM, потім коректно зупиняється"""
+    server = WebhookServer(dispatcher, bot, secret, max_in_flight)
+    runner = web.AppRunner(server.app(path))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await dispatcher.emit_startup(bot=bot)
+    try:
+        await site.start()
+        await bot.set_webhook(
+            base_url.rstrip("/") + path,
+            secret_token=secret,
+            max_connections=min(max_in_flight, 100),
+            allowed_updates=dispatcher.resolve_used_update_types(),
+        )
+        logger.info("Webhook server listening on %s:%d%s", host, port, path)
+        await stop.wait()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        # Вебхук не видаляємо: Telegram притримає оновлення до перезапуску
+        await server.drain(drain_timeout)
+        await runner.cleanup()
+        await dispatcher.emit_shutdown(bot=bot)
@@ -0,0 +1,67 @@
+"""
+Оточення Alembic: схема - models.base, URL - DATABASE_URL бота.
+
+Міграції виконуються синхронним драйвером (psycopg2 для PostgreSQL), тому
+асинхронні URL з DATABASE_URL перетворюються назад. Зміни таблиць
+генеруються в batch-режимі, щоб ті самі міграції працювали і на SQLite.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from bot.config import DATABASE_URL
+from models.base import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# Асинхронні драйвери бота -> синхронні для Alembic
+_SYNC_DRIVERS = {
+    "postgresql+asyncpg://": "postgresql+psycopg2://",
+    "sqlite+aiosqlite://": "sqlite://",
+}
+
+
+def sync_url(url: str) -> str:
+    for prefix, replacement in _SYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return replacement + url[len(prefix):]
+    return url
+
+
+url = config.get_main_option("sqlalchemy.url") or DATABASE_URL
+if not url:
+    raise RuntimeError("DATABASE_URL is not set")
+config.set_main_option("sqlalchemy.url", sync_url(url))
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=Base.metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=Base.metadata, render_as_batch=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
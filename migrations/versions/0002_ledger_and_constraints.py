@@ -0,0 +1,77 @@
+"""Знімки балансів, унікальні стеки і квести, індекси транзакцій, мітка локалізації
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('balance_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_type', sa.String(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('currency', sa.String(), nullable=False),
+    sa.Column('balance', sa.Integer(), nullable=False),
+    sa.Column('last_transaction_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('owner_type', 'owner_id', 'currency', name='uq_balance_snapshot_owner')
+    )
+
+    # Старий код додавав рядок на кожну знахідку: зливаємо стеки перед обмеженням
+    op.execute(
+        "UPDATE inventory SET quantity = ("
+        " SELECT SUM(COALESCE(i.quantity, 1)) FROM inventory i"
+        " WHERE i.character_id = inventory.character_id AND i.item_id = inventory.item_id)"
+        " WHERE id IN (SELECT MIN(id) FROM inventory GROUP BY character_id, item_id HAVING COUNT(*) > 1)"
+    )
+    op.execute("DELETE FROM inventory WHERE id NOT IN (SELECT MIN(id) FROM inventory GROUP BY character_id, item_id)")
+    with op.batch_alter_table('inventory') as batch_op:
+        batch_op.create_unique_constraint('uq_inventory_character_item', ['character_id', 'item_id'])
+
+    # Дублікати квесту персонажа: лишається перший прийнятий
+    op.execute(
+        "DELETE FROM quest_progress WHERE id NOT IN"
+        " (SELECT MIN(id) FROM quest_progress GROUP BY character_id, quest_id)"
+    )
+    with op.batch_alter_table('quest_progress') as batch_op:
+        batch_op.create_unique_constraint('uq_quest_progress_character_quest', ['character_id', 'quest_id'])
+
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.add_column(sa.Column('guild_id', sa.Integer(), nullable=True))
+        batch_op.alter_column('character_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.create_foreign_key('fk_transactions_guild_id', 'guilds', ['guild_id'], ['id'])
+        batch_op.create_index('ix_transactions_character_currency_id', ['character_id', 'currency', 'id'])
+        batch_op.create_index('ix_transactions_guild_currency_id', ['guild_id', 'currency', 'id'])
+
+    with op.batch_alter_table('localization') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('localization') as batch_op:
+        batch_op.drop_column('updated_at')
+
+    # Транзакції гільдій не мають персонажа - без них character_id знову обов'язковий
+    op.execute("DELETE FROM transactions WHERE character_id IS NULL")
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_index('ix_transactions_guild_currency_id')
+        batch_op.drop_index('ix_transactions_character_currency_id')
+        batch_op.drop_constraint('fk_transactions_guild_id', type_='foreignkey')
+        batch_op.alter_column('character_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('guild_id')
+
+    with op.batch_alter_table('quest_progress') as batch_op:
+        batch_op.drop_constraint('uq_quest_progress_character_quest', type_='unique')
+    with op.batch_alter_table('inventory') as batch_op:
+        batch_op.drop_constraint('uq_inventory_character_item', type_='unique')
+    op.drop_table('balance_snapshots')
@@ -0,0 +1,56 @@
+"""Мітку localization.updated_at ставить тригер БД
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+TRIGGERS = {
+    "postgresql": (
+        "CREATE OR REPLACE FUNCTION localization_touch() RETURNS trigger AS $$ "
+        "BEGIN NEW.updated_at := clock_timestamp(); RETURN NEW; END $$ LANGUAGE plpgsql",
+        "CREATE TRIGGER localization_touch BEFORE INSERT OR UPDATE ON localization "
+        "FOR EACH ROW EXECUTE FUNCTION localization_touch()",
+    ),
+    "sqlite": tuple(
+        f"CREATE TRIGGER localization_touch_{name} AFTER {change} ON localization BEGIN "
+        "UPDATE localization SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') "
+        "WHERE key = NEW.key AND locale = NEW.locale; END"
+        for name, change in (("insert", "INSERT"), ("update", "UPDATE OF key, locale, text"))
+    ),
+}
+
+DROP_TRIGGERS = {
+    "postgresql": (
+        "DROP TRIGGER localization_touch ON localization",
+        "DROP FUNCTION localization_touch()",
+    ),
+    "sqlite": (
+        "DROP TRIGGER localization_touch_insert",
+        "DROP TRIGGER localization_touch_update",
+    ),
+}
+
+
+def upgrade() -> None:
+    # Спершу колонка: batch-режим SQLite перестворює таблицю разом з тригерами
+    with op.batch_alter_table('localization') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), server_default=sa.func.now())
+    op.execute("UPDATE localization SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+    for statement in TRIGGERS.get(op.get_context().dialect.name, ()):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in DROP_TRIGGERS.get(op.get_context().dialect.name, ()):
+        op.execute(statement)
+    with op.batch_alter_table('localization') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), server_default=None)
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime, func
+from sqlalchemy import (
+    DDL, Column, Integer, String, JSON, ForeignKey, DateTime, FetchedValue, Index, UniqueConstraint, event, func,
+)
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -30,11 +32,14 @@ class Character(Base):
 
 class Inventory(Base):
     __tablename__ = 'inventory'
+    # Один рядок-стек на предмет персонажа (ціль ON CONFLICT при видачі луту)
+    __table_args__ = (UniqueConstraint('character_id', 'item_id', name='uq_inventory_character_item'),)
     id = Column(Integer, primary_key=True)
     character_id = Column(Integer, ForeignKey('characters.id'), nullable=False, index=True)
     item_id = Column(Integer, ForeignKey('items.id'), nullable=False)
     quantity = Column(Integer, default=1)
-    metadata = Column(JSON)
+    # "metadata" зарезервовано в declarative API, тому атрибут має іншу назву
+    meta = Column("metadata", JSON)
 
     character = relationship("Character", back_populates="inventory_items")
     item = relationship("Item", back_populates="inventory_entries")
@@ -71,6 +76,8 @@ class Quest(Base):
 
 class QuestProgress(Base):
     __tablename__ = 'quest_progress'
+    # Один рядок на квест персонажа (ціль ON CONFLICT при прийнятті квесту)
+    __table_args__ = (UniqueConstraint('character_id', 'quest_id', name='uq_quest_progress_character_quest'),)
     id = Column(Integer, primary_key=True)
     character_id = Column(Integer, ForeignKey('characters.id'), nullable=False, index=True)
     quest_id = Column(Integer, ForeignKey('quests.id'), nullable=False)
@@ -117,8 +124,16 @@ class BattleSession(Base):
 
 class Transaction(Base):
     __tablename__ = 'transactions'
+    # Дельта балансу після знімка: WHERE власник, валюта AND id > last_transaction_id
+    __table_args__ = (
+        Index('ix_transactions_character_currency_id', 'character_id', 'currency', 'id'),
+        Index('ix_transactions_guild_currency_id', 'guild_id', 'currency', 'id'),
+    )
     id = Column(Integer, primary_key=True)
-    character_id = Column(Integer, ForeignKey('characters.id'), nullable=False)
+    # Для руху коштів гільдії - хто його ініціював (може бути порожнім)
+    character_id = Column(Integer, ForeignKey('characters.id'))
+    # Заповнено - транзакція скарбниці гільдії
+    guild_id = Column(Integer, ForeignKey('guilds.id'))
     type = Column(String, nullable=False)
     amount = Column(Integer, nullable=False)
     currency = Column(String, nullable=False)
@@ -126,8 +141,45 @@ class Transaction(Base):
 
     character = relationship("Character", back_populates="transactions")
 
+class BalanceSnapshot(Base):
+    __tablename__ = 'balance_snapshots'
+    __table_args__ = (UniqueConstraint('owner_type', 'owner_id', 'currency', name='uq_balance_snapshot_owner'),)
+    id = Column(Integer, primary_key=True)
+    owner_type = Column(String, nullable=False)  # character / guild
+    owner_id = Column(Integer, nullable=False)
+    currency = Column(String, nullable=False)
+    balance = Column(Integer, nullable=False, default=0)
+    # Остання транзакція, врахована в balance
+    last_transaction_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
 class Localization(Base):
     __tablename__ = 'localization'
     key = Column(String, primary_key=True)
     locale = Column(String, primary_key=True)
-    text = Column(String, nullable=False) 
\ No newline at end of file
+    text = Column(String, nullable=False)
+    # Мітка змін для каталогу текстів (разом з кількістю рядків). Ставить її
+    # тригер БД, тож її оновлюють і сирі UPDATE поза ботом; з долями секунди,
+    # щоб кілька змін за секунду не злились в одну
+    updated_at = Column(DateTime, server_default=func.now(), server_onupdate=FetchedValue())
+
+# Тригери мітки localization.updated_at (ті самі створює міграція 0003)
+LOCALIZATION_TRIGGERS = {
+    "postgresql": (
+        "CREATE OR REPLACE FUNCTION localization_touch() RETURNS trigger AS $$ "
+        "BEGIN NEW.updated_at := clock_timestamp(); RETURN NEW; END $$ LANGUAGE plpgsql",
+        "CREATE TRIGGER localization_touch BEFORE INSERT OR UPDATE ON localization "
+        "FOR EACH ROW EXECUTE FUNCTION localization_touch()",
+    ),
+    "sqlite": tuple(
+        f"CREATE TRIGGER localization_touch_{name} AFTER {change} ON localization BEGIN "
+        "UPDATE localization SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') "
+        "WHERE key = NEW.key AND locale = NEW.locale; END"
+        for name, change in (("insert", "INSERT"), ("update", "UPDATE OF key, locale, text"))
+    ),
+}
+
+for _dialect, _statements in LOCALIZATION_TRIGGERS.items():
+    for _statement in _statements:
+        event.listen(Localization.__table__, "after_create",
+                     DDL(_statement.replace("%", "%%")).execute_if(dialect=_dialect))
@@ -5,12 +5,19 @@ setup(
     version="0.1",
     packages=find_packages(),
     install_requires=[
-        "aiogram>=3.0.0",
-        "SQLAlchemy>=1.4",
+        "aiogram>=3.20,<4",
+        "SQLAlchemy[asyncio]>=2.0",
         "alembic>=1.9",
         "psycopg2-binary",
+        "asyncpg",
+        "aiosqlite",
         "redis",
         "celery",
         "python-dotenv",
+        "numpy",
+        "sortedcontainers",
     ],
+    extras_require={
+        "test": ["pytest", "fakeredis"],
+    },
 ) 
\ No newline at end of file
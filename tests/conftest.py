@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import event
+
+from bot import database
+from bot.services import character_service, expiry_service, leaderboard, ledger_service, quest_service
+from bot.services.battle_service import ACTIVE_BATTLES, FINISHED_BATTLES
+from bot.services.rest_service import RESTING_USERS
+from bot.utils.timer_wheel import TimerWheel
+
+
+@pytest.fixture(autouse=True)
+def game_state():
+    """Стан процесу (бої, відпочинок, таймери, рейтинги, буфер леджера) не переходить між тестами"""
+    yield
+    for user_id in list(ACTIVE_BATTLES):
+        expiry_service.cancel("battle", user_id)
+    for user_id in list(RESTING_USERS):
+        expiry_service.cancel("rest", user_id)
+    ACTIVE_BATTLES.clear()
+    FINISHED_BATTLES.clear()
+    RESTING_USERS.clear()
+    expiry_service.WHEEL = TimerWheel(resolution=expiry_service.TICK_SECONDS, now=time.time())
+    for metric in leaderboard.LEADERBOARDS:
+        leaderboard.LEADERBOARDS[metric] = leaderboard.Leaderboard()
+    ledger_service._pending.clear()
+    ledger_service._pending_delta.clear()
+
+
+@pytest.fixture
+def db(tmp_path):
+    """
+    Запускає сценарій на тимчасовій SQLite-базі: db(scenario), де
+    scenario(statements) - корутина, statements - виконані SQL-запити.
+    """
+    def run(scenario):
+        async def wrapper():
+            engine = database.init_db(f"sqlite:///{tmp_path / 'eldoria.db'}", pool_size=2, max_overflow=0)
+            await database.create_tables()
+            statements = []
+            event.listen(engine.sync_engine, "before_cursor_execute",
+                         lambda conn, cursor, statement, *args: statements.append(statement))
+            character_service.CACHE.clear()
+            ledger_service.clear()
+            quest_service.TRACKER.clear()
+            try:
+                await scenario(statements)
+                await quest_service.TRACKER.flush()
+                await character_service.CACHE.flush()
+            finally:
+                character_service.CACHE.clear()
+                ledger_service.clear()
+                quest_service.TRACKER.clear()
+                await database.close_db()
+        asyncio.run(wrapper())
+    return run
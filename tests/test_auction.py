@@ -0,0 +1,113 @@
+import asyncio
+import random
+import time
+from datetime import timezone
+
+import pytest
+
+from sqlalchemy import delete, func, select
+
+from bot import database
+from bot.services import auction_service, character_service, inventory_service
+from bot.services.auction_service import HOUSE, AuctionHouse, Listing
+from bot.services.inventory_service import grant_loot
+from models.base import Auction, Inventory
+
+
+def test_order_book_matches_brute_force():
+    house = AuctionHouse()
+    rng = random.Random(3)
+    for listing_id in range(1, 3_001):
+        house.add(Listing(listing_id, None, listing_id, rng.randrange(5), "gold", rng.randint(1, 500),
+                          float(rng.randint(0, 1_000))))
+    for listing_id in rng.sample(range(1, 3_001), 1_000):
+        house.remove(listing_id)
+
+    for item_id in range(5):
+        remaining = sorted((l.price, l.id) for l in house.listings.values() if l.item_id == item_id)
+        assert (house.best(item_id).price, house.best(item_id).id) == remaining[0]
+        assert [l.id for l in house.page(item_id, limit=5, offset=3)] == [i for _, i in remaining[3:8]]
+
+    due = {l.id for l in house.listings.values() if l.expires_at <= 400}
+    assert {l.id for l in house.pop_expired(400)} == due
+    assert all(l.expires_at > 400 for l in house.listings.values())
+    assert len(house) == 2_000 - len(due)
+
+
+def test_concurrent_buyers_get_listing_once(db):
+    async def scenario(statements):
+        inventory_service.ITEM_IDS.clear()
+        HOUSE.clear()
+        seller = await character_service.get_character(71)
+        await grant_loot(seller, [("гриби", 2)])
+        item_id = inventory_service.ITEM_IDS["гриби"]
+        await auction_service.create_listing(71, item_id, 40)
+        buyers = [await character_service.get_character(telegram_id) for telegram_id in (72, 73)]
+        for buyer in buyers:
+            character_service.award(buyer, gold=100)
+        listing_id = auction_service.cheapest(item_id).id
+
+        results = await asyncio.gather(*(auction_service.buy_listing(b.telegram_id, listing_id) for b in buyers))
+        assert sum(result.startswith("✅") for result in results) == 1
+        assert sorted(b.stats["gold"] for b in buyers) == [60, 100]
+        assert seller.stats["gold"] == 40 and seller.inventory[item_id] == 1
+        async with database.session() as session:
+            assert await session.scalar(select(func.count()).select_from(Auction)) == 0
+            quantities = dict((await session.execute(
+                select(Inventory.character_id, Inventory.quantity))).all())
+        winner = next(b for b in buyers if b.stats["gold"] == 60)
+        assert quantities == {seller.id: 1, winner.id: 1}
+
+        # Лот з минулим строком повертається продавцю, також після перезавантаження
+        await auction_service.create_listing(71, item_id, 10, duration=-1)
+        assert seller.inventory[item_id] == 0
+        async with database.session() as session:
+            stored = await session.scalar(select(Auction.expires_at))
+        assert abs(stored.replace(tzinfo=timezone.utc).timestamp() - time.time()) < 5
+        assert await auction_service.load_listings() == 1
+        assert await auction_service.expire_listings() == 1
+        assert seller.inventory[item_id] == 1 and auction_service.cheapest(item_id) is None
+        async with database.session() as session:
+            assert await session.scalar(select(Inventory.quantity).where(Inventory.character_id == seller.id)) == 1
+
+        # Лот без строку (старий рядок) завантажується і не закінчується
+        async with database.session() as session:
+            async with session.begin():
+                session.add(Auction(seller_id=seller.id, item_id=item_id, price_gold=5, expires_at=None))
+        assert await auction_service.load_listings() == 1
+        assert await auction_service.expire_listings() == 0
+        assert auction_service.cheapest(item_id).expires_at == float("inf")
+        async with database.session() as session:
+            async with session.begin():
+                await session.execute(delete(Auction))
+        HOUSE.clear()
+
+        # Лот, який інший воркер уже продав, не повертається продавцю
+        await auction_service.create_listing(71, item_id, 10, duration=-1)
+        async with database.session() as session:
+            async with session.begin():
+                await session.execute(delete(Auction))
+        assert await auction_service.expire_listings() == 0
+        assert seller.inventory[item_id] == 0
+
+    db(scenario)
+
+
+def test_failed_expiry_keeps_listings(tmp_path):
+    async def scenario():
+        HOUSE.clear()
+        HOUSE.add(Listing(1, 5, 81, 3, "gold", 10, 100.0))
+        # Без таблиць DELETE падає, як при недоступній БД
+        database.init_db(f"sqlite:///{tmp_path / 'broken.db'}")
+        try:
+            with pytest.raises(Exception):
+                await auction_service.expire_listings(200.0)
+        finally:
+            await database.close_db()
+        assert auction_service.cheapest(3).id == 1
+        assert [listing.id for listing in HOUSE.pop_expired(200.0)] == [1]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        HOUSE.clear()
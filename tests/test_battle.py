@@ -1,5 +1,12 @@
-import pytest
-from bot.services.battle_service import calculate_effective_dmg, calculate_final_dmg, simulate_fight
+import asyncio
+import time
+from bot.keyboards.battle_keyboard import BATTLE_KEYBOARD
+from bot.services import battle_service
+from bot.services.battle_service import (
+    ACTIVE_BATTLES, BattleState, calculate_effective_dmg, calculate_final_dmg, process_battle_action,
+    quick_hunt, simulate_fight,
+)
+from bot.services.character_service import get_character
 
 
 def test_calculate_effective_dmg():
@@ -16,4 +23,35 @@ def test_simulate_fight_player_wins():
     logs, result = simulate_fight(player, monster, random_factor=0)
     assert result is True
     # Перевіримо, що принаймні один хід був записаний
-    assert len(logs) >= 1 
\ No newline at end of file
+    assert len(logs) >= 1
+
+
+def test_battle_state_attack_victory():
+    ACTIVE_BATTLES[1] = BattleState("вовк", 100, 1, time.time() + 60)
+    text = asyncio.run(process_battle_action(1, "attack"))
+    assert "Вовк" in text
+    assert 1 not in ACTIVE_BATTLES
+
+
+def test_victory_after_battle_ended_elsewhere_gives_no_reward(monkeypatch):
+    end_battle = battle_service._end_battle
+
+    async def ended_by_timeout(user_id, outcome):
+        # Таймаут на іншому воркері встиг зняти бій
+        await end_battle(user_id)
+        return await end_battle(user_id, outcome)
+
+    monkeypatch.setattr(battle_service, "_end_battle", ended_by_timeout)
+    ACTIVE_BATTLES[3] = BattleState("вовк", 100, 1, time.time() + 60)
+    character = asyncio.run(get_character(3))
+    gold, xp = character.stats["gold"], character.xp
+    text = asyncio.run(process_battle_action(3, "attack"))
+    assert "Вовк" not in text
+    assert (character.stats["gold"], character.xp) == (gold, xp)
+
+
+def test_quick_hunt_shares_keyboard():
+    ACTIVE_BATTLES[2] = BattleState("ведмідь", 80, 90, time.time() + 60)
+    text, kb = asyncio.run(quick_hunt(2))
+    assert kb is BATTLE_KEYBOARD.get()
+    assert "90" in text
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import time
+from bot.services import expiry_service
+from bot.services.battle_service import (
+    ACTIVE_BATTLES, ENEMIES, FINISHED_BATTLES, OUTCOME_WON, BattleState, battle_engine, decode_battle,
+    encode_battle, play_round, process_battle_action,
+)
+from bot.services.battle_recorder import build_session, replay
+from bot.services.turn_engine import STAT_HP
+from bot.utils.varint import encode_varint, iter_varints
+
+
+def test_varint_roundtrip():
+    values = [0, 1, 127, 128, 300, 2 ** 31, 2 ** 63 - 1]
+    data = bytearray()
+    for value in values:
+        encode_varint(value, data)
+    assert list(iter_varints(bytes(data))) == values
+
+
+def test_replay_reproduces_every_round():
+    user_id = 500
+    battle = BattleState("ведмідь", 100, 100, time.time() + 60, seed=12345)
+    ACTIVE_BATTLES[user_id] = battle
+    FINISHED_BATTLES.clear()
+    history = []
+    for action in ["defend", "attack", "attack", "flee", "attack"] * 10:
+        if user_id not in ACTIVE_BATTLES:
+            break
+        asyncio.run(process_battle_action(user_id, action))
+        history.append((battle.player_hp, battle.enemy_hp))
+
+    finished_user, finished, outcome = FINISHED_BATTLES.pop()
+    assert finished_user == user_id and finished is battle
+    session = build_session(user_id, battle, outcome)
+    # Стан має переживати JSON-колонку
+    state = json.loads(json.dumps(session.state))
+    rounds = replay(state)
+    assert [(r["player_hp"], r["enemy_hp"]) for r in rounds] == history
+
+
+def test_replay_state_is_compact():
+    battle = BattleState("вовк", 100, 50, time.time() + 60, seed=1)
+    session = build_session(1, battle, OUTCOME_WON)
+    assert replay(session.state) == []
+    assert session.participants == [{"user_id": 1}, {"enemy_id": "вовк"}]
+
+
+
+def test_replay_matches_live_battle_with_non_template_enemy_hp():
+    user_id = 501
+    # Поранений ворог (HP нижче шаблону) і посилений (вище шаблону)
+    for enemy_hp in (ENEMIES["ведмідь"]["hp"] // 3, ENEMIES["ведмідь"]["hp"] * 5):
+        battle = BattleState("ведмідь", 100, enemy_hp, time.time() + 60, seed=777)
+        ACTIVE_BATTLES[user_id] = battle
+        history = []
+        try:
+            while user_id in ACTIVE_BATTLES:
+                asyncio.run(process_battle_action(user_id, "attack"))
+                history.append((battle.player_hp, battle.enemy_hp))
+        finally:
+            ACTIVE_BATTLES.pop(user_id, None)
+            expiry_service.cancel("battle", user_id)
+
+        state = json.loads(json.dumps(build_session(user_id, battle, OUTCOME_WON).state))
+        assert [(r["player_hp"], r["enemy_hp"]) for r in replay(state)] == history
+
+
+def test_enemy_heals_up_to_battle_max_hp():
+    battle = BattleState("ведмідь", 100, 20, time.time() + 60, seed=3)
+    assert battle.enemy_max_hp == ENEMIES["ведмідь"]["hp"]
+    engine = battle_engine(battle.combat, battle.player_hp, battle.enemy, battle.enemy_hp, battle.enemy_max_hp)
+    engine.apply_effect(1, STAT_HP, 5, 3)
+    battle.engine_state = engine.state()
+    play_round(battle, "defend")
+    play_round(battle, "defend")
+    # Рушій перебудовується щораунду, але максимум HP ворога - з бою, а не поточне HP
+    assert battle.enemy_hp == 30
+
+
+def test_stored_battle_without_enemy_max_hp_gets_template_start():
+    battle = BattleState("вовк", 100, 30, time.time() + 60, seed=5)
+    fields = {key.encode(): value if isinstance(value, bytes) else str(value).encode()
+              for key, value in encode_battle(battle).items() if key != "m"}
+    fields[b"l"] = bytes([100, 0, 1])
+    restored = decode_battle(fields)
+    assert restored.enemy_max_hp == ENEMIES["вовк"]["hp"]
+    assert list(iter_varints(bytes(restored.log))) == [100, ENEMIES["вовк"]["hp"], 0, 1]
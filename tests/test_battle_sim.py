@@ -0,0 +1,66 @@
+import numpy as np
+from bot.services.battle_service import CLASSES, ENEMIES, calculate_final_dmg, damage_spread
+from bot.services.battle_sim import simulate_batch, balance_sweep
+
+
+def _scalar_reference(player, monster, n, seed, max_rounds=500):
+    # Той самий порядок випадкових значень, що і в simulate_batch, але покроково
+    rng = np.random.default_rng(seed)
+    p_hp = [player["hp"]] * n
+    m_hp = [monster["hp"]] * n
+    active = [True] * n
+    turns = [0] * n
+    p_r, m_r = damage_spread(player["attack"]), damage_spread(monster["attack"])
+    for _ in range(max_rounds):
+        rf, crit = rng.integers(-p_r, p_r + 1, size=n), rng.random(n) < player.get("crit", 0.0)
+        for i in range(n):
+            if active[i]:
+                m_hp[i] -= calculate_final_dmg(player["attack"], monster["defense"],
+                                               random_factor=int(rf[i]), crit=bool(crit[i]))
+                turns[i] += 1
+                active[i] = m_hp[i] > 0
+        rf, crit = rng.integers(-m_r, m_r + 1, size=n), rng.random(n) < monster.get("crit", 0.0)
+        for i in range(n):
+            if active[i]:
+                p_hp[i] -= calculate_final_dmg(monster["attack"], player["defense"],
+                                               random_factor=int(rf[i]), crit=bool(crit[i]))
+                active[i] = p_hp[i] > 0
+        if not any(active):
+            break
+    return [h <= 0 for h in m_hp], turns, [max(h, 0) for h in p_hp]
+
+
+def test_calculate_final_dmg_crit_and_block():
+    assert calculate_final_dmg(120, 30, random_factor=6, crit=True) == 147  # floor(98 * 1.5)
+    assert calculate_final_dmg(10, 0, random_factor=-20) == 0
+
+
+def test_simulate_batch_matches_scalar():
+    player = {"hp": 60, "attack": 40, "defense": 5, "crit": 0.3}
+    monster = dict(ENEMIES["бандит"], crit=0.1)
+    result = simulate_batch(player, monster, 200, seed=7)
+    won, turns, hp_left = _scalar_reference(player, monster, 200, seed=7)
+    assert result["won"].tolist() == won
+    assert result["turns"].tolist() == turns
+    assert result["hp_left"].tolist() == hp_left
+
+
+def test_simulate_batch_is_reproducible_and_chunk_size_keeps_statistics():
+    a = simulate_batch(CLASSES["маг"], ENEMIES["ведмідь"], 1000, seed=3, chunk_size=128)
+    b = simulate_batch(CLASSES["маг"], ENEMIES["ведмідь"], 1000, seed=3, chunk_size=128)
+    assert np.array_equal(a["hp_left"], b["hp_left"])
+    # Інший розмір шматка - інший потік rng, але той самий розподіл результатів
+    # (посилений ведмідь - приблизно рівний бій, щоб частка перемог була інформативною)
+    bear = dict(ENEMIES["ведмідь"], hp=300, attack=60)
+    small = simulate_batch(CLASSES["маг"], bear, 20_000, seed=3, chunk_size=64)
+    large = simulate_batch(CLASSES["маг"], bear, 20_000, seed=3, chunk_size=4096)
+    assert not np.array_equal(small["hp_left"], large["hp_left"])
+    assert 0.3 < small["won"].mean() < 0.9
+    assert abs(small["won"].mean() - large["won"].mean()) < 0.03
+    assert abs(small["turns"].mean() - large["turns"].mean()) < 0.1 * large["turns"].mean()
+
+
+def test_balance_sweep_shapes():
+    sweep = balance_sweep(500, seed=1)
+    assert sweep["win_rate"].shape == (len(CLASSES), len(ENEMIES))
+    assert ((sweep["win_rate"] >= 0) & (sweep["win_rate"] <= 1)).all()
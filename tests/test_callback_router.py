@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import CallbackQuery, Update
+from pydantic import ValidationError
+
+from bot.keyboards.main_keyboard import MAIN_MENU
+from bot.middlewares.metrics import HANDLER_SECONDS, setup_metrics
+from bot.utils.callback_router import CallbackAction, CallbackRouter
+
+
+async def show_menu(callback):
+    return "menu"
+
+
+async def accept(callback, quest_id):
+    return quest_id
+
+
+async def act(callback, action):
+    return action
+
+
+def make_router() -> CallbackRouter:
+    callbacks = CallbackRouter()
+    callbacks.exact("menu:main")(show_menu)
+    callbacks.prefix("quest", int)(accept)
+    callbacks.prefix("hunt")(act)
+    return callbacks
+
+
+def test_resolves_exact_and_prefixed_actions():
+    callbacks = make_router()
+    assert callbacks.resolve("menu:main") == CallbackAction("menu:main", (), show_menu)
+    assert callbacks.resolve("quest:7") == CallbackAction("quest", (7,), accept)
+    assert callbacks.resolve("hunt:attack") == CallbackAction("hunt", ("attack",), act)
+    # Повторне натискання - той самий об'єкт
+    assert callbacks.resolve("quest:7") is callbacks.resolve("quest:7")
+    for data in ("quest:abc", "quest:1:2", "hunt", "unknown", "unknown:1", None):
+        assert callbacks.resolve(data) is None
+    with pytest.raises(ValueError):
+        callbacks.exact("menu:main")(show_menu)
+
+
+def test_dispatcher_routes_callbacks_and_names_handlers():
+    async def scenario():
+        callbacks = make_router()
+        seen = []
+
+        @callbacks.prefix("quest:accept", int)
+        async def accept_from_board(callback: CallbackQuery, quest_id: int):
+            seen.append(quest_id)
+
+        router = Router()
+
+        @router.callback_query(callbacks.match)
+        async def dispatch_callback(callback: CallbackQuery, action: CallbackAction):
+            await action.handler(callback, *action.args)
+
+        dp = Dispatcher()
+        setup_metrics(dp)
+        dp.include_router(router)
+        bot = Bot("42:TEST")
+        update = Update.model_validate({"update_id": 1, "callback_query": {
+            "id": "1", "chat_instance": "1", "data": "quest:accept:12",
+            "from": {"id": 1, "is_bot": False, "first_name": "Герой"},
+        }}, context={"bot": bot})
+        before = HANDLER_SECONDS.count("accept_from_board")
+        await dp.feed_update(bot, update)
+        assert seen == [12]
+        # Метрики - за ім'ям хендлера маршруту, а не спільного dispatch_callback
+        assert HANDLER_SECONDS.count("accept_from_board") == before + 1
+        await bot.session.close()
+
+    asyncio.run(scenario())
+
+
+def test_static_keyboards_are_frozen():
+    with pytest.raises(ValidationError):
+        MAIN_MENU.get().inline_keyboard = []
+    with pytest.raises(ValidationError):
+        MAIN_MENU.get().inline_keyboard[0][0].text = "змінено"
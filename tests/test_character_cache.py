@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from sqlalchemy import event, select
+from bot import database
+from bot.services.character_cache import CharacterCache
+from bot.services.character_service import award, create_character, default_character
+from models.base import Character
+
+
+def test_lru_eviction_and_single_load():
+    loads = []
+
+    async def loader(telegram_id):
+        loads.append(telegram_id)
+        await asyncio.sleep(0)
+        return default_character(telegram_id)
+
+    async def scenario():
+        cache = CharacterCache(loader, max_size=3)
+        first, second = await asyncio.gather(cache.get(1), cache.get(1))
+        assert first is second and loads == [1]
+        for telegram_id in range(2, 6):
+            await cache.get(telegram_id)
+        assert len(cache) == 3
+        await cache.get(1)
+        assert loads == [1, 2, 3, 4, 5, 1]
+
+    asyncio.run(scenario())
+
+
+def test_dirty_updates_are_coalesced_into_one_batch(tmp_path):
+    async def scenario():
+        engine = database.init_db(f"sqlite:///{tmp_path / 'cache.db'}")
+        await database.create_tables()
+        created = [await create_character(telegram_id) for telegram_id in range(20)]
+        by_id = {character.telegram_id: character for character in created}
+
+        async def loader(telegram_id):
+            return by_id[telegram_id]
+
+        cache = CharacterCache(loader, max_size=5, flush_threshold=1000)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, params, context, executemany: statements.append(executemany))
+        for _ in range(3):
+            for telegram_id in range(20):
+                character = await cache.get(telegram_id)
+                award(character, gold=1, xp=10)
+                cache.mark_dirty(character)
+        # Витіснені з LRU брудні персонажі все одно записуються
+        assert len(cache) == 5 and cache.dirty_count == 20
+        assert await cache.flush() == 20
+        assert statements == [True]
+
+        async with database.session() as session:
+            rows = (await session.execute(select(Character.xp, Character.stats))).all()
+        assert all(xp == 30 and stats["gold"] == 3 for xp, stats in rows)
+        await database.close_db()
+
+    asyncio.run(scenario())
+
+
+def test_evicted_dirty_character_is_not_reloaded_stale():
+    loads = []
+
+    async def loader(telegram_id):
+        loads.append(telegram_id)
+        character = default_character(telegram_id)
+        character.id = telegram_id
+        return character
+
+    async def scenario():
+        cache = CharacterCache(loader, max_size=1, flush_threshold=1000)
+        character = await cache.get(1)
+        award(character, gold=5)
+        cache.mark_dirty(character)
+        await cache.get(2)
+        assert cache.peek(1) is None
+        assert await cache.get(1) is character and loads == [1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_failed_flush_keeps_capped_backlog(tmp_path):
+    async def loader(telegram_id):
+        character = default_character(telegram_id)
+        character.id = telegram_id
+        return character
+
+    async def scenario():
+        # Без таблиць UPDATE падає, як при недоступній БД
+        database.init_db(f"sqlite:///{tmp_path / 'broken.db'}")
+        cache = CharacterCache(loader, max_size=2, flush_threshold=1000, max_dirty=3)
+        characters = [await cache.get(telegram_id) for telegram_id in range(5)]
+        for character in characters:
+            cache.mark_dirty(character)
+        try:
+            with pytest.raises(Exception):
+                await cache.flush()
+        finally:
+            await database.close_db()
+        assert cache.dirty_count == 3 and cache.dropped_rows == 2
+        assert await cache.get(2) is characters[2]
+
+    asyncio.run(scenario())
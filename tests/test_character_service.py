@@ -0,0 +1,62 @@
+import asyncio
+import time
+from sqlalchemy import func, select
+from bot import database
+from bot.services import character_service
+from bot.services.battle_service import ACTIVE_BATTLES, ENEMIES, BattleState, process_battle_action
+from models.base import Character, Inventory, Item, User
+
+
+def test_character_loaded_with_inventory_in_one_query(db):
+    async def scenario(statements):
+        created = await character_service.get_character(42)
+        async with database.session() as session:
+            async with session.begin():
+                item = Item(name="гриби", type="material", rarity="common")
+                session.add(item)
+                await session.flush()
+                session.add(Inventory(character_id=created.id, item_id=item.id, quantity=3))
+
+        character_service.CACHE.clear()
+        statements.clear()
+        loaded = await character_service.get_character(42)
+        assert len(statements) == 1
+        assert loaded.id == created.id
+        assert loaded.inventory == {item.id: 3}
+        assert loaded.stats["hp"] == character_service.DEFAULT_STATS["hp"]
+
+    db(scenario)
+
+
+def test_concurrent_first_login_creates_one_character(db):
+    async def scenario(statements):
+        created = await asyncio.gather(*(character_service.create_character(43) for _ in range(2)))
+        again = await character_service.create_character(43)
+        assert created[0].id == created[1].id == again.id
+        async with database.session() as session:
+            assert await session.scalar(select(func.count()).select_from(User)) == 1
+            assert await session.scalar(select(func.count()).select_from(Character)) == 1
+
+    db(scenario)
+
+
+def test_battle_victory_is_saved(db):
+    async def scenario(statements):
+        character = await character_service.get_character(7)
+        ACTIVE_BATTLES[7] = BattleState("вовк", 80, 1, time.time() + 60, seed=1)
+        await process_battle_action(7, "attack")
+        assert await character_service.CACHE.flush() == 1
+        character_service.CACHE.clear()
+        saved = await character_service.get_character(7)
+        assert saved.id == character.id
+        assert saved.stats["gold"] == ENEMIES["вовк"]["gold"]
+        assert saved.xp == ENEMIES["вовк"]["exp"]
+        assert 0 < saved.stats["hp"] <= 80
+
+    db(scenario)
+
+
+def test_award_levels_up():
+    character = character_service.default_character(1)
+    assert character_service.award(character, gold=10, xp=character_service.xp_required(1))
+    assert character.level == 2 and character.stats["gold"] == 10
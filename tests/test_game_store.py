@@ -0,0 +1,108 @@
+import asyncio
+import time
+from datetime import datetime
+
+import fakeredis
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+
+from bot.services import battle_service, expiry_service, rest_service
+from bot.services.battle_service import (
+    ACTIVE_BATTLES, BATTLES, FINISHED_BATTLES, BattleState, process_battle_action,
+)
+from bot.services.character_service import get_character
+from bot.services.game_store import use_redis
+from bot.utils.timer_wheel import TimerWheel
+
+
+def run_with_workers(coro_factory):
+    """Два «воркери» з окремими клієнтами до одного Redis"""
+    server = fakeredis.FakeServer()
+
+    async def runner():
+        first = fakeredis.aioredis.FakeRedis(server=server)
+        second = fakeredis.aioredis.FakeRedis(server=server)
+        try:
+            return await coro_factory(first, second)
+        finally:
+            use_redis(None)
+            await first.aclose()
+            await second.aclose()
+
+    return asyncio.run(runner())
+
+
+def test_battle_continues_on_another_worker():
+    async def scenario(first, second):
+        use_redis(first)
+        battle = BattleState("ведмідь", 100, 100, time.time() + 60, seed=7, combat=(120, 20, 6, 30, 0.1))
+        await BATTLES.put(31, battle, battle.deadline)
+        assert 31 not in ACTIVE_BATTLES
+        assert 0 < await first.ttl(BATTLES.key(31)) <= 61
+
+        use_redis(second)
+        await process_battle_action(31, "attack")
+        stored = await BATTLES.get(31)
+        assert stored.round == 1 and stored.combat == (120, 20, 6, 30, 0.1)
+        assert stored.log == bytes([100, 100, 0]) and stored.seed == 7
+
+        # Той самий раунд локально дає ті самі HP
+        battle_service.play_round(battle, "attack")
+        assert (stored.player_hp, stored.enemy_hp) == (battle.player_hp, battle.enemy_hp)
+
+    run_with_workers(scenario)
+
+
+def test_timeout_is_handled_by_one_worker():
+    async def scenario(first, second):
+        FINISHED_BATTLES.clear()
+        use_redis(first)
+        await BATTLES.put(32, BattleState("вовк", 100, 50, time.time() - 1), time.time() + 60)
+        texts = [await battle_service._on_battle_timeout(32, time.time())]
+        use_redis(second)
+        texts.append(await battle_service._on_battle_timeout(32, time.time()))
+        assert texts == ["⏰ Час бою вийшов!", None]
+        assert len(FINISHED_BATTLES) == 1 and await BATTLES.count() == 0
+
+    run_with_workers(scenario)
+
+
+def test_rest_state_and_fsm_in_redis():
+    async def scenario(first, second):
+        use_redis(first)
+        await rest_service.rest(33, "2h")
+        assert 33 not in rest_service.RESTING_USERS
+        use_redis(second)
+        assert (await rest_service.rest(33, "1h")).startswith("⏳ Ви вже відпочиваєте")
+        assert (await rest_service.check_rest_status(33))["completed"] is False
+
+        storage = RedisStorage(first)
+        key = StorageKey(bot_id=1, chat_id=33, user_id=33)
+        await storage.set_state(key, "Hunt:choosing")
+        assert await RedisStorage(second).get_state(key) == "Hunt:choosing"
+
+    run_with_workers(scenario)
+
+
+def test_timers_are_rearmed_from_redis_after_restart(monkeypatch):
+    async def scenario(first, second):
+        FINISHED_BATTLES.clear()
+        use_redis(first)
+        now = time.time()
+        await BATTLES.put(34, BattleState("вовк", 100, 50, now - 5), now + 60)
+        character = await get_character(35)
+        character.stats["hp"] = 10
+        await rest_service.RESTS.put(35, rest_service.Rest(datetime.fromtimestamp(now - 5), 2), now + 60)
+
+        # Перезапуск: порожнє колесо таймерів, новий клієнт Redis
+        monkeypatch.setattr(expiry_service, "WHEEL", TimerWheel(now=now))
+        use_redis(second)
+        assert await battle_service.rearm_timers() == 1
+        assert await rest_service.rearm_timers() == 1
+        messages = dict(await expiry_service.collect_expired(now + 2))
+        assert messages[34] == "⏰ Час бою вийшов!"
+        assert messages[35].startswith("✅ Відпочинок завершено")
+        assert character.stats["hp"] == 30
+        assert await BATTLES.count() == 0 and await rest_service.RESTS.count() == 0
+
+    run_with_workers(scenario)
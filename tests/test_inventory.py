@@ -0,0 +1,48 @@
+from sqlalchemy import func, select
+
+from bot import database
+from bot.services import character_service, inventory_service
+from bot.services.inventory_service import grant_loot, grant_loot_many, stack_drops
+from models.base import Inventory
+
+
+def test_stack_drops_merges_by_name():
+    assert stack_drops([("гриби", 2), ("трава", 1), ("гриби", 3), ("гілки", 0)]) == {"гриби": 5, "трава": 1}
+
+
+def test_hunt_loot_is_upserted_in_one_statement(db):
+    async def scenario(statements):
+        inventory_service.ITEM_IDS.clear()
+        character = await character_service.get_character(61)
+        await grant_loot(character, [("гриби", 2), ("трава", 1)])
+
+        statements.clear()
+        await grant_loot(character, [("гриби", 3), ("трава", 4), ("гриби", 1)])
+        inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT INTO INVENTORY")]
+        assert len(statements) == 1 and len(inserts) == 1
+
+        ids = inventory_service.ITEM_IDS
+        assert character.inventory == {ids["гриби"]: 6, ids["трава"]: 5}
+        character_service.CACHE.clear()
+        loaded = await character_service.get_character(61)
+        assert loaded.inventory == character.inventory
+
+    db(scenario)
+
+
+def test_raid_loot_for_several_characters(db):
+    async def scenario(statements):
+        inventory_service.ITEM_IDS.clear()
+        first = await character_service.get_character(62)
+        second = await character_service.get_character(63)
+        stacks = await grant_loot_many([
+            (first, stack_drops([("каміння", 2), ("гілки", 1)])),
+            (second, stack_drops([("каміння", 5)])),
+        ])
+        assert stacks == 3
+        async with database.session() as session:
+            total = await session.scalar(select(func.sum(Inventory.quantity)))
+            rows = await session.scalar(select(func.count()).select_from(Inventory))
+        assert (total, rows) == (8, 3)
+
+    db(scenario)
@@ -0,0 +1,68 @@
+import asyncio
+import random
+
+from bot import database
+from bot.services import character_service, leaderboard
+from bot.services.leaderboard import METRIC_GOLD, METRIC_LEVEL, METRIC_XP, Leaderboard
+from models.base import Character, User
+
+
+def test_rank_and_top_match_sorting():
+    board = Leaderboard()
+    rng = random.Random(5)
+    scores = {}
+    for _ in range(5_000):
+        telegram_id = rng.randrange(1_000)
+        scores[telegram_id] = rng.randrange(100)
+        board.update(telegram_id, scores[telegram_id])
+
+    expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    assert board.top(20, offset=10) == expected[10:30]
+    for position, (telegram_id, _) in enumerate(expected, 1):
+        assert board.rank(telegram_id) == position
+    assert board.rank(10_000) is None and len(board) == len(scores)
+
+
+def test_full_width_telegram_ids_keep_order():
+    board = Leaderboard()
+    big = (1 << 52) - 1
+    board.update(big, 5)
+    board.update(big - 1, 5)
+    board.update(1, 4)
+    assert board.top(3) == [(big - 1, 5), (big, 5), (1, 4)]
+    assert board.rank(1) == 3
+
+
+def test_award_updates_rankings():
+    first = character_service.default_character(901)
+    second = character_service.default_character(902)
+    character_service.award(first, gold=10, xp=50)
+    character_service.award(second, gold=5, xp=500)
+    assert leaderboard.get_rank(METRIC_GOLD, 901) < leaderboard.get_rank(METRIC_GOLD, 902)
+    assert leaderboard.get_rank(METRIC_LEVEL, 902) < leaderboard.get_rank(METRIC_LEVEL, 901)
+    assert leaderboard.LEADERBOARDS[METRIC_XP].score(902) == 500
+
+
+def test_rebuild_streams_characters_from_db(tmp_path):
+    async def scenario():
+        database.init_db(f"sqlite:///{tmp_path / 'eldoria.db'}", pool_size=2, max_overflow=0)
+        await database.create_tables()
+        try:
+            async with database.session() as session:
+                async with session.begin():
+                    for telegram_id in range(1, 101):
+                        user = User(telegram_id=telegram_id)
+                        session.add(user)
+                        await session.flush()
+                        session.add(Character(user_id=user.id, class_name="маг", level=telegram_id % 7 + 1,
+                                              xp=telegram_id * 3, stats={"gold": 1000 - telegram_id}))
+            leaderboard.REBUILD_BATCH = 16
+            assert await leaderboard.rebuild() == 100
+        finally:
+            leaderboard.REBUILD_BATCH = 10_000
+            await database.close_db()
+
+    asyncio.run(scenario())
+    assert leaderboard.get_top(METRIC_GOLD, 3) == [(1, 999), (2, 998), (3, 997)]
+    assert leaderboard.get_top(METRIC_XP, 1) == [(100, 300)]
+    assert leaderboard.get_rank(METRIC_LEVEL, 6) == 1
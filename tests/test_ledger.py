@@ -0,0 +1,123 @@
+from sqlalchemy import func, insert, select, update
+
+from bot import database
+from bot.services import character_service, ledger_service
+from bot.services.ledger_service import CURRENCY_GEMS, CURRENCY_GOLD, OWNER_CHARACTER, OWNER_GUILD
+from models.base import BalanceSnapshot, Guild, Transaction
+
+
+def test_balances_from_snapshot_delta_and_buffer(db):
+    async def scenario(statements):
+        character = await character_service.get_character(81)
+        async with database.session() as session:
+            async with session.begin():
+                guild = Guild(name="Лицарі")
+                session.add(guild)
+                await session.flush()
+                guild_id = guild.id
+
+        character_service.award(character, gold=30, reason="battle")
+        character_service.award(character, gold=-10, reason="auction_buy")
+        ledger_service.record(character.id, -5, CURRENCY_GOLD, "guild_deposit")
+        ledger_service.record(character.id, 5, CURRENCY_GOLD, "guild_deposit", guild_id=guild_id)
+        ledger_service.record(None, 7, CURRENCY_GEMS, "quest", guild_id=guild_id)
+        # Ще не записано в БД - баланс з буфера
+        assert await ledger_service.get_balance(OWNER_CHARACTER, character.id) == 15
+
+        assert await ledger_service.roll_snapshots() == 3
+        character_service.award(character, gold=100)
+        await ledger_service.flush()
+        character_service.award(character, gold=1)
+
+        statements.clear()
+        assert await ledger_service.get_balance(OWNER_CHARACTER, character.id) == 116
+        assert len(statements) == 2
+        assert await ledger_service.get_balance(OWNER_GUILD, guild_id) == 5
+        assert await ledger_service.get_balance(OWNER_GUILD, guild_id, CURRENCY_GEMS) == 7
+
+        await ledger_service.roll_snapshots()
+        async with database.session() as session:
+            assert await session.scalar(select(func.count()).select_from(Transaction)) == 7
+            assert await session.scalar(select(func.count()).select_from(BalanceSnapshot)) == 3
+        assert await ledger_service.reconcile() == []
+
+        # Пошкоджений знімок виявляється звіркою
+        async with database.session() as session:
+            async with session.begin():
+                await session.execute(update(BalanceSnapshot)
+                                      .where(BalanceSnapshot.owner_type == OWNER_GUILD,
+                                             BalanceSnapshot.currency == CURRENCY_GEMS)
+                                      .values(balance=8))
+        assert await ledger_service.reconcile() == [((OWNER_GUILD, guild_id, CURRENCY_GEMS), 7, 8)]
+
+    db(scenario)
+
+
+def test_late_committed_transaction_reaches_its_snapshot(db):
+    async def scenario(statements):
+        first = await character_service.get_character(82)
+        second = await character_service.get_character(83)
+        async with database.session() as session:
+            async with session.begin():
+                await session.execute(insert(Transaction), [
+                    {"id": 1, "character_id": first.id, "type": "battle", "amount": 10, "currency": CURRENCY_GOLD},
+                    {"id": 10, "character_id": second.id, "type": "battle", "amount": 20, "currency": CURRENCY_GOLD},
+                ])
+        assert await ledger_service.roll_snapshots() == 2
+        # Транзакція іншого воркера з меншим id закомітилась після прокручування
+        async with database.session() as session:
+            async with session.begin():
+                await session.execute(insert(Transaction), [
+                    {"id": 5, "character_id": first.id, "type": "battle", "amount": 3, "currency": CURRENCY_GOLD},
+                ])
+        assert await ledger_service.roll_snapshots() == 1
+        async with database.session() as session:
+            balances = dict((await session.execute(
+                select(BalanceSnapshot.owner_id, BalanceSnapshot.balance))).all())
+        assert balances == {first.id: 13, second.id: 20}
+        assert await ledger_service.reconcile() == []
+
+    db(scenario)
+
+
+def test_balance_read_racing_a_flush_counts_once(db, monkeypatch):
+    async def scenario(statements):
+        character = await character_service.get_character(84)
+        ledger_service.record(character.id, 5, CURRENCY_GOLD, "battle")
+        stored_balance = ledger_service._stored_balance
+        flushed = []
+
+        async def flushed_meanwhile(*args):
+            # Пакет буфера записується, поки баланс читається з БД
+            if not flushed:
+                flushed.append(await ledger_service.flush())
+            return await stored_balance(*args)
+
+        monkeypatch.setattr(ledger_service, "_stored_balance", flushed_meanwhile)
+        assert await ledger_service.get_balance(OWNER_CHARACTER, character.id) == 5
+        assert flushed == [1] and not ledger_service._pending_delta
+
+    db(scenario)
+
+
+
+def test_reconcile_skips_owners_without_snapshot(db):
+    async def scenario(statements):
+        rolled = await character_service.get_character(85)
+        fresh = await character_service.get_character(86)
+        async with database.session() as session:
+            async with session.begin():
+                await session.execute(insert(Transaction), [
+                    {"id": 10, "character_id": rolled.id, "type": "battle", "amount": 40, "currency": CURRENCY_GOLD},
+                ])
+        assert await ledger_service.roll_snapshots() == 1
+        # Транзакція іншого власника з меншим id, ще не прокручена у знімок
+        async with database.session() as session:
+            async with session.begin():
+                await session.execute(insert(Transaction), [
+                    {"id": 5, "character_id": fresh.id, "type": "battle", "amount": 15, "currency": CURRENCY_GOLD},
+                ])
+        assert await ledger_service.reconcile() == []
+        assert await ledger_service.get_balance(OWNER_CHARACTER, fresh.id) == 15
+
+    db(scenario)
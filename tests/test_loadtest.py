@@ -0,0 +1,17 @@
+import asyncio
+
+from benchmarks.loadtest import run
+from bot.services import character_service
+
+
+def test_load_harness_drives_real_dispatcher():
+    try:
+        report = asyncio.run(run(users=20, attacks=3, concurrency=5))
+    finally:
+        character_service.CACHE.clear()
+    assert report["errors"] == 0
+    assert report["updates"] == 20 * 6
+    assert report["routes"]["hunt:attack"][2] == 60
+    # /start відповідає новим повідомленням, callback-и - редагуванням або answer
+    assert report["calls"]["SendMessage"] == 20
+    assert report["calls"].get("EditMessageText", 0) + report["calls"].get("AnswerCallbackQuery", 0) >= 100
@@ -0,0 +1,68 @@
+import asyncio
+
+from sqlalchemy import text
+
+from bot import database
+from bot.services import character_service, localization
+from bot.services.battle_service import process_battle_action
+from bot.keyboards.main_keyboard import MAIN_MENU
+from bot.services.localization import t
+from models.base import Localization
+
+
+def test_builtin_texts_render_with_values():
+    assert t("battle.won", enemy="Вовк", gold=15, exp=20) == "✅ Ви перемогли Вовк!\n💰 Отримано: 15 золота\n✨ Досвід: 20"
+    assert t("rest.restored", "xx", hours=1.5, hp_diff=1, old_hp=1, new_hp=2, mp_diff=0, old_mp=3, new_mp=3).startswith(
+        "🛌 Відпочили 1.5h")
+    assert t("no.such.key") == "no.such.key"
+
+
+def test_catalog_loads_reloads_and_renders_user_locale(db):
+    async def scenario(statements):
+        async with database.session() as session:
+            async with session.begin():
+                session.add_all([
+                    Localization(key="battle.not_in_battle", locale="en", text="❌ You are not in a battle!"),
+                    Localization(key="battle.won", locale="en", text="Won against {enemy}, +{gold} gold"),
+                    # Невідома підстановка - переклад відкидається
+                    Localization(key="battle.lost", locale="en", text="Lost to {enemy}"),
+                ])
+        catalog = await localization.load_catalog()
+        assert t("battle.won", "en", enemy="Wolf", gold=15, exp=20) == "Won against Wolf, +15 gold"
+        assert t("battle.lost", "en") == "❌ Ви програли бій!"
+        assert t("battle.timeout", "en") == "⏰ Час бою вийшов!"
+
+        character = await character_service.get_character(91)
+        character.locale = "en"
+        assert await process_battle_action(91, "attack") == "❌ You are not in a battle!"
+
+        assert await localization.reload_if_changed() is False
+        # Сирий SQL поза ORM (адмінка, консоль): мітку ставить тригер БД
+        async with database.session() as session:
+            async with session.begin():
+                await session.execute(text("UPDATE localization SET text = 'Not fighting'"
+                                           " WHERE key = 'battle.not_in_battle'"))
+        assert await localization.reload_if_changed() is True
+        assert localization.CATALOG is not catalog
+        assert await process_battle_action(91, "attack") == "Not fighting"
+
+    try:
+        db(scenario)
+    finally:
+        localization.CATALOG = localization.Catalog(())
+
+
+def test_keyboards_are_rendered_and_cached_per_locale():
+    try:
+        localization.CATALOG = localization.Catalog([("button.profile", "en", "👤 Profile")])
+        english = MAIN_MENU.get("en")
+        assert english.inline_keyboard[0][0].text == "👤 Profile"
+        # Без перекладу - вбудований підпис
+        assert english.inline_keyboard[0][1].text == "🏕 Відпочинок"
+        assert MAIN_MENU.get().inline_keyboard[0][0].text == "👤 Профіль"
+        assert MAIN_MENU.get("en") is english
+
+        localization.CATALOG = localization.Catalog([("button.profile", "en", "👤 Hero")])
+        assert MAIN_MENU.get("en").inline_keyboard[0][0].text == "👤 Hero"
+    finally:
+        localization.CATALOG = localization.Catalog(())
@@ -0,0 +1,122 @@
+import asyncio
+import random
+import numpy as np
+from bot.services import expiry_service
+from bot.services.battle_service import ENEMIES, HUNT_TABLE, RESOURCES, ACTIVE_BATTLES, quick_hunt
+from bot.services.loot_service import (
+    AliasTable, ENCOUNTER_ENEMY, ENCOUNTER_NONE, ENCOUNTER_TRACKS, TIERS,
+    compile_drops, roll_drop, roll_drops, roll_hunt, roll_hunts,
+)
+
+
+def expected_encounters():
+    # Ті самі шанси, що і в послідовному переборі ENEMIES
+    expected = {}
+    remaining = 1.0
+    for enemy_id, enemy in ENEMIES.items():
+        expected[(ENCOUNTER_ENEMY, enemy_id)] = remaining * enemy["chance"]
+        remaining *= 1 - enemy["chance"]
+    for enemy_id in ENEMIES:
+        expected[(ENCOUNTER_TRACKS, enemy_id)] = remaining * 0.4 / len(ENEMIES)
+    expected[(ENCOUNTER_NONE, None)] = remaining * 0.6
+    return expected
+
+
+def assert_close(observed, expected, n):
+    # 5 стандартних відхилень біноміального розподілу
+    sigma = (expected * (1 - expected) / n) ** 0.5
+    assert abs(observed - expected) <= 5 * sigma + 1e-9
+
+
+def test_alias_table_matches_weights():
+    table = AliasTable([("common", 60), ("rare", 30), ("epic", 8), ("legendary", 2)])
+    n = 200_000
+    counts = np.bincount(table.sample_indices(np.random.default_rng(1), n), minlength=4)
+    for outcome, weight, count in zip(table.outcomes, (0.6, 0.3, 0.08, 0.02), counts):
+        assert_close(count / n, weight, n)
+
+
+def test_roll_hunt_distribution():
+    rng = random.Random(5)
+    n = 100_000
+    encounters = {}
+    found = {name: 0 for name in RESOURCES}
+    for _ in range(n):
+        resources, kind, enemy_id = roll_hunt(HUNT_TABLE, rng)
+        encounters[(kind, enemy_id)] = encounters.get((kind, enemy_id), 0) + 1
+        for name, amount in resources:
+            assert RESOURCES[name]["min"] <= amount <= RESOURCES[name]["max"]
+            found[name] += 1
+    for outcome, p in expected_encounters().items():
+        assert_close(encounters.get(outcome, 0) / n, p, n)
+    for name, data in RESOURCES.items():
+        assert_close(found[name] / n, data["chance"], n)
+
+
+def test_roll_hunts_batch_distribution():
+    n = 500_000
+    batch = roll_hunts(HUNT_TABLE, n, seed=3)
+    counts = np.bincount(batch["encounters"], minlength=len(HUNT_TABLE.encounters.outcomes))
+    expected = expected_encounters()
+    for outcome, count in zip(HUNT_TABLE.encounters.outcomes, counts):
+        assert_close(count / n, expected[outcome], n)
+    for column, data in enumerate(RESOURCES.values()):
+        amounts = batch["resources"][:, column]
+        assert_close((amounts > 0).mean(), data["chance"], n)
+        assert amounts.max() == data["max"]
+
+
+def end_hunt(user_id: int) -> None:
+    """Прибирає бій, створений полюванням, разом з його таймером"""
+    ACTIVE_BATTLES.pop(user_id, None)
+    expiry_service.cancel("battle", user_id)
+
+
+def test_quick_hunt_is_reproducible_with_seed():
+    try:
+        first, _ = asyncio.run(quick_hunt(100, rng=random.Random(42)))
+        end_hunt(100)
+        second, _ = asyncio.run(quick_hunt(100, rng=random.Random(42)))
+    finally:
+        end_hunt(100)
+    assert first == second
+
+
+DROPS = {
+    "common": {"палиця": 3, "камінь": 1},
+    "rare": {"кристал": 1},
+    "epic": {"уламок": 1},
+    "legendary": {"перо фенікса": 1},
+}
+
+
+def test_roll_drop_matches_tier_and_item_weights():
+    table = compile_drops(DROPS, nothing=100)
+    rng = random.Random(9)
+    n = 200_000
+    counts = {}
+    for _ in range(n):
+        drop = roll_drop(table, rng)
+        counts[drop] = counts.get(drop, 0) + 1
+    assert_close(counts.get(None, 0) / n, 0.5, n)
+    assert_close(counts.get(("common", "палиця"), 0) / n, 0.5 * 0.6 * 0.75, n)
+    assert_close(counts.get(("common", "камінь"), 0) / n, 0.5 * 0.6 * 0.25, n)
+    assert_close(counts.get(("legendary", "перо фенікса"), 0) / n, 0.5 * 0.02, n)
+
+
+def test_roll_drops_batch_distribution():
+    table = compile_drops(DROPS)
+    n = 500_000
+    batch = roll_drops(table, n, seed=4)
+    counts = np.bincount(batch["tiers"], minlength=len(table.tiers.outcomes))
+    for tier, weight in TIERS:
+        assert_close(counts[table.tiers.outcomes.index(tier)] / n, weight / 100, n)
+    common = batch["items"][batch["tiers"] == table.tiers.outcomes.index("common")]
+    assert_close((common == table.items["common"].outcomes.index("палиця")).mean(), 0.75, len(common))
+    assert (batch["items"] >= 0).all()
+
+
+def test_tiers_without_items_do_not_drop():
+    table = compile_drops({"common": {"палиця": 1}, "rare": {}})
+    assert table.tiers.outcomes == ("common",)
+    assert roll_drop(table, random.Random(1)) == ("common", "палиця")
@@ -0,0 +1,70 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot import database
+from bot.middlewares.metrics import HANDLER_ERRORS, HANDLER_SECONDS, MetricsMiddleware
+from bot.services import battle_service, character_service, metrics
+from bot.services.battle_service import quick_hunt
+from bot.services.metrics import SERVICE_SECONDS, Histogram
+from bot.services.rest_service import RESTING_USERS
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "hunt")
+    assert histogram.render().splitlines() == [
+        "# HELP eldoria_test_seconds Test",
+        "# TYPE eldoria_test_seconds histogram",
+        'eldoria_test_seconds_bucket{route="hunt",le="0.1"} 2',
+        'eldoria_test_seconds_bucket{route="hunt",le="1.0"} 3',
+        'eldoria_test_seconds_bucket{route="hunt",le="+Inf"} 4',
+        'eldoria_test_seconds_sum{route="hunt"} 3.65',
+        'eldoria_test_seconds_count{route="hunt"} 4',
+    ]
+
+
+def test_handlers_services_and_gauges_are_exported():
+    async def scenario():
+        async def process_hunt_action(event, data):
+            raise ValueError("boom")
+
+        before = HANDLER_ERRORS.values.get(("process_hunt_action",), 0)
+        with pytest.raises(ValueError):
+            await MetricsMiddleware()(process_hunt_action, None,
+                                      {"handler": SimpleNamespace(callback=process_hunt_action)})
+        assert HANDLER_ERRORS.values[("process_hunt_action",)] == before + 1
+        assert HANDLER_SECONDS.count("process_hunt_action") >= 1
+
+        hunts = SERVICE_SECONDS.count("quick_hunt")
+        await quick_hunt(301, random.Random(5))
+        assert SERVICE_SECONDS.count("quick_hunt") == hunts + 1
+        await battle_service._end_battle(301)
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics.handle_metrics)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/metrics")
+            assert response.headers["Content-Type"] == metrics.CONTENT_TYPE
+            text = await response.text()
+        assert 'eldoria_handler_errors_total{handler="process_hunt_action"}' in text
+        assert 'eldoria_service_seconds_count{service="quick_hunt"}' in text
+        assert "\neldoria_active_battles 0\n" in text
+        assert f"\neldoria_resting_users {len(RESTING_USERS)}\n" in text
+
+    asyncio.run(scenario())
+
+
+def test_database_statements_are_timed(db):
+    async def scenario(statements):
+        selects = database.DB_SECONDS.count("SELECT")
+        await character_service.get_character(302)
+        assert database.DB_SECONDS.count("SELECT") > selects
+        assert database.DB_SECONDS.count("INSERT") > 0
+
+    db(scenario)
@@ -0,0 +1,34 @@
+import time
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+from models.base import Base
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    # Без alembic.ini: env.py не перевизначає логування тестів
+    config = Config()
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+        # Тригер мітки локалізації спрацьовує і на сирий UPDATE
+        conn.execute(text("INSERT INTO localization (key, locale, text) VALUES ('menu.main', 'en', 'Menu')"))
+        created = conn.execute(text("SELECT updated_at FROM localization")).scalar()
+        time.sleep(0.01)
+        conn.execute(text("UPDATE localization SET text = 'Main menu'"))
+        assert conn.execute(text("SELECT updated_at FROM localization")).scalar() > created
+        conn.commit()
+    engine.dispose()
+    command.downgrade(config, "base")
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from bot.services.outbox import Outbox, TokenBucket
+
+
+class FakeBot:
+    """Замість Bot: записує відправки і відповідає 429, якщо чат пише частіше за min_interval"""
+
+    def __init__(self, min_interval: float, retry_after: float = 0.05):
+        self.min_interval = min_interval
+        self.retry_after = retry_after
+        self.delivered = []
+        self.rejected = 0
+        self._last = {}
+
+    def _deliver(self, chat_id: int, text: str):
+        now = time.monotonic()
+        if now - self._last.get(chat_id, -1e9) < self.min_interval:
+            self.rejected += 1
+            raise TelegramRetryAfter(SendMessage(chat_id=chat_id, text=text), "Too Many Requests", self.retry_after)
+        if text == "без змін":
+            raise TelegramBadRequest(SendMessage(chat_id=chat_id, text=text), "message is not modified")
+        self._last[chat_id] = now
+        self.delivered.append((chat_id, text))
+        return text
+
+    async def send_message(self, chat_id, text, **kwargs):
+        return self._deliver(chat_id, text)
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        return self._deliver(chat_id, text)
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate=2, capacity=2, now=0)
+    assert bucket.take(0) == 0 and bucket.take(0) == 0
+    assert bucket.take(0) == 0.5
+    assert bucket.take(0.5) == 0
+
+
+def test_edits_coalesce_and_chat_order_is_kept():
+    async def scenario():
+        bot = FakeBot(min_interval=0.04)
+        outbox = Outbox(bot, global_rate=1000, chat_rate=20, chat_burst=1)
+        worker = asyncio.create_task(outbox.run())
+        first = outbox.send_message(1, "бій почався")
+        edits = [outbox.edit_text(1, 10, f"раунд {i}") for i in range(1, 10)]
+        last = outbox.send_message(1, "бій завершено")
+        other = outbox.send_message(2, "інший чат")
+        assert await outbox.drain(timeout=5)
+        worker.cancel()
+
+        assert [text for chat_id, text in bot.delivered if chat_id == 1] == ["бій почався", "раунд 9", "бій завершено"]
+        assert outbox.dropped_edits == 8 and bot.rejected == 0
+        assert {edit.result() for edit in edits} == {"раунд 9"}
+        assert first.result() == "бій почався" and last.done() and other.result() == "інший чат"
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_backs_off_and_delivers():
+    async def scenario():
+        # Черга дозволяє частіше, ніж приймає "Telegram" - частина запитів отримує 429
+        bot = FakeBot(min_interval=0.05, retry_after=0.06)
+        outbox = Outbox(bot, global_rate=1000, chat_rate=100, chat_burst=5)
+        worker = asyncio.create_task(outbox.run())
+        futures = [outbox.send_message(7, f"повідомлення {i}") for i in range(5)]
+        unchanged = outbox.edit_text(8, 1, "без змін")
+        assert await outbox.drain(timeout=5)
+        worker.cancel()
+
+        assert [text for _, text in bot.delivered] == [f"повідомлення {i}" for i in range(5)]
+        assert outbox.retries == bot.rejected > 0
+        assert all(future.done() for future in futures)
+        assert unchanged.result() is None and outbox.failed == 0
+
+    asyncio.run(scenario())
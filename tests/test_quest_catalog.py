@@ -0,0 +1,66 @@
+from bot import database
+from bot.services import character_service, localization, quest_catalog, quest_service
+from bot.services.quest_catalog import LEVEL_BUCKET, LISTING_LIMIT, QuestCatalog
+from models.base import Quest
+
+
+def make_quest(quest_id: int, level: int, quest_type: str = "combat"):
+    return {"id": quest_id, "title": f"Квест {quest_id}", "description": "", "type": quest_type,
+            "reward": {"gold": quest_id, "exp": 1}, "requirements": {"level": level}}
+
+
+def test_catalog_indexes_and_caches_listings():
+    catalog = QuestCatalog(make_quest(i, i % 40 + 1, "combat" if i % 2 else "gathering") for i in range(1, 3001))
+    assert catalog.get(1234)["requirements"]["level"] == 1234 % 40 + 1
+    assert len(catalog.of_type("gathering")) == 1500
+    assert all(LEVEL_BUCKET < q["requirements"]["level"] <= 2 * LEVEL_BUCKET for q in catalog.by_bucket[1])
+
+    text = catalog.listing("uk", 7)
+    assert text.count("🔹") == LISTING_LIMIT
+    assert catalog.listing("uk", 7) is text
+    assert catalog.listing("uk", 1) is not text
+    # Доступні квести всіх діапазонів до рівня гравця, не вище за нього
+    available = catalog.available(7, limit=3000)
+    assert {q["id"] for q in available} == {q["id"] for q in catalog.by_id.values() if q["requirements"]["level"] <= 7}
+    assert [q["requirements"]["level"] for q in catalog.available(7)] == [7] * LISTING_LIMIT
+    assert QuestCatalog(()).listing("uk", 1) == "📜 Доступні квести:\n\nДля вашого рівня квестів немає"
+
+    # Нові тексти інтерфейсу скидають кеш списків
+    localization.CATALOG = localization.Catalog([("quests.header", "uk", "Квести:\n")])
+    try:
+        assert catalog.listing("uk", 7).startswith("Квести:\n🔹")
+    finally:
+        localization.CATALOG = localization.Catalog(())
+
+
+def test_catalog_loads_quest_rows(db):
+    async def scenario(statements):
+        async with database.session() as session:
+            async with session.begin():
+                session.add(Quest(id=10, type="combat", title="Ведмежа лапа", description="Перемогти ведмедя",
+                                  requirements={"level": 6, "objectives": {"kill:ведмідь": 1}},
+                                  rewards={"gold": 500, "exp": 300}))
+        catalog = await quest_catalog.load_catalog()
+        assert sorted(catalog.by_id) == [1, 2, 10]
+        # Після вбудованих квестів з явними ID нові рядки отримують вільні ID
+        async with database.session() as session:
+            async with session.begin():
+                quest = Quest(type="gathering", title="Трави", requirements={"level": 9}, rewards={"gold": 1, "exp": 1})
+                session.add(quest)
+        assert quest.id == 11
+        assert await quest_service.accept_quest(55, 10) == "❌ Потрібен рівень 6"
+
+        statements.clear()
+        text = await quest_service.list_quests(55)
+        assert "Перші кроки" in text and "Охоронець лісу" not in text and "Ведмежа лапа" not in text
+        assert await quest_service.list_quests(55) is text
+        character = await character_service.get_character(55)
+        character.level = 6
+        text = await quest_service.list_quests(55)
+        assert all(title in text for title in ("Перші кроки", "Охоронець лісу", "Ведмежа лапа"))
+        assert statements == []
+
+    try:
+        db(scenario)
+    finally:
+        quest_catalog.CATALOG = QuestCatalog(quest_catalog.QUESTS)
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from sqlalchemy import func, select
+
+from bot import database
+from bot.services import character_service, quest_catalog, quest_service
+from bot.services.battle_service import ACTIVE_BATTLES, BattleState, process_battle_action
+from bot.services.quest_progress import STATUS_COMPLETED, ActiveQuest, PlayerQuests, QuestTracker
+from models.base import QuestProgress
+
+
+def test_events_touch_only_indexed_objectives():
+    quests = {
+        1: {"id": 1, "requirements": {"objectives": {"kill:вовк": 2, "gather:гриби": 1}}},
+        2: {"id": 2, "requirements": {"objectives": {"kill:вовк": 1}}},
+    }
+    tracker = QuestTracker(quests.get)
+    player = PlayerQuests()
+    for quest in quests.values():
+        player.add(ActiveQuest(quest["id"], None, quest["requirements"]["objectives"]))
+
+    assert tracker.record(player, [("kill:ведмідь", 1), ("gather:трави", 4)]) == []
+    done = tracker.record(player, [("kill:вовк", 1)])
+    assert [active.quest_id for active in done] == [2]
+    assert player.by_event["kill:вовк"] == [player.by_id[1]]
+    assert tracker.record(player, [("kill:вовк", 5)]) == []
+    assert player.by_id[1].counts == {"kill:вовк": 2, "gather:гриби": 0}
+    done = tracker.record(player, [("gather:гриби", 1)])
+    assert done[0].status == STATUS_COMPLETED
+    assert player.by_event == {} and player.completed == {1, 2}
+
+
+def test_quest_progress_is_batched_and_completed_with_reward(db):
+    async def scenario(statements):
+        await quest_catalog.load_catalog()
+        await quest_catalog.load_catalog()
+        character = await character_service.get_character(101)
+        assert await quest_service.accept_quest(101, 2) == "❌ Потрібен рівень 2"
+        assert await quest_service.accept_quest(101, 1) == "✅ Ви прийняли квест: Перші кроки"
+        assert await quest_service.accept_quest(101, 1) == "Квест вже прийнято"
+
+        statements.clear()
+        assert await quest_service.record_events(character, [("gather:гриби", 2), ("gather:ягоди", 3)]) == ""
+        assert await quest_service.record_events(character, [("gather:гриби", 1)]) == ""
+        assert statements == []
+        assert await quest_service.check_quest_progress(101, 1) == {"completed": False, "progress": {"gather:гриби": 3}}
+        assert await quest_service.complete_quest(101, 1) == "⏳ Квест ще не виконано"
+        assert await quest_service.TRACKER.flush() == 1
+
+        # Прогрес переживає скидання кешу
+        quest_service.TRACKER.clear()
+        gold = character.stats["gold"]
+        text = await quest_service.record_events(character, [("gather:гриби", 4)])
+        assert text.startswith("🎉 Квест «Перші кроки» виконано!")
+        assert character.stats["gold"] == gold + 100
+        assert (await quest_service.check_quest_progress(101, 1))["completed"]
+        assert await quest_service.accept_quest(101, 1) == "Квест вже прийнято"
+
+        character_service.award(character, xp=character_service.xp_required(1))
+        assert await quest_service.accept_quest(101, 2) == "✅ Ви прийняли квест: Охоронець лісу"
+        for _ in range(3):
+            ACTIVE_BATTLES[101] = BattleState("вовк", 80, 1, time.time() + 60, seed=1)
+            text = await process_battle_action(101, "attack")
+        assert "Охоронець лісу" in text
+        await quest_service.TRACKER.flush()
+        async with database.session() as session:
+            rows = (await session.execute(select(QuestProgress.quest_id, QuestProgress.progress, QuestProgress.status)
+                                          .order_by(QuestProgress.quest_id))).all()
+        assert rows == [(1, {"gather:гриби": 5}, STATUS_COMPLETED), (2, {"kill:вовк": 3}, STATUS_COMPLETED)]
+
+    try:
+        db(scenario)
+    finally:
+        quest_catalog.CATALOG = quest_catalog.QuestCatalog(quest_catalog.QUESTS)
+
+
+def test_concurrent_accept_and_eviction_after_flush(db):
+    async def scenario(statements):
+        quest = {"id": 1, "requirements": {"objectives": {"kill:вовк": 3}}}
+        tracker = QuestTracker({1: quest}.get, max_players=1)
+        first = await character_service.get_character(111)
+        second = await character_service.get_character(112)
+
+        accepted = await asyncio.gather(*(tracker.accept(111, first.id, quest) for _ in range(2)))
+        assert sum(active is not None for active in accepted) == 1
+        async with database.session() as session:
+            assert await session.scalar(select(func.count()).select_from(QuestProgress)) == 1
+
+        # Гравець з незаписаним прогресом не витісняється
+        player = await tracker.player(111, first.id)
+        tracker.record(player, [("kill:вовк", 2)])
+        await tracker.player(112, second.id)
+        assert len(tracker) == 2
+        assert await tracker.flush() == 1
+        await tracker.player(112, second.id)
+        await tracker.player(113, None)
+        assert len(tracker) == 1
+        reloaded = await tracker.player(111, first.id)
+        assert reloaded is not player and reloaded.by_id[1].counts == {"kill:вовк": 2}
+
+    db(scenario)
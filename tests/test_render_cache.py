@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot.services import character_service, inventory_service, localization
+from bot.services.profile_service import inventory_screen, profile_screen
+from bot.services import outbox
+from bot.services.render_cache import RENDERS, plain_text
+
+
+def message(message_id: int, text: str):
+    return SimpleNamespace(chat=SimpleNamespace(id=501), message_id=message_id, text=text)
+
+
+def test_profile_is_rendered_once_per_version():
+    async def scenario():
+        RENDERS.clear()
+        first = await profile_screen(501)
+        assert await profile_screen(501) is first
+        assert (RENDERS.hits, RENDERS.misses) == (1, 1)
+        # Повідомлення без запису (до перезапуску) - порівнюється текст
+        assert RENDERS.shown(first, message(1, first.text)) and RENDERS.skipped_edits == 1
+        assert not RENDERS.shown(first, message(2, "🏰 Легенди Ельдорії"))
+
+        character = await character_service.get_character(501)
+        character_service.award(character, gold=25)
+        changed = await profile_screen(501)
+        assert changed is not first and "💰 Золото: 25" in changed.text
+
+        localization.CATALOG = localization.Catalog([("profile.text", "uk", "Рівень {level}")])
+        try:
+            assert (await profile_screen(501)).text == "Рівень 1"
+        finally:
+            localization.CATALOG = localization.Catalog(())
+        assert RENDERS.hit_rate == 1 / 4
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        character_service.CACHE.clear()
+        RENDERS.clear()
+
+
+def test_shown_compares_stamp_of_the_screen_written_to_the_message():
+    async def scenario():
+        RENDERS.clear()
+        screen = await profile_screen(503)
+        shown = message(7, "текст, який Telegram не повертає дослівно")
+        assert not RENDERS.shown(screen, shown)
+        RENDERS.mark_shown(screen, shown)
+        # Відбиток збігся - текст не порівнюється
+        assert RENDERS.shown(screen, shown)
+
+        character_service.award(await character_service.get_character(503), gold=5)
+        assert not RENDERS.shown(await profile_screen(503), shown)
+
+        # Інше редагування повідомлення забуває запис
+        RENDERS.mark_shown(screen, shown)
+        sent = []
+
+        async def edit_text(text, **kwargs):
+            sent.append(text)
+
+        shown.edit_text = edit_text
+        await outbox.edit_text(shown, "🏰 Легенди Ельдорії")
+        shown.text = "🏰 Легенди Ельдорії"
+        assert not RENDERS.shown(screen, shown) and sent == ["🏰 Легенди Ельдорії"]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        character_service.CACHE.clear()
+        RENDERS.clear()
+
+
+def test_telegram_text_is_compared_without_markup():
+    assert plain_text("<b>Рівень</b> 3 &amp; більше\n") == "Рівень 3 & більше"
+
+
+def test_inventory_screen_follows_loot_and_reload(db):
+    async def scenario(statements):
+        inventory_service.ITEM_IDS.clear()
+        inventory_service.ITEM_NAMES.clear()
+        character = await character_service.get_character(502)
+        assert (await inventory_screen(502)).text == "🎒 Інвентар порожній"
+        await inventory_service.grant_loot(character, [("гриби", 2), ("трава", 1)])
+        screen = await inventory_screen(502)
+        assert screen.text == "🎒 Інвентар:\n• гриби ×2\n• трава ×1"
+
+        # Після евікції персонаж читається з БД з новою версією, назви - з таблиці items
+        character_service.CACHE.clear()
+        inventory_service.ITEM_NAMES.clear()
+        statements.clear()
+        reloaded = await inventory_screen(502)
+        assert reloaded is not screen and reloaded.text == screen.text
+        assert any("FROM items" in statement for statement in statements)
+
+    try:
+        db(scenario)
+    finally:
+        inventory_service.ITEM_NAMES.clear()
+        RENDERS.clear()
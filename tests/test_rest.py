@@ -1,4 +1,8 @@
-from bot.services.rest_service import calculate_rest
+import asyncio
+
+from bot.services import expiry_service
+from bot.services.character_service import get_character
+from bot.services.rest_service import RESTING_USERS, _on_rest_finished, calculate_rest, rest
 
 
 def test_calculate_rest_full_restore():
@@ -13,4 +17,27 @@ def test_calculate_rest_partial():
     # HP += 100*0.1*2 = 20
     assert new_hp == 60
     # MP += 50*0.15*2 = 15
-    assert new_mp == 25 
\ No newline at end of file
+    assert new_mp == 25
+
+
+def test_rest_restores_hp_when_it_ends():
+    async def scenario():
+        character = await get_character(501)
+        character.stats["hp"] = 10
+        await rest(501, "2h")
+        # Початок відпочинку нічого не відновлює
+        assert character.stats["hp"] == 10
+        end_time = RESTING_USERS[501].end_time.timestamp()
+        assert await _on_rest_finished(501, end_time - 1) is None
+        assert character.stats["hp"] == 10
+        assert (await _on_rest_finished(501, end_time)).startswith("✅ Відпочинок завершено")
+        assert character.stats["hp"] == 30 and 501 not in RESTING_USERS
+        # Повторне спрацювання не відновлює вдруге
+        assert await _on_rest_finished(501, end_time) is None
+        assert character.stats["hp"] == 30
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        RESTING_USERS.pop(501, None)
+        expiry_service.cancel("rest", 501)
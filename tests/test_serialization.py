@@ -0,0 +1,75 @@
+import asyncio
+import re
+import time
+
+import fakeredis
+from aiogram.types import User
+
+from bot.middlewares.serialization import SerializeMiddleware
+from bot.services.battle_service import BATTLES, BattleState, process_battle_action
+from bot.services.game_store import use_redis
+from bot.services.user_locks import UserLocks
+
+START_HP = 1_000_000
+TAPS = 20
+
+
+def run_taps(serialize: bool):
+    """TAPS одночасних hunt:attack одного гравця; стан бою - в Redis (копія на кожне читання)"""
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis()
+        use_redis(redis)
+        try:
+            await BATTLES.put(77, BattleState("вовк", START_HP, START_HP, time.time() + 60, seed=3),
+                              time.time() + 60)
+            middleware = SerializeMiddleware(UserLocks())
+            data = {"event_from_user": User(id=77, is_bot=False, first_name="Герой")}
+
+            async def handler(event, data):
+                return await process_battle_action(77, "attack")
+
+            if serialize:
+                replies = await asyncio.gather(*(middleware(handler, None, dict(data)) for _ in range(TAPS)))
+            else:
+                replies = await asyncio.gather(*(handler(None, data) for _ in range(TAPS)))
+            battle = await BATTLES.pop(77)
+            assert len(middleware.locks) == 0
+            return replies, battle
+        finally:
+            use_redis(None)
+            await redis.aclose()
+
+    return asyncio.run(scenario())
+
+
+def dealt(replies) -> int:
+    return sum(int(damage) for reply in replies for damage in re.findall(r"Ви завдали (\d+)", reply))
+
+
+def test_concurrent_taps_of_one_user_keep_every_hp_update():
+    replies, battle = run_taps(serialize=True)
+    assert battle.round == TAPS
+    assert START_HP - battle.enemy_hp == dealt(replies)
+
+
+def test_unserialized_taps_lose_updates():
+    replies, battle = run_taps(serialize=False)
+    assert battle.round < TAPS
+    assert START_HP - battle.enemy_hp < dealt(replies)
+
+
+def test_other_users_are_not_blocked():
+    async def scenario():
+        locks = UserLocks()
+        order = []
+
+        async def act(user_id: int, name: str, delay: float):
+            async with locks.hold(user_id):
+                await asyncio.sleep(delay)
+                order.append(name)
+
+        await asyncio.gather(act(1, "a1", 0.05), act(1, "a2", 0), act(2, "b", 0))
+        assert order == ["b", "a1", "a2"]
+        assert len(locks) == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,82 @@
+import asyncio
+import io
+import json
+import logging
+import threading
+from types import SimpleNamespace
+
+from aiogram.types import CallbackQuery, User
+
+from bot.middlewares.access_log import AccessLogMiddleware
+from bot.utils.structured_log import parse_sample_rates, setup_logging
+
+
+class ThreadProbe:
+    """Запам'ятовує потік, у якому його відформатували"""
+
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self):
+        self.thread = threading.current_thread()
+        return "probe"
+
+
+def test_access_records_are_structured_lazy_and_sampled():
+    stream = io.StringIO()
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    listener = setup_logging("INFO", sample_rates=parse_sample_rates("process_hunt_action=0, cmd_start=1"),
+                             stream=stream)
+    try:
+        probe = ThreadProbe()
+        logging.getLogger("test").info("lazy %s", probe)
+
+        async def scenario():
+            middleware = AccessLogMiddleware()
+            user = User(id=7, is_bot=False, first_name="Герой")
+
+            async def cmd_start(event, data):
+                return "ok"
+
+            async def process_hunt_action(event, data):
+                return "ok"
+
+            for handler in (cmd_start, process_hunt_action):
+                event = CallbackQuery(id="1", from_user=user, chat_instance="1", data="hunt:attack")
+                data = {"event_from_user": user, "handler": SimpleNamespace(callback=handler)}
+                assert await middleware(handler, event, data) == "ok"
+
+        asyncio.run(scenario())
+    finally:
+        listener.stop()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+
+    assert probe.thread is not threading.main_thread()
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert records[0]["message"] == "lazy probe"
+    access = records[1:]
+    assert len(access) == 1
+    assert access[0]["handler"] == "cmd_start" and access[0]["user_id"] == 7
+    assert access[0]["payload"] == "hunt:attack" and access[0]["latency_ms"] >= 0
+
+
+def test_exception_traceback_reaches_json():
+    stream = io.StringIO()
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    listener = setup_logging("INFO", stream=stream)
+    try:
+        try:
+            raise ValueError("зламаний бій")
+        except ValueError:
+            logging.getLogger("test").exception("battle failed")
+    finally:
+        listener.stop()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+
+    record = json.loads(stream.getvalue().splitlines()[0])
+    assert record["message"] == "battle failed"
+    assert record["exc"].startswith("Traceback") and "ValueError: зламаний бій" in record["exc"]
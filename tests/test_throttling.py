@@ -0,0 +1,101 @@
+import asyncio
+
+import fakeredis
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from bot.middlewares import throttling
+from bot.services import character_service, localization
+from bot.middlewares.throttling import LocalLimiter, RedisLimiter, ThrottlingMiddleware, command_class
+
+
+def callback(user_id: int, data: str) -> CallbackQuery:
+    return CallbackQuery(id=str(user_id), from_user=User(id=user_id, is_bot=False, first_name="Герой"),
+                         chat_instance="1", data=data)
+
+
+def message(user_id: int, text: str) -> Message:
+    return Message(message_id=1, date=0, chat=Chat(id=user_id, type="private"), text=text)
+
+
+def test_command_classes():
+    assert command_class(callback(1, "hunt:attack")) == "battle"
+    assert command_class(callback(1, "hunt")) == "hunt"
+    assert command_class(callback(1, "quest:quest_accept")) == "quest"
+    assert command_class(callback(1, "profile:stats")) == "default"
+    assert command_class(message(1, "/hunt@EldoriaBot")) == "hunt"
+    assert command_class(message(1, "/")) == "default"
+
+
+def test_local_buckets_refill_and_stay_bounded():
+    now = [0.0]
+    limiter = LocalLimiter(max_keys=100, clock=lambda: now[0])
+    rate, burst = throttling.LIMITS["battle"]
+    assert [limiter.allow(1, "battle") for _ in range(burst + 1)] == [True] * burst + [False]
+    # Інший клас команд - окремий bucket
+    assert limiter.allow(1, "hunt")
+    now[0] += 1 / rate
+    assert limiter.allow(1, "battle") and not limiter.allow(1, "battle")
+
+    for user_id in range(10_000):
+        limiter.allow(user_id, "default")
+    assert len(limiter.buckets) == 100
+    assert (9_999, "default") in limiter.buckets and (1, "battle") not in limiter.buckets
+
+
+def test_middleware_drops_and_answers_throttled_callbacks(monkeypatch):
+    async def scenario():
+        character_service.CACHE.clear()
+        answered = []
+
+        async def fake_answer(self, text=None, **kwargs):
+            answered.append(text)
+        monkeypatch.setattr(CallbackQuery, "answer", fake_answer)
+
+        middleware = ThrottlingMiddleware()
+        handled = []
+
+        async def handler(event, data):
+            handled.append(event.data)
+            return "ok"
+
+        user = User(id=5, is_bot=False, first_name="Герой")
+        results = [await middleware(handler, callback(5, "hunt:attack"), {"event_from_user": user}) for _ in range(5)]
+        burst = int(throttling.LIMITS["battle"][1])
+        assert results == ["ok"] * burst + [None] * (5 - burst)
+        assert len(handled) == burst and middleware.throttled == 5 - burst
+        assert answered == ["⏳ Не так швидко!"] * (5 - burst)
+        # Гравця немає в кеші - персонаж не завантажується
+        assert character_service.CACHE.peek(5) is None
+
+        # Гравець у кеші - відповідь його мовою
+        character_service.CACHE.clear()
+        character = await character_service.get_character(6)
+        character.locale = "en"
+        localization.CATALOG = localization.Catalog([("throttle.too_fast", "en", "⏳ Slow down!")])
+        user = User(id=6, is_bot=False, first_name="Hero")
+        for _ in range(5):
+            await middleware(handler, callback(6, "hunt:attack"), {"event_from_user": user})
+        assert answered[-1] == "⏳ Slow down!"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        localization.CATALOG = localization.Catalog(())
+        character_service.CACHE.clear()
+
+
+def test_redis_limit_is_shared_between_workers():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        first = fakeredis.aioredis.FakeRedis(server=server)
+        second = fakeredis.aioredis.FakeRedis(server=server)
+        clock = lambda: 1000.0
+        workers = [RedisLimiter(first, window=2, clock=clock), RedisLimiter(second, window=2, clock=clock)]
+        rate, burst = throttling.LIMITS["hunt"]
+        allowed = [await workers[i % 2].allow(3, "hunt") for i in range(6)]
+        assert allowed.count(True) == burst + rate * 2
+        assert await first.ttl(f"eldoria:throttle:hunt:3:{1000 // 2}") == 4
+        await first.aclose()
+        await second.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import asyncio
+import math
+import random
+from datetime import datetime
+
+from bot.utils.timer_wheel import TimerWheel
+from bot.services import expiry_service
+from bot.services.battle_service import ACTIVE_BATTLES, BattleState
+from bot.services.rest_service import RESTING_USERS, Rest
+
+
+def test_wheel_fires_100k_timers_on_time():
+    rng = random.Random(1)
+    wheel = TimerWheel(resolution=1.0, now=0.0)
+    deadlines = {key: rng.uniform(0, 3 * 86400) for key in range(100_000)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline, payload=deadline)
+    # Скасування частини таймерів
+    for key in range(0, 100_000, 10):
+        assert wheel.cancel(key)
+    assert len(wheel) == 90_000
+
+    fired = set()
+    now = 0.0
+    while len(wheel):
+        previous, now = now, now + rng.uniform(1, 600)
+        for key, deadline in wheel.advance(now):
+            assert key not in fired
+            # Таймер спрацьовує на першому advance, що досяг його тіку
+            assert int(previous) < math.ceil(deadline) <= int(now)
+            fired.add(key)
+    assert len(fired) == 90_000
+    assert all(key % 10 for key in fired)
+
+
+def test_wheel_exact_ticks_and_reschedule():
+    wheel = TimerWheel(resolution=1.0, now=100.0)
+    wheel.schedule("a", 105)
+    wheel.schedule("b", 5000)
+    wheel.schedule("b", 170)  # повторне планування замінює таймер
+    assert wheel.advance(104) == []
+    assert [key for key, _ in wheel.advance(105)] == ["a"]
+    assert wheel.advance(169) == []
+    assert [key for key, _ in wheel.advance(170)] == ["b"]
+    assert len(wheel) == 0
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+def test_expiry_loop_evicts_and_notifies(monkeypatch):
+    # Час задає лише годинник циклу: обробники отримують його як now
+    clock = [1_000_000.0]
+    monkeypatch.setattr(expiry_service, "WHEEL", TimerWheel(now=clock[0]))
+
+    ACTIVE_BATTLES[10] = BattleState("вовк", 100, 50, clock[0] + 300)
+    expiry_service.schedule("battle", 10, clock[0] + 300)
+    RESTING_USERS[11] = Rest(datetime.fromtimestamp(clock[0] + 59), 1)
+    expiry_service.schedule("rest", 11, clock[0] + 60)
+
+    bot = FakeBot()
+
+    async def fake_sleep(_):
+        clock[0] += 30
+        if clock[0] > 1_000_400:
+            raise asyncio.CancelledError
+
+    try:
+        asyncio.run(expiry_service.run_expiry_loop(bot, clock=lambda: clock[0], sleep=fake_sleep))
+    except asyncio.CancelledError:
+        pass
+
+    assert 10 not in ACTIVE_BATTLES and 11 not in RESTING_USERS
+    assert [chat_id for chat_id, _ in bot.sent] == [11, 10]
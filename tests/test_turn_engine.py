@@ -0,0 +1,65 @@
+import random
+import time
+from bot.services.battle_service import BattleState, battle_engine, decode_battle, encode_battle, play_round
+from bot.services.turn_engine import (
+    ACTION_ATTACK, ACTION_DEFEND, ACTION_SKILL, EVENT_EFFECT, STAT_HP, Skill, TurnEngine,
+)
+
+
+def test_initiative_orders_by_speed():
+    engine = TurnEngine()
+    slow = engine.add("slow", 0, 100, 10, 5, speed=10)
+    fast = engine.add("fast", 1, 100, 10, 5, speed=30)
+    middle = engine.add("middle", 1, 100, 10, 5, speed=20)
+    # Random(0..5) не може перекрити різницю в 10 SPD
+    assert engine.initiative_order(random.Random(1)) == [fast, middle, slow]
+
+
+def test_skill_cooldown_and_poison():
+    poison = Skill("Отрута", mult=1.0, cost=10, cooldown=2, effect=("hp", -5, 3))
+    engine = TurnEngine()
+    hero = engine.add("hero", 0, 500, 20, 0, speed=50, mp=30, skills=[poison])
+    dummy = engine.add("dummy", 1, 1000, 0, 0, speed=1)
+    rng = random.Random(3)
+
+    events = engine.resolve_round({hero: (ACTION_SKILL, dummy, 0)}, rng)
+    assert events[0][1] == ACTION_SKILL
+    assert (dummy, EVENT_EFFECT, dummy, -5, False) in events
+    assert engine.mp[hero] == 20
+
+    # На кулдауні уміння замінюється звичайною атакою
+    events = engine.resolve_round({hero: (ACTION_SKILL, dummy, 0)}, rng)
+    assert events[0][1] == ACTION_ATTACK
+    engine.resolve_round({hero: (ACTION_DEFEND, -1, -1)}, rng)
+    events = engine.resolve_round({hero: (ACTION_SKILL, dummy, 0)}, rng)
+    assert events[0][1] == ACTION_SKILL
+
+
+def test_raid_round_until_boss_falls():
+    engine = TurnEngine()
+    heroes = [engine.add(f"hero{i}", 0, 900, 70, 30, speed=20 + i) for i in range(20)]
+    boss = engine.add("boss", 1, 20_000, 150, 60, speed=35)
+    rng = random.Random(9)
+    rounds = 0
+    while engine.winner() is None and rounds < 100:
+        events = engine.resolve_round({}, rng)
+        assert all(target == boss for actor, _, target, _, _ in events if actor in heroes)
+        rounds += 1
+    assert engine.winner() == 0
+    assert engine.hp[boss] == 0
+
+
+def test_hunt_effects_carry_over_between_rounds():
+    battle = BattleState("вовк", 100, 50, time.time() + 60, seed=7)
+    # Отрута на ворога на 3 ходи, накладена в попередньому раунді
+    engine = battle_engine(battle.combat, battle.player_hp, battle.enemy, battle.enemy_hp, battle.enemy_max_hp)
+    engine.apply_effect(1, STAT_HP, -4, 3)
+    battle.engine_state = engine.state()
+
+    restored = decode_battle({key.encode(): value if isinstance(value, bytes) else str(value).encode()
+                              for key, value in encode_battle(battle).items()})
+    events = play_round(restored, "defend")
+    assert (1, EVENT_EFFECT, 1, -4, False) in events
+    events = play_round(restored, "defend")
+    assert (1, EVENT_EFFECT, 1, -4, False) in events
+    assert restored.round == 2
@@ -0,0 +1,85 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.webhook import SECRET_HEADER, WebhookServer
+
+
+def make_update(update_id: int) -> dict:
+    return {"update_id": update_id, "message": {
+        "message_id": update_id, "date": 0, "chat": {"id": 1, "type": "private"},
+        "from": {"id": 1, "is_bot": False, "first_name": "Герой"}, "text": "привіт",
+    }}
+
+
+def test_webhook_bounds_in_flight_updates_and_drains():
+    async def scenario():
+        router = Router()
+        release = asyncio.Event()
+        state = {"active": 0, "peak": 0, "done": 0}
+
+        @router.message()
+        async def slow_handler(message: Message):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await release.wait()
+            state["active"] -= 1
+            state["done"] += 1
+
+        dispatcher = Dispatcher()
+        dispatcher.include_router(router)
+        server = WebhookServer(dispatcher, Bot("42:TEST"), secret="s3cret", max_in_flight=3)
+        async with TestClient(TestServer(server.app("/webhook"))) as client:
+            response = await client.post("/webhook", json=make_update(1))
+            assert response.status == 401
+            headers = {SECRET_HEADER: "s3cret"}
+            assert (await client.post("/webhook", data="{", headers=headers)).status == 400
+
+            posts = [asyncio.create_task(client.post("/webhook", json=make_update(i), headers=headers))
+                     for i in range(10)]
+            await asyncio.sleep(0.2)
+            # Три оновлення в обробці, решта запитів чекає на слот
+            assert server.in_flight == 3 and sum(post.done() for post in posts) == 3
+
+            release.set()
+            assert [(await post).status for post in posts] == [200] * 10
+            drain = asyncio.create_task(server.drain(timeout=5))
+            assert await drain == 0
+            assert state == {"active": 0, "peak": 3, "done": 10}
+            assert (await client.post("/webhook", json=make_update(11), headers=headers)).status == 503
+        await server.bot.session.close()
+
+    asyncio.run(scenario())
+
+
+def test_request_waiting_for_a_slot_is_rejected_after_drain_starts():
+    async def scenario():
+        router = Router()
+        release = asyncio.Event()
+        done = []
+
+        @router.message()
+        async def slow_handler(message: Message):
+            await release.wait()
+            done.append(message.message_id)
+
+        dispatcher = Dispatcher()
+        dispatcher.include_router(router)
+        server = WebhookServer(dispatcher, Bot("42:TEST"), max_in_flight=1)
+        async with TestClient(TestServer(server.app("/webhook"))) as client:
+            assert (await client.post("/webhook", json=make_update(1))).status == 200
+            waiting = asyncio.create_task(client.post("/webhook", json=make_update(2)))
+            await asyncio.sleep(0.1)
+            assert not waiting.done()
+
+            drain = asyncio.create_task(server.drain(timeout=5))
+            await asyncio.sleep(0)
+            release.set()
+            assert (await waiting).status == 503
+            assert await drain == 0
+            assert done == [1] and server.in_flight == 0
+        await server.bot.session.close()
+
+    asyncio.run(scenario())